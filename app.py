@@ -1,18 +1,27 @@
 import logging
-import sys
 import os
-from flask import Flask, render_template, session
+from flask import Flask, render_template, session, jsonify, request, current_app
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 # Import the Config class
 from config.config import Config
-from models.database import init_db_pool, close_db_connection
+from models.database import init_db_pool, close_db_connection, fetch_value, mark_read_your_writes, PoolTimeout
+from models.schema import init_schema
+from models.otp_queries import init_otp_store
+from models.user_queries import log_user_cache_stats
+from services.email_outbox import init_email_outbox
+from services.rate_limiter import init_rate_limiter
+from services.password_service import init_password_hasher
+from services.session_store import init_session_store
+from services.scheduler import init_scheduler
+from services.settings_service import init_settings_service
+from services.export_service import init_export
+from services.request_timing import init_request_timing
+from services.slow_query_log import init_slow_query_log
+from services.metrics import init_metrics
+from services.log_pipeline import init_logging
+from services.compression import init_compression
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
 
 def create_app():
     """Initialize and configure the Flask application."""
@@ -36,9 +45,31 @@ def create_app():
     )
     # --- END OF CHANGE ---
 
+    init_logging(app.config)
+    hops = app.config['TRUSTED_PROXY_HOPS']
+    if hops:
+        # Client IP (rate limits, logs) and scheme from the proxy's X-Forwarded-* headers
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+    init_session_store(app)
+    # Registered first so its after_request hook runs last, on the final body
+    init_compression(app)
+
     # Initialize and register database functions
     init_db_pool(app)
+    init_schema(app)
     app.teardown_appcontext(close_db_connection)
+    app.after_request(mark_read_your_writes)
+    app.teardown_request(log_user_cache_stats)
+    init_request_timing(app)
+    init_slow_query_log(app)
+    init_settings_service(app)
+    init_otp_store(app)
+    init_email_outbox(app)
+    init_rate_limiter(app)
+    init_password_hasher(app)
+    init_scheduler(app)
+    init_export(app)
+    init_metrics(app)
 
     # Import and register blueprints
     from blueprints.auth.routes import auth_bp
@@ -71,6 +102,33 @@ def create_app():
         artworks = get_all_artworks()
         return render_template('gallery.html', artworks=artworks)
 
+    @app.route('/health')
+    def health():
+        """Liveness plus connection pool stats; 503 when the database is unreachable."""
+        pool = current_app.db_pool.status()
+        read_pool = current_app.db_read_pool.status() if current_app.db_read_pool else None
+        try:
+            fetch_value("SELECT 1")
+            database = 'ok'
+        except Exception as e:
+            logging.error(f"Health check database error: {e}")
+            database = 'unavailable'
+        status = 'ok' if database == 'ok' else 'error'
+        return jsonify({
+            'status': status, 'database': database, 'pool': pool, 'read_pool': read_pool
+        }), 200 if status == 'ok' else 503
+
+    @app.errorhandler(PoolTimeout)
+    def pool_timeout_error(e):
+        logging.error(f"Database pool exhausted: {e}")
+        if request.accept_mimetypes.best == 'application/json' or request.path.startswith(('/admin/api', '/health')):
+            response = jsonify({'error': 'The server is busy, please try again shortly'})
+        else:
+            response = app.make_response(render_template('error.html', error='The server is busy, please try again shortly.'))
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+
     @app.errorhandler(404)
     def not_found_error(error):
         return render_template('404.html'), 404
@@ -82,6 +140,18 @@ def create_app():
 
     return app
 
+def start_background_threads(app):
+    """Starts the scheduler and email outbox threads if create_app left them unstarted.
+
+    Threads do not survive fork, so a server that preloads the app calls
+    this in every worker after forking.
+    """
+    for name in ('scheduler', 'email_sender'):
+        thread = getattr(app, name, None)
+        if thread is not None and thread.ident is None:
+            thread.start()
+
 if __name__ == "__main__":
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py)
     app = create_app()
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5000, debug=os.getenv('FLASK_DEBUG', '1') == '1')
\ No newline at end of file
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+HTTP load benchmark for a running ArtBay server.
+
+Requests each path from several client threads over keep-alive
+connections for a fixed time, then reports requests/sec, the latency
+percentiles and any non-2xx responses per path. Run it against the
+development server and against gunicorn to compare the worker settings.
+
+Usage: python bench_http.py [base_url] [seconds] [concurrency] [path ...]
+"""
+
+import http.client
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = ['/health', '/', '/art/all', '/gallery']
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+def bench(base_url, path, seconds, concurrency):
+    url = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        conn = connection_class(url.netloc, timeout=30)
+        local_latencies, local_errors = [], 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    local_errors += 1
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = connection_class(url.netloc, timeout=30)
+                continue
+            local_latencies.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50': percentile(latencies, 0.50) * 1000,
+        'p95': percentile(latencies, 0.95) * 1000,
+        'p99': percentile(latencies, 0.99) * 1000,
+        'errors': sum(errors),
+    }
+
+def main():
+    base_url = sys.argv[1] if len(sys.argv) > 1 else 'http://127.0.0.1:8000'
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+    paths = sys.argv[4:] or DEFAULT_PATHS
+
+    print(f"Target:      {base_url}")
+    print(f"Duration:    {seconds:g}s per path")
+    print(f"Concurrency: {concurrency}")
+    print()
+    print(f"{'Path':<20} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for path in paths:
+        result = bench(base_url, path, seconds, concurrency)
+        print(f"{path:<20} {result['rps']:9.1f} {result['p50']:8.1f} {result['p95']:8.1f} "
+              f"{result['p99']:8.1f} {result['errors']:7d}")
+
+if __name__ == "__main__":
+    main()
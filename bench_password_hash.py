@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for password hashing throughput.
+
+Reports hashes/sec inline and through the process pool for the configured
+PASSWORD_HASH_METHOD (or one given on the command line), plus the rate per
+core, to help pick hash parameters for the login hardware.
+
+Usage: python bench_password_hash.py [method] [hashes]
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config.config import Config
+from services.password_service import PasswordHasher
+
+def bench(hasher, count):
+    start = time.perf_counter()
+    if hasher.workers == 0:
+        for i in range(count):
+            hasher.hash(f"password-{i}")
+    else:
+        # Submit from several threads so every pool process stays busy
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=hasher.workers * 2) as threads:
+            list(threads.map(hasher.hash, (f"password-{i}" for i in range(count))))
+    return count / (time.perf_counter() - start)
+
+def main():
+    method = sys.argv[1] if len(sys.argv) > 1 else Config.PASSWORD_HASH_METHOD
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    cores = os.cpu_count() or 1
+
+    print(f"Method: {method}")
+    print(f"Cores:  {cores}")
+    print()
+
+    inline = bench(PasswordHasher(method, 0, 1), max(count // 4, 1))
+    print(f"Inline (request thread): {inline:8.1f} hashes/sec")
+
+    workers = Config.PASSWORD_HASH_WORKERS or cores
+    hasher = PasswordHasher(method, workers, Config.PASSWORD_HASH_MAX_PENDING)
+    hasher.hash("warm-up")  # start the pool processes outside the timing
+    pooled = bench(hasher, count)
+    hasher.shutdown()
+    print(f"Pool ({workers} workers):     {pooled:8.1f} hashes/sec")
+    print(f"Per core:                {pooled / min(workers, cores):8.1f} hashes/sec")
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,70 @@
+import logging
 from flask import Blueprint, render_template, jsonify, request, session, redirect, url_for, current_app
 from functools import wraps
-from models.admin_queries import get_dashboard_metrics, get_users, update_user, get_artworks, update_artwork, delete_artwork, get_orders, get_order_details, get_settings, update_settings
+from datetime import date, timedelta
+from models.admin_queries import get_dashboard_metrics, get_users, update_user, get_artworks, update_artwork, delete_artwork, get_orders, get_order_details, get_orders_details, decode_cursor, approve_artists, delete_artworks, update_user_roles, BULK_MAX, USER_ROLES
+from services.settings_service import get_settings, update_settings
+from services.export_service import export_response, ExportBusy
+from services.slow_query_log import get_slow_query_report
+from models.user_queries import get_user_by_email, get_user_cache_stats
+from models.scheduler_queries import get_job_runs
+from models.analytics_queries import get_sales_analytics
 
 admin_bp = Blueprint('admin', __name__, template_folder='templates')
 
+logger = logging.getLogger(__name__)
+
 # Admin-only decorator
 def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if 'user' not in session or session['user'].get('role') != 'admin':
-            current_app.logger.warning(f"Unauthorized access attempt to {f.__name__}")
+            logger.warning("Unauthorized access attempt to %s", f.__name__)
+            return redirect(url_for('auth.login', next=request.url))
+        # The session role may be stale; check it against the (cached) user row
+        user = get_user_by_email(session['user']['email'])
+        if not user or user['role'] != 'admin':
+            logger.warning("Revoked admin access attempt to %s", f.__name__)
+            session.pop('user', None)
             return redirect(url_for('auth.login', next=request.url))
         return f(*args, **kwargs)
     return decorated_function
 
+def list_args(default_sort, default_direction):
+    """Reads search, sort and keyset pagination parameters for the admin list APIs."""
+    direction = request.args.get('dir', default_direction)
+    if direction not in ('asc', 'desc'):
+        direction = default_direction
+    after = None
+    if request.args.get('cursor'):
+        after = decode_cursor(request.args['cursor'])
+        if after is None:
+            raise ValueError('Invalid cursor')
+    return {
+        'search': request.args.get('search', '').strip(),
+        'sort': request.args.get('sort', default_sort),
+        'direction': direction,
+        'after': after,
+        'limit': min(max(request.args.get('limit', 50, type=int), 1), 200)
+    }
+
+def normalize_email(value):
+    if not isinstance(value, str):
+        raise ValueError(value)
+    return value.strip().lower()
+
+def bulk_ids(data, key, cast=str):
+    """Deduplicated list of IDs from a bulk request body; raises ValueError if invalid."""
+    values = data.get(key) if isinstance(data, dict) else None
+    if not isinstance(values, list) or not values:
+        raise ValueError(f"'{key}' must be a non-empty list")
+    if len(values) > BULK_MAX:
+        raise ValueError(f"At most {BULK_MAX} {key} per request")
+    try:
+        return list(dict.fromkeys(cast(value) for value in values))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value in '{key}'")
+
 @admin_bp.route('/')
 @admin_required
 def index():
@@ -23,10 +74,10 @@ def index():
 @admin_required
 def dashboard():
     try:
-        current_app.logger.info("Dashboard route accessed")
+        logger.info("Dashboard route accessed")
         metrics = get_dashboard_metrics()
         if 'error' in metrics:
-            current_app.logger.error(f"Failed to fetch metrics: {metrics['error']}")
+            logger.error("Failed to fetch metrics: %s", metrics['error'])
             return render_template(
                 'admin.html',
                 admin_active_page='dashboard',  # Changed from active_page to admin_active_page
@@ -41,7 +92,7 @@ def dashboard():
                 'session_user': session.get('user', {})
             }
         }
-        current_app.logger.debug(f"Dashboard debug info: {debug_info}")
+        logger.debug("Dashboard debug info: %s", debug_info)
         
         return render_template(
             'admin.html',
@@ -51,7 +102,7 @@ def dashboard():
             debug_info=debug_info
         )
     except Exception as e:
-        current_app.logger.error(f"Dashboard error: {str(e)}", exc_info=True)
+        logger.error("Dashboard error: %s", e, exc_info=True)
         return render_template(
             'admin.html',
             admin_active_page='dashboard',  # Changed from active_page
@@ -63,61 +114,66 @@ def dashboard():
 @admin_required
 def api_metrics():
     try:
-        current_app.logger.info("API metrics route accessed")
+        logger.info("API metrics route accessed")
         metrics = get_dashboard_metrics()
         if 'error' in metrics:
-            current_app.logger.error(f"Failed to fetch metrics: {metrics['error']}")
+            logger.error("Failed to fetch metrics: %s", metrics['error'])
             return jsonify({'error': metrics['error']}), 500
         return jsonify(metrics)
     except Exception as e:
-        current_app.logger.error(f"API metrics error: {str(e)}", exc_info=True)
+        logger.error("API metrics error: %s", e, exc_info=True)
         return jsonify({'error': str(e)}), 500
 
-@admin_bp.route('/users')
+@admin_bp.route('/api/analytics', methods=['GET'])
 @admin_required
-def users():
+def api_analytics():
     try:
-        current_app.logger.info("Users route accessed")
-        users_list = get_users('')
-        if 'error' in users_list:
-            current_app.logger.error(f"Failed to fetch users: {users_list['error']}")
-            return render_template(
-                'admin.html',
-                admin_active_page='users',  # Changed from active_page
-                error_message=f"Failed to load users: {users_list['error']}",
-                users=[],
-                metrics={}
-            )
-        return render_template(
-            'admin.html',
-            admin_active_page='users',  # Changed from active_page
-            users=users_list,
-            metrics={},
-            error_message=None
-        )
+        try:
+            end = date.fromisoformat(request.args['end']) if request.args.get('end') else date.today()
+            start = date.fromisoformat(request.args['start']) if request.args.get('start') else end - timedelta(days=29)
+        except ValueError:
+            return jsonify({'error': 'start and end must be YYYY-MM-DD'}), 400
+        if start > end or (end - start).days > 366:
+            return jsonify({'error': 'Date range must be between 1 and 367 days'}), 400
+        top = min(max(request.args.get('top', 20, type=int), 1), 100)
+        analytics = get_sales_analytics(start, end, top)
+        if 'error' in analytics:
+            logger.error("Failed to fetch analytics: %s", analytics['error'])
+            return jsonify({'error': analytics['error']}), 500
+        return jsonify(analytics)
     except Exception as e:
-        current_app.logger.error(f"Users page error: {str(e)}", exc_info=True)
-        return render_template(
-            'admin.html',
-            admin_active_page='users',  # Changed from active_page
-            error_message=f"An error occurred: {str(e)}",
-            users=[],
-            metrics={}
-        )
+        logger.error("API analytics error: %s", e, exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/users')
+@admin_required
+def users():
+    # The table is filled page by page from /admin/api/users by admin.js
+    logger.info("Users route accessed")
+    return render_template(
+        'admin.html',
+        admin_active_page='users',
+        users=[],
+        metrics={},
+        error_message=None
+    )
 
 @admin_bp.route('/api/users', methods=['GET'])
 @admin_required
 def api_users():
     try:
-        current_app.logger.info("API users route accessed")
-        search = request.args.get('search', '')
-        users = get_users(search)
+        logger.info("API users route accessed")
+        try:
+            args = list_args('email', 'asc')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        users = get_users(**args)
         if 'error' in users:
-            current_app.logger.error(f"Failed to fetch users: {users['error']}")
+            logger.error("Failed to fetch users: %s", users['error'])
             return jsonify({'error': users['error']}), 500
         return jsonify(users)
     except Exception as e:
-        current_app.logger.error(f"API users error: {str(e)}", exc_info=True)
+        logger.error("API users error: %s", e, exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/users/update', methods=['POST'])
@@ -141,7 +197,7 @@ def update_user_route():
         
         return jsonify({'status': 'success', 'message': 'User updated successfully'})
     except Exception as e:
-        current_app.logger.error(f"Update user error: {str(e)}")
+        logger.error("Update user error: %s", e)
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 # Add this new route for user deletion
@@ -162,54 +218,76 @@ def delete_user_route():
             return jsonify({'status': 'error', 'message': result['error']}), 400
         return jsonify({'status': 'success', 'message': 'User deleted successfully'})
     except Exception as e:
-        current_app.logger.error(f"Delete user error: {str(e)}", exc_info=True)
+        logger.error("Delete user error: %s", e, exc_info=True)
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-@admin_bp.route('/artworks')
+@admin_bp.route('/users/bulk-role', methods=['POST'])
 @admin_required
-def artworks():
+def bulk_user_role_route():
     try:
-        current_app.logger.info("Artworks route accessed")
-        artworks_list = get_artworks('')
-        if 'error' in artworks_list:
-            current_app.logger.error(f"Failed to fetch artworks: {artworks_list['error']}")
-            return render_template(
-                'admin.html',
-                admin_active_page='artworks',  # Changed from active_page
-                error_message=f"Failed to load artworks: {artworks_list['error']}",
-                artworks=[],
-                metrics={}
-            )
-        return render_template(
-            'admin.html',
-            admin_active_page='artworks',  # Changed from active_page
-            artworks=artworks_list,
-            metrics={},
-            error_message=None
-        )
+        data = request.get_json(silent=True)
+        try:
+            emails = bulk_ids(data, 'emails', normalize_email)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        role = data.get('role')
+        if role not in USER_ROLES:
+            return jsonify({'status': 'error', 'message': f"Role must be one of {', '.join(USER_ROLES)}"}), 400
+        if role != 'admin' and normalize_email(session['user']['email']) in emails:
+            return jsonify({'status': 'error', 'message': 'You cannot remove your own admin role'}), 400
+        result = update_user_roles(emails, role)
+        if 'error' in result:
+            return jsonify({'status': 'error', 'message': result['error']}), 400
+        return jsonify(result)
     except Exception as e:
-        current_app.logger.error(f"Artworks page error: {str(e)}", exc_info=True)
-        return render_template(
-            'admin.html',
-            admin_active_page='artworks',  # Changed from active_page
-            error_message=f"An error occurred: {str(e)}",
-            artworks=[],
-            metrics={}
-        )
+        logger.error("Bulk user role error: %s", e, exc_info=True)
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@admin_bp.route('/artists/bulk-approve', methods=['POST'])
+@admin_required
+def bulk_approve_artists_route():
+    try:
+        try:
+            emails = bulk_ids(request.get_json(silent=True), 'emails', normalize_email)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        result = approve_artists(emails)
+        if 'error' in result:
+            return jsonify({'status': 'error', 'message': result['error']}), 400
+        return jsonify(result)
+    except Exception as e:
+        logger.error("Bulk approve artists error: %s", e, exc_info=True)
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@admin_bp.route('/artworks')
+@admin_required
+def artworks():
+    # The table is filled page by page from /admin/api/artworks by admin.js
+    logger.info("Artworks route accessed")
+    return render_template(
+        'admin.html',
+        admin_active_page='artworks',
+        artworks=[],
+        metrics={},
+        error_message=None
+    )
 
 @admin_bp.route('/api/artworks', methods=['GET'])
 @admin_required
 def api_artworks():
     try:
-        current_app.logger.info("API artworks route accessed")
-        search = request.args.get('search', '')
-        artworks = get_artworks(search)
+        logger.info("API artworks route accessed")
+        try:
+            args = list_args('created_at', 'desc')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        artworks = get_artworks(**args)
         if 'error' in artworks:
-            current_app.logger.error(f"Failed to fetch artworks: {artworks['error']}")
+            logger.error("Failed to fetch artworks: %s", artworks['error'])
             return jsonify({'error': artworks['error']}), 500
         return jsonify(artworks)
     except Exception as e:
-        current_app.logger.error(f"API artworks error: {str(e)}", exc_info=True)
+        logger.error("API artworks error: %s", e, exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/artworks/update', methods=['POST'])
@@ -227,7 +305,7 @@ def update_artwork_route():
             return jsonify({'status': 'error', 'message': result['error']}), 400
         return jsonify({'status': 'success', 'message': 'Artwork updated successfully'})
     except Exception as e:
-        current_app.logger.error(f"Update artwork error: {str(e)}", exc_info=True)
+        logger.error("Update artwork error: %s", e, exc_info=True)
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 @admin_bp.route('/artworks/delete', methods=['POST'])
@@ -243,78 +321,96 @@ def delete_artwork_route():
             return jsonify({'status': 'error', 'message': result['error']}), 400
         return jsonify({'status': 'success', 'message': 'Artwork deleted successfully'})
     except Exception as e:
-        current_app.logger.error(f"Delete artwork error: {str(e)}", exc_info=True)
+        logger.error("Delete artwork error: %s", e, exc_info=True)
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-@admin_bp.route('/orders')
+@admin_bp.route('/artworks/bulk-delete', methods=['POST'])
 @admin_required
-def orders():
+def bulk_delete_artworks_route():
     try:
-        current_app.logger.info("Orders route accessed")
-        orders_list = get_orders('')
-        if 'error' in orders_list:
-            current_app.logger.error(f"Failed to fetch orders: {orders_list['error']}")
-            return render_template(
-                'admin.html',
-                admin_active_page='orders',  # Changed from active_page
-                error_message=f"Failed to load orders: {orders_list['error']}",
-                orders=[],
-                metrics={}
-            )
-        return render_template(
-            'admin.html',
-            admin_active_page='orders',  # Changed from active_page
-            orders=orders_list,
-            metrics={},
-            error_message=None
-        )
+        try:
+            art_ids = bulk_ids(request.get_json(silent=True), 'ids', int)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        result = delete_artworks(art_ids)
+        if 'error' in result:
+            return jsonify({'status': 'error', 'message': result['error']}), 400
+        return jsonify(result)
     except Exception as e:
-        current_app.logger.error(f"Orders page error: {str(e)}", exc_info=True)
-        return render_template(
-            'admin.html',
-            admin_active_page='orders',  # Changed from active_page
-            error_message=f"An error occurred: {str(e)}",
-            orders=[],
-            metrics={}
-        )
+        logger.error("Bulk delete artworks error: %s", e, exc_info=True)
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@admin_bp.route('/orders')
+@admin_required
+def orders():
+    # The table is filled page by page from /admin/api/orders by admin.js
+    logger.info("Orders route accessed")
+    return render_template(
+        'admin.html',
+        admin_active_page='orders',
+        orders=[],
+        metrics={},
+        error_message=None
+    )
 
 @admin_bp.route('/api/orders', methods=['GET'])
 @admin_required
 def api_orders():
     try:
-        current_app.logger.info("API orders route accessed")
-        search = request.args.get('search', '')
-        orders = get_orders(search)
+        logger.info("API orders route accessed")
+        try:
+            args = list_args('order_date', 'desc')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        orders = get_orders(**args)
         if 'error' in orders:
-            current_app.logger.error(f"Failed to fetch orders: {orders['error']}")
+            logger.error("Failed to fetch orders: %s", orders['error'])
             return jsonify({'error': orders['error']}), 500
         return jsonify(orders)
     except Exception as e:
-        current_app.logger.error(f"API orders error: {str(e)}", exc_info=True)
+        logger.error("API orders error: %s", e, exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/api/orders/details', methods=['GET'])
+@admin_required
+def api_orders_details():
+    try:
+        raw_ids = [part for value in request.args.getlist('ids') for part in value.split(',') if part]
+        try:
+            order_ids = bulk_ids({'ids': raw_ids}, 'ids', int)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        details = get_orders_details(order_ids)
+        if 'error' in details:
+            logger.error("Failed to fetch order details: %s", details['error'])
+            return jsonify({'error': details['error']}), 500
+        return jsonify(details)
+    except Exception as e:
+        logger.error("API order details error: %s", e, exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/orders/details/<int:order_id>', methods=['GET'])
 @admin_required
 def order_details_route(order_id):
     try:
-        current_app.logger.info(f"Order details route accessed for order_id: {order_id}")
+        logger.info("Order details route accessed for order_id: %s", order_id)
         order = get_order_details(order_id)
         if 'error' in order:
-            current_app.logger.error(f"Failed to fetch order details: {order['error']}")
+            logger.error("Failed to fetch order details: %s", order['error'])
             return jsonify({'status': 'error', 'message': order['error']}), 400
         return jsonify({'status': 'success', 'order': order})
     except Exception as e:
-        current_app.logger.error(f"Order details error: {str(e)}", exc_info=True)
+        logger.error("Order details error: %s", e, exc_info=True)
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 @admin_bp.route('/settings')
 @admin_required
 def settings():
     try:
-        current_app.logger.info("Settings route accessed")
+        logger.info("Settings route accessed")
         settings_data = get_settings()
         if 'error' in settings_data:
-            current_app.logger.error(f"Failed to fetch settings: {settings_data['error']}")
+            logger.error("Failed to fetch settings: %s", settings_data['error'])
             return render_template(
                 'admin.html',
                 admin_active_page='settings',  # Changed from active_page
@@ -330,7 +426,7 @@ def settings():
             error_message=None
         )
     except Exception as e:
-        current_app.logger.error(f"Settings error: {str(e)}", exc_info=True)
+        logger.error("Settings error: %s", e, exc_info=True)
         return render_template(
             'admin.html',
             admin_active_page='settings',  # Changed from active_page
@@ -343,28 +439,63 @@ def settings():
 @admin_required
 def update_settings_route():
     try:
-        current_app.logger.info("Update settings route accessed")
+        logger.info("Update settings route accessed")
         artist_approval = '1' if request.form.get('setting_artist_approval') == '1' else '0'
         result = update_settings({'artist_approval': artist_approval})
         if 'error' in result:
-            current_app.logger.error(f"Failed to update settings: {result['error']}")
+            logger.error("Failed to update settings: %s", result['error'])
             return jsonify({'status': 'error', 'message': result['error']}), 400
         return jsonify({'status': 'success', 'message': 'Settings updated successfully'})
     except Exception as e:
-        current_app.logger.error(f"Update settings error: {str(e)}", exc_info=True)
+        logger.error("Update settings error: %s", e, exc_info=True)
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@admin_bp.route('/export/<name>', methods=['GET'])
+@admin_required
+def export_route(name):
+    fmt = request.args.get('format', 'csv')
+    gzip = request.args.get('gzip') == '1'
+    try:
+        return export_response(name, fmt, gzip)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+    except ExportBusy:
+        response = jsonify({'error': 'Too many exports running, try again shortly'})
+        response.headers['Retry-After'] = '30'
+        return response, 429
+    except Exception as e:
+        logger.error("Export error: %s", e, exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/api/jobs', methods=['GET'])
+@admin_required
+def api_jobs():
+    try:
+        jobs = get_job_runs()
+        if 'error' in jobs:
+            logger.error("Failed to fetch job runs: %s", jobs['error'])
+            return jsonify({'error': jobs['error']}), 500
+        return jsonify(jobs)
+    except Exception as e:
+        logger.error("API jobs error: %s", e, exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
 @admin_bp.route('/debug')
 @admin_required
 def debug():
     try:
-        current_app.logger.info("Debug route accessed")
+        logger.info("Debug route accessed")
         metrics = get_dashboard_metrics()
         debug_info = {
             'session_user': session.get('user', {}),
             'template_exists': current_app.jinja_env.get_template('admin.html') is not None,
             'routes': [rule.endpoint for rule in current_app.url_map.iter_rules() if rule.endpoint.startswith('admin')],
-            'metrics': metrics
+            'metrics': metrics,
+            'user_cache': get_user_cache_stats(),
+            'settings_cache': current_app.settings_service.info(),
+            'db_pool': current_app.db_pool.status(),
+            'jobs': get_job_runs(),
+            'slow_queries': get_slow_query_report()
         }
         return render_template(
             'admin.html',
@@ -375,7 +506,7 @@ def debug():
             error_message=None
         )
     except Exception as e:
-        current_app.logger.error(f"Debug error: {str(e)}", exc_info=True)
+        logger.error("Debug error: %s", e, exc_info=True)
         return jsonify({
             'error': str(e),
             'session_user': session.get('user', {})
@@ -9,6 +9,7 @@ from models.artist_dashboard_queries import (
     delete_artwork_for_artist,
     update_artwork_price
 )
+from models.user_queries import get_user_by_email
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -23,6 +24,12 @@ def artist_required(f):
         if 'user' not in session or session['user'].get('role') != 'artist':
             flash('You must be logged in as an artist to access this page.')
             return redirect(url_for('auth.login'))
+        # The session role may be stale; check it against the (cached) user row
+        user = get_user_by_email(session['user']['email'])
+        if not user or user['role'] != 'artist':
+            session.pop('user', None)
+            flash('You must be logged in as an artist to access this page.')
+            return redirect(url_for('auth.login'))
         return f(*args, **kwargs)
     return decorated_function
 
@@ -1,8 +1,10 @@
 from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for, current_app
-from models.user_queries import add_user, get_user_by_email, upgrade_to_artist
+from models.user_queries import add_user, get_user_by_email, get_user_for_login, upgrade_to_artist, update_password_hash
 from models.otp_queries import generate_otp, store_otp, verify_otp, cleanup_expired_otp
 from services.email_service import EmailService
-from werkzeug.security import check_password_hash
+from services.rate_limiter import rate_limit
+from services.password_service import verify_password, needs_rehash, hash_password
+from services.session_store import regenerate_session
 
 # Initialize Blueprint
 auth_bp = Blueprint('auth', __name__, template_folder='templates')
@@ -38,6 +40,7 @@ def signup():
         return jsonify({"status": "error", "message": "Internal server error"}), 500
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit('login')
 def login():
     try:
         email = request.form.get('email')
@@ -46,9 +49,14 @@ def login():
         if not all([email, password]):
             return jsonify({"status": "error", "message": "Email and password are required!"}), 400
 
-        user = get_user_by_email(email)
+        user = get_user_for_login(email)
         
-        if user and check_password_hash(user['password'], password):
+        if user and verify_password(user['password'], password):
+            # Upgrade hashes made with older parameters while we have the plaintext
+            if needs_rehash(user['password']):
+                update_password_hash(user['email'], hash_password(password))
+
+            regenerate_session(session)
             session['user'] = {
                 'name': user['name'],
                 'email': user['email'],
@@ -86,6 +94,7 @@ def admin_login_page():
 def logout():
     # print("Logout route reached")
     session.pop('user', None)
+    regenerate_session(session)
     return jsonify({'status': 'success', 'message': 'Logged out successfully'})
 
 @auth_bp.route('/upgrade-to-artist', methods=['POST'])
@@ -98,6 +107,8 @@ def upgrade_to_artist_route():
 
     if "message" in result:
         session['user']['role'] = 'artist'
+        # Nested changes aren't detected, so flag the session for saving
+        session.modified = True
         return jsonify({'status': 'success', 'message': result["message"]})
     return jsonify({'status': 'error', 'message': result.get("error", "An error occurred.")}), 400
 
@@ -114,6 +125,7 @@ def signup_page():
     return render_template('auth/signup.html')
 
 @auth_bp.route('/send-otp', methods=['POST'])
+@rate_limit('send_otp')
 def send_otp():
     try:
         data = request.get_json()
@@ -135,12 +147,12 @@ def send_otp():
         if store_result.get('status') != 'success':
             return jsonify({"status": "error", "message": "Failed to generate OTP"}), 500
 
-        # Send OTP email
+        # Queue OTP email for the background sender
         email_service = EmailService()
-        email_result = email_service.send_otp_email(email, otp_code, user.get('name', ''))
+        email_result = email_service.queue_otp_email(email, otp_code, user.get('name', ''))
         
         if email_result.get('status') == 'success':
-            current_app.logger.info(f"OTP sent successfully to {email}")
+            current_app.logger.info(f"OTP queued for {email}")
             return jsonify({
                 "status": "success",
                 "message": "OTP sent successfully to your email"
@@ -156,6 +168,7 @@ def send_otp():
         return jsonify({"status": "error", "message": "Internal server error"}), 500
 
 @auth_bp.route('/verify-otp', methods=['POST'])
+@rate_limit('verify_otp')
 def verify_otp_login():
     try:
         data = request.get_json()
@@ -175,7 +188,8 @@ def verify_otp_login():
         if not user:
             return jsonify({"status": "error", "message": "User not found"}), 404
 
-        # Create session
+        # Create session under a new ID so one planted before login is useless
+        regenerate_session(session)
         session['user'] = {
             'name': user['name'],
             'email': user['email'],
@@ -202,6 +216,7 @@ def verify_otp_login():
         return jsonify({"status": "error", "message": "Internal server error"}), 500
 
 @auth_bp.route('/send-signup-otp', methods=['POST'])
+@rate_limit('send_signup_otp')
 def send_signup_otp():
     try:
         data = request.get_json()
@@ -224,12 +239,12 @@ def send_signup_otp():
         if store_result.get('status') != 'success':
             return jsonify({"status": "error", "message": "Failed to generate OTP"}), 500
 
-        # Send OTP email
+        # Queue OTP email for the background sender
         email_service = EmailService()
-        email_result = email_service.send_otp_email(email, otp_code, name)
+        email_result = email_service.queue_otp_email(email, otp_code, name)
         
         if email_result.get('status') == 'success':
-            current_app.logger.info(f"Signup OTP sent successfully to {email}")
+            current_app.logger.info(f"Signup OTP queued for {email}")
             return jsonify({
                 "status": "success",
                 "message": "OTP sent successfully to your email"
@@ -245,6 +260,7 @@ def send_signup_otp():
         return jsonify({"status": "error", "message": "Internal server error"}), 500
 
 @auth_bp.route('/verify-signup-otp', methods=['POST'])
+@rate_limit('verify_otp')
 def verify_signup_otp():
     try:
         data = request.get_json()
@@ -271,9 +287,9 @@ def verify_signup_otp():
         if "error" in add_result:
             return jsonify({"status": "error", "message": add_result["error"]}), 500
 
-        # Send welcome email
+        # Queue welcome email for the background sender
         email_service = EmailService()
-        email_service.send_welcome_email(email, name)
+        email_service.queue_welcome_email(email, name)
         
         current_app.logger.info(f"Account created successfully for {email}")
         return jsonify({
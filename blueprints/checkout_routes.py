@@ -1,9 +1,13 @@
 import logging
 import json
+from datetime import datetime
 from decimal import Decimal
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app
 from models.cart_queries import get_cart_items, clear_cart
-from models.checkout_queries import add_shipping_info, create_order_and_get_id, add_order_items
+from models.checkout_queries import (
+    add_shipping_info, create_order_and_get_id, add_order_items,
+    get_order_with_items, get_orders_for_user
+)
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -25,13 +29,13 @@ def checkout_page():
                 cart_json = request.args.get('cart')
                 session['cart'] = json.loads(cart_json)
             except Exception as e:
-                logger.error(f"Cart JSON decode error for {session['user']['email']}: {e}")
+                logger.error("Cart JSON decode error for %s: %s", session['user']['email'], e)
 
         # Prefer session cart, fall back to DB
         cart_items = session.get('cart') or get_cart_items(session['user']['email'])
 
         if isinstance(cart_items, dict) and 'error' in cart_items:
-            logger.error(f"❌ Error fetching cart for {session['user']['email']}: {cart_items['error']}")
+            logger.error("❌ Error fetching cart for %s: %s", session['user']['email'], cart_items['error'])
             flash("Failed to retrieve cart items.")
             return redirect(url_for('cart.view_cart'))
 
@@ -42,13 +46,13 @@ def checkout_page():
         # Validate cart item structure
         required_keys = {'art_id', 'price', 'quantity', 'title', 'image_path'}
         if not all(required_keys.issubset(item) for item in cart_items):
-            logger.error(f"Invalid cart item structure for {session['user']['email']}")
+            logger.error("Invalid cart item structure for %s", session['user']['email'])
             flash("Invalid cart data.")
             return redirect(url_for('cart.view_cart'))
 
         # Validate quantity type
         if not all(isinstance(item['quantity'], int) for item in cart_items):
-            logger.error(f"Invalid quantity type in cart for {session['user']['email']}")
+            logger.error("Invalid quantity type in cart for %s", session['user']['email'])
             flash("Invalid cart data.")
             return redirect(url_for('cart.view_cart'))
 
@@ -56,7 +60,7 @@ def checkout_page():
         try:
             subtotal = sum(Decimal(str(item['price'])) * item['quantity'] for item in cart_items)
         except ValueError as e:
-            logger.error(f"Invalid price format for {session['user']['email']}: {e}")
+            logger.error("Invalid price format for %s: %s", session['user']['email'], e)
             flash("Invalid cart data. Please try again.")
             return redirect(url_for('cart.view_cart'))
 
@@ -74,7 +78,7 @@ def checkout_page():
         )
 
     except Exception as e:
-        logger.error(f"Checkout error for {session['user']['email']}: {e}")
+        logger.error("Checkout error for %s: %s", session['user']['email'], e)
         flash("Checkout failed. Please try again.")
         return redirect(url_for('cart.view_cart'))
 
@@ -99,14 +103,14 @@ def process_shipping():
             'country': request.form.get('country')
         }
 
-        logger.info(f"Received shipping form: {shipping_data}")
+        logger.debug("Received shipping form for %s", session['user']['email'])
 
         # Validate required fields
         required_fields = ['firstName', 'lastName', 'email', 'phone', 'address', 'city', 'state', 'zipCode', 'country']
         missing_fields = [field for field in required_fields if not shipping_data.get(field)]
         
         if missing_fields:
-            logger.info(f"Missing required fields: {missing_fields}")
+            logger.info("Missing required fields: %s", missing_fields)
             return jsonify({"error": "Please fill in all required fields"}), 400
 
         # Store shipping data in session for payment step
@@ -118,7 +122,7 @@ def process_shipping():
         }), 200
 
     except Exception as e:
-        logger.error(f"🔥 Error processing shipping info: {e}")
+        logger.error("🔥 Error processing shipping info: %s", e)
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
 
 # Process payment (fake payment system)
@@ -140,10 +144,9 @@ def process_payment():
             'cardName': request.form.get('cardName')
         }
 
-        logger.info(f"Processing payment for {session['user']['email']}")
-        logger.info(f"Payment data received: {payment_data}")
-        logger.info(f"Session shipping data: {session.get('shipping_data')}")
-        logger.info(f"Session cart: {session.get('cart')}")
+        # Never log the payment fields or the session contents, only their shape
+        logger.info("Processing %s payment for %s", payment_data['method'], session['user']['email'],
+                    extra={'session_cart_items': len(session.get('cart') or [])})
 
         # Validate payment data
         if not payment_data['method']:
@@ -190,14 +193,14 @@ def process_payment():
                     # Clear cart
                     clear_result = clear_cart(session['user']['email'])
                     if 'error' in clear_result:
-                        logger.error(f"Failed to clear cart: {clear_result['error']}")
+                        logger.error("Failed to clear cart: %s", clear_result['error'])
                     else:
-                        logger.info(f"Cart cleared successfully for {session['user']['email']}")
+                        logger.info("Cart cleared successfully for %s", session['user']['email'])
                     
                     session.pop('cart', None)
                     session.pop('shipping_data', None)
 
-                    logger.info(f"Order created successfully: {order_id}")
+                    logger.info("Order created successfully: %s", order_id)
                     
                     return jsonify({
                         "status": "success",
@@ -208,7 +211,7 @@ def process_payment():
                     return jsonify({"error": "Failed to create order"}), 500
 
             except Exception as e:
-                logger.error(f"Error creating order: {e}")
+                logger.error("Error creating order: %s", e)
                 return jsonify({"error": "Failed to process order"}), 500
 
         else:
@@ -216,7 +219,7 @@ def process_payment():
             return jsonify({"error": "Payment failed. Please try again."}), 400
 
     except Exception as e:
-        logger.error(f"Payment processing error: {e}")
+        logger.error("Payment processing error: %s", e)
         return jsonify({"error": "An error occurred during payment processing"}), 500
 
 # Get order confirmation
@@ -226,14 +229,63 @@ def order_confirmation(order_id):
         return redirect(url_for('auth.login'))
 
     try:
-        # In a real application, you would fetch order details from database
-        # For now, we'll just show a success page
-        return render_template('order_confirmation.html', order_id=order_id)
+        order = get_order_with_items(order_id, session['user']['email'])
+
+        if order is None:
+            flash("Order not found.")
+            return redirect(url_for('home'))
+
+        if 'error' in order:
+            logger.error("Error fetching order %s: %s", order_id, order['error'])
+            flash("Error loading order confirmation.")
+            return redirect(url_for('home'))
+
+        return render_template('order_confirmation.html', order_id=order_id, order=order)
     except Exception as e:
-        logger.error(f"Error showing order confirmation: {e}")
+        logger.error("Error showing order confirmation: %s", e)
         flash("Error loading order confirmation.")
         return redirect(url_for('home'))
 
+# Order history for the logged-in user, paged by (order_date, order_id)
+@checkout_bp.route('/orders', methods=['GET'])
+def order_history():
+    if 'user' not in session:
+        return jsonify({"error": "Login required to view orders"}), 401
+
+    try:
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        before_date = request.args.get('before_date')
+        before_id = request.args.get('before_id', type=int)
+
+        if before_date:
+            try:
+                before_date = datetime.fromisoformat(before_date)
+            except ValueError:
+                return jsonify({"error": "Invalid before_date"}), 400
+
+        result = get_orders_for_user(session['user']['email'], before_date, before_id, limit)
+        if 'error' in result:
+            logger.error("Error fetching orders for %s: %s", session['user']['email'], result['error'])
+            return jsonify({"error": "Failed to fetch orders"}), 500
+
+        orders = result['orders']
+        next_cursor = None
+        if result['has_more'] and orders:
+            last = orders[-1]
+            next_cursor = {
+                "before_date": last['order_date'].isoformat(),
+                "before_id": last['order_id']
+            }
+
+        return jsonify({
+            "status": "success",
+            "orders": orders,
+            "next_cursor": next_cursor
+        }), 200
+    except Exception as e:
+        logger.error("Error fetching order history: %s", e)
+        return jsonify({"error": "An error occurred while fetching orders"}), 500
+
 # Debug route to check cart status
 @checkout_bp.route('/debug/cart_status')
 def debug_cart_status():
@@ -250,7 +302,7 @@ def debug_cart_status():
             "session_shipping": session.get('shipping_data')
         })
     except Exception as e:
-        logger.error(f"Error checking cart status: {e}")
+        logger.error("Error checking cart status: %s", e)
         return jsonify({"error": str(e)}), 500
 
 # Register the Blueprint
@@ -24,6 +24,151 @@ class Config:
         'database': os.getenv('DB_NAME', 'online_art_gallery_database_final')
     }
 
+    # Optional read replica for read-only query functions (models/database.get_read_connection).
+    # Unset DB_REPLICA_HOST to send every query to the primary. After a write, a client's
+    # reads stay on the primary for DB_REPLICA_STICKY_SECONDS to cover replication lag.
+    DB_REPLICA_CONFIG = {
+        'host': os.getenv('DB_REPLICA_HOST'),
+        'port': int(os.getenv('DB_REPLICA_PORT', 3306)),
+        'user': os.getenv('DB_REPLICA_USER', os.getenv('DB_USER', 'root')),
+        'password': os.getenv('DB_REPLICA_PASSWORD', os.getenv('DB_PASSWORD', '')),
+        'database': os.getenv('DB_REPLICA_NAME', os.getenv('DB_NAME', 'online_art_gallery_database_final'))
+    } if os.getenv('DB_REPLICA_HOST') else None
+    DB_REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', 5))
+
+    # Connection pool: kept connections, extra connections under load, seconds a checkout
+    # waits for a free connection, max connection age, and ping-before-use of idle connections
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_POOL_MAX_OVERFLOW = int(os.getenv('DB_POOL_MAX_OVERFLOW', 5))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))
+    DB_POOL_MAX_AGE = int(os.getenv('DB_POOL_MAX_AGE', 1800))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', '1') == '1'
+    # Prepared statements (prepared=True queries) kept per connection; least recently used are closed first
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', 64))
+
+    # Logging goes through a bounded queue to one writer thread; a full queue drops records
+    # instead of blocking requests. LOG_FORMAT is 'json' (one object per line) or 'text'.
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+    # Share of INFO/DEBUG records kept per logger, e.g. 'blueprints.cart_routes=0.1,werkzeug=0.5'
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')
+    # Records per second each logger may emit below ERROR (0 = unlimited)
+    LOG_RATE_LIMIT = float(os.getenv('LOG_RATE_LIMIT', 50))
+
+    # Request timing: share of requests instrumented (0 disables), whether they get a
+    # Server-Timing header, and how often one statement may repeat before it is flagged as N+1
+    REQUEST_TIMING_SAMPLE_RATE = float(os.getenv('REQUEST_TIMING_SAMPLE_RATE', 0.1))
+    REQUEST_TIMING_HEADER = os.getenv('REQUEST_TIMING_HEADER', '1') == '1'
+    REQUEST_TIMING_REPEAT_THRESHOLD = int(os.getenv('REQUEST_TIMING_REPEAT_THRESHOLD', 5))
+
+    # Slow query log: statements slower than SLOW_QUERY_MS (0 disables) are logged and kept in
+    # memory for the admin debug page, which EXPLAINs the SLOW_QUERY_EXPLAIN_TOP worst of them
+    SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', 200))
+    SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', 100))
+    SLOW_QUERY_EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', '1') == '1'
+    SLOW_QUERY_EXPLAIN_TOP = int(os.getenv('SLOW_QUERY_EXPLAIN_TOP', 5))
+
+    # Prometheus metrics at /metrics. Every worker writes its values to its own file in
+    # METRICS_DIR (default: a directory under the system temp dir) and a scrape sums them.
+    # Scrapes must send 'Authorization: Bearer <METRICS_TOKEN>'; without a token /metrics refuses them.
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+    METRICS_DIR = os.getenv('METRICS_DIR')
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    # Seconds between updates of a worker's pool and cache gauges
+    METRICS_PUBLISH_INTERVAL = float(os.getenv('METRICS_PUBLISH_INTERVAL', 5))
+
+    # Response compression for HTML, JSON and other text bodies of at least COMPRESSION_MIN_SIZE
+    # bytes. Brotli is offered only when the brotli package is installed.
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', '1') == '1'
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+
     # Email configuration
     SENDER_EMAIL = os.getenv('SENDER_EMAIL', 'your-email@gmail.com')
-    SENDER_PASSWORD = os.getenv('SENDER_PASSWORD', 'your-app-password')
\ No newline at end of file
+    SENDER_PASSWORD = os.getenv('SENDER_PASSWORD', 'your-app-password')
+
+    # SMTP server; point at a local stand-in (e.g. `python -m aiosmtpd -n -l localhost:1025`)
+    # with SMTP_USE_TLS=0 and SMTP_LOGIN=0 for testing
+    SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
+    SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
+    SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', '1') == '1'
+    SMTP_LOGIN = os.getenv('SMTP_LOGIN', '1') == '1'
+    # Seconds an SMTP session may sit idle before it is probed or closed
+    SMTP_IDLE_TIMEOUT = int(os.getenv('SMTP_IDLE_TIMEOUT', 60))
+    # Seconds each SMTP operation may block; outbox leases last at least four times this
+    SMTP_TIMEOUT = int(os.getenv('SMTP_TIMEOUT', 30))
+
+    # Email outbox sender
+    EMAIL_OUTBOX_WORKER = os.getenv('EMAIL_OUTBOX_WORKER', '1') == '1'
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 20))
+    EMAIL_OUTBOX_POLL_SECONDS = int(os.getenv('EMAIL_OUTBOX_POLL_SECONDS', 5))
+    EMAIL_OUTBOX_LEASE_SECONDS = int(os.getenv('EMAIL_OUTBOX_LEASE_SECONDS', 120))
+    EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', 5))
+    EMAIL_RETRY_BASE_SECONDS = int(os.getenv('EMAIL_RETRY_BASE_SECONDS', 30))
+    # Days sent and failed emails are kept before the scheduler deletes them, and seconds between purges
+    EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv('EMAIL_OUTBOX_RETENTION_DAYS', 7))
+    EMAIL_OUTBOX_PURGE_INTERVAL = int(os.getenv('EMAIL_OUTBOX_PURGE_INTERVAL', 3600))
+
+    # OTP storage backend: 'mysql' (otp_codes table) or 'memory' (per-process)
+    OTP_STORE = os.getenv('OTP_STORE', 'mysql')
+
+    # Rate limiting: 'memory' (per process) or 'shared' (mmap file shared by all workers)
+    RATE_LIMIT_STORE = os.getenv('RATE_LIMIT_STORE', 'memory')
+    # Per endpoint scope: key type -> (requests, per seconds)
+    RATE_LIMITS = {
+        'login': {'ip': (20, 60), 'email': (5, 60)},
+        'send_otp': {'ip': (10, 600), 'email': (3, 600)},
+        'send_signup_otp': {'ip': (10, 600), 'email': (3, 600)},
+        # Login and signup codes share one budget, so guesses cannot be spread across both
+        'verify_otp': {'ip': (30, 600), 'email': (5, 600)},
+    }
+
+    # Password hashing (werkzeug method string, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000').
+    # Changing it rehashes each user's password on their next successful login.
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    # Processes used for hashing; 0 hashes on the request thread
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 64))
+
+    # Seconds a user row stays in the process-wide cache, and the most rows it holds
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 30))
+    USER_CACHE_MAX = int(os.getenv('USER_CACHE_MAX', 10000))
+
+    # Session storage: 'sqlite' (local file shared by workers), 'memory' (per process)
+    # or 'cookie' (Flask's signed cookie). Server-side backends keep only an ID in the cookie.
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'sqlite')
+    SESSION_SQLITE_PATH = os.getenv('SESSION_SQLITE_PATH', os.path.join(project_root, 'flask_session', 'sessions.sqlite3'))
+    SESSION_MEMORY_MAX = int(os.getenv('SESSION_MEMORY_MAX', 10000))
+    # Seconds between deletions of expired rows from the SQLite session file
+    SESSION_CLEANUP_INTERVAL = int(os.getenv('SESSION_CLEANUP_INTERVAL', 3600))
+
+    # Apply pending schema migrations (models/schema.py) at startup instead of only warning
+    SCHEMA_AUTO_MIGRATE = os.getenv('SCHEMA_AUTO_MIGRATE', '0') == '1'
+
+    # Seconds between checks of the settings version; a bump reloads every worker's snapshot
+    SETTINGS_CHECK_INTERVAL = int(os.getenv('SETTINGS_CHECK_INTERVAL', 5))
+
+    # Admin exports: rows fetched per round trip, and exports allowed to stream at once
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    EXPORT_MAX_CONCURRENT = int(os.getenv('EXPORT_MAX_CONCURRENT', 2))
+
+    # Reverse proxies in front of the app whose X-Forwarded-For/-Proto headers are trusted
+    # (werkzeug ProxyFix). 0 uses the socket peer as the client IP; never set it higher than
+    # the real number of proxies, or clients can choose their own IP for rate limiting.
+    TRUSTED_PROXY_HOPS = int(os.getenv('TRUSTED_PROXY_HOPS', 0))
+
+    # Start the scheduler and email outbox threads in create_app. A preloading server sets this
+    # to 0 and starts them in each worker after fork instead (see gunicorn.conf.py)
+    START_BACKGROUND_THREADS = os.getenv('START_BACKGROUND_THREADS', '1') == '1'
+
+    # Background maintenance scheduler
+    SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', '1') == '1'
+    OTP_CLEANUP_INTERVAL = int(os.getenv('OTP_CLEANUP_INTERVAL', 300))
+    OTP_CLEANUP_BATCH_SIZE = int(os.getenv('OTP_CLEANUP_BATCH_SIZE', 500))
+    # Seconds between full recounts of the admin dashboard counters
+    COUNTERS_RECONCILE_INTERVAL = int(os.getenv('COUNTERS_RECONCILE_INTERVAL', 3600))
+    # Sales rollups: seconds between rebuilds, and how many recent days each rebuild recomputes
+    SALES_ROLLUP_INTERVAL = int(os.getenv('SALES_ROLLUP_INTERVAL', 3600))
+    SALES_ROLLUP_WINDOW_DAYS = int(os.getenv('SALES_ROLLUP_WINDOW_DAYS', 3))
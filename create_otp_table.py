@@ -1,7 +1,10 @@
+import sys
 import mysql.connector
 from config.config import Config
+from models.schema import MIGRATIONS, SCHEMA_VERSION, ensure_version_table, get_schema_version, migrate
 
-def create_otp_table():
+def create_otp_table(target=None):
+    """Creates the OTP table and every other versioned table/index (see models/schema.py)."""
     try:
         # Connect to database
         conn = mysql.connector.connect(**Config.DB_CONFIG)
@@ -9,23 +12,15 @@ def create_otp_table():
         
         print("✅ Connected to database")
         
-        # Create OTP table
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS otp_codes (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            email VARCHAR(255) NOT NULL,
-            otp VARCHAR(6) NOT NULL,
-            expiry_time DATETIME NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            INDEX idx_email (email),
-            INDEX idx_expiry (expiry_time)
-        );
-        """
+        ensure_version_table(cursor)
+        print(f"ℹ️  Schema version: {get_schema_version(cursor)} (latest {SCHEMA_VERSION})")
         
-        cursor.execute(create_table_sql)
-        conn.commit()
-        
-        print("✅ OTP table created successfully")
+        applied = migrate(conn, target)
+        descriptions = dict((version, description) for version, description, _ in MIGRATIONS)
+        for version in applied:
+            print(f"✅ Applied migration {version}: {descriptions[version]}")
+        if not applied:
+            print("✅ Schema already up to date")
         
         # Verify table exists
         cursor.execute("SHOW TABLES LIKE 'otp_codes'")
@@ -41,4 +36,4 @@ def create_otp_table():
         print(f"❌ Error: {e}")
 
 if __name__ == "__main__":
-    create_otp_table() 
\ No newline at end of file
+    create_otp_table(int(sys.argv[1]) if len(sys.argv) > 1 else None)
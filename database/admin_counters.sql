@@ -0,0 +1,6 @@
+-- Dashboard counters maintained by user, art and approval writes (models/counter_queries.py)
+CREATE TABLE IF NOT EXISTS admin_counters (
+    counter_name VARCHAR(50) PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
@@ -0,0 +1,15 @@
+-- Seeds the dashboard counters from the base tables (models/counter_queries.py).
+-- bump_counter only adjusts existing rows, so every counter must be seeded here.
+INSERT INTO admin_counters (counter_name, value)
+SELECT 'total_users', COUNT(*) FROM users
+ON DUPLICATE KEY UPDATE value = VALUES(value);
+
+INSERT INTO admin_counters (counter_name, value)
+SELECT 'total_artworks', COUNT(*) FROM art
+ON DUPLICATE KEY UPDATE value = VALUES(value);
+
+INSERT INTO admin_counters (counter_name, value)
+SELECT 'pending_artists', COUNT(*) FROM users u
+WHERE u.role = 'artist'
+  AND NOT EXISTS (SELECT 1 FROM artists a WHERE a.email = u.email AND a.approved = 1)
+ON DUPLICATE KEY UPDATE value = VALUES(value);
@@ -0,0 +1,18 @@
+-- Indexes backing the paginated admin lists (models/admin_queries.py).
+-- Each index ends with the list's unique key so keyset pagination on
+-- (sort column, id) is a single range scan. users.email and art.art_id
+-- are primary keys, and orders(email, order_date, order_id) comes from
+-- order_indexes.sql.
+
+-- Users: sort by name/role, prefix search on name
+CREATE INDEX idx_users_name ON users (name, email);
+CREATE INDEX idx_users_role ON users (role, email);
+
+-- Artworks: sort by created_at/title/price, prefix search on title
+CREATE INDEX idx_art_created ON art (created_at, art_id);
+CREATE INDEX idx_art_title ON art (title, art_id);
+CREATE INDEX idx_art_price ON art (price, art_id);
+
+-- Orders: sort by date/total
+CREATE INDEX idx_orders_date ON orders (order_date, order_id);
+CREATE INDEX idx_orders_total ON orders (total_amount, order_id);
@@ -0,0 +1,14 @@
+-- Admin settings and artist approvals (models/admin_queries.py)
+CREATE TABLE IF NOT EXISTS settings (
+    setting_key VARCHAR(50) PRIMARY KEY,
+    setting_value TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS artists (
+    email VARCHAR(100) PRIMARY KEY,
+    bio TEXT,
+    profile_pic VARCHAR(255),
+    approved TINYINT DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,14 @@
+-- Outbox for emails sent by the background sender (services/email_outbox.py)
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    recipient VARCHAR(255) NOT NULL,
+    subject VARCHAR(255) NOT NULL,
+    html_body MEDIUMTEXT NOT NULL,
+    status ENUM('pending', 'sending', 'sent', 'failed') NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    next_attempt_at DATETIME NOT NULL,
+    last_error VARCHAR(500),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at DATETIME NULL,
+    INDEX idx_outbox_due (status, next_attempt_at)
+);
@@ -0,0 +1,7 @@
+-- Indexes backing per-user order history and order confirmation lookups
+
+-- Keyset pagination of a user's orders: WHERE email = ? ORDER BY order_date, order_id
+CREATE INDEX idx_orders_email_date ON orders (email, order_date, order_id);
+
+-- Loading the items of one order
+CREATE INDEX idx_order_items_order ON order_items (order_id);
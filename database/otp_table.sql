@@ -5,10 +5,12 @@ CREATE TABLE IF NOT EXISTS otp_codes (
     otp VARCHAR(6) NOT NULL,
     expiry_time DATETIME NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    INDEX idx_email (email),
+    UNIQUE KEY uq_otp_email (email),
     INDEX idx_expiry (expiry_time)
 );
 
+-- Installs created before the unique key get it from otp_unique_email.sql
+
 -- Optional: Add a cleanup event to automatically remove expired OTPs
 -- This requires MySQL Event Scheduler to be enabled
 -- CREATE EVENT IF NOT EXISTS cleanup_expired_otp
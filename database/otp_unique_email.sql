@@ -0,0 +1,8 @@
+-- Unique key on otp_codes.email for installs created before otp_table.sql
+-- declared it, so MySQLOTPStore.store's ON DUPLICATE KEY UPDATE replaces
+-- the previous OTP instead of adding another valid one. Keeps the newest
+-- row per email. On newer installs the key already exists and idx_email
+-- was never created; both statements are then skipped.
+DELETE o1 FROM otp_codes o1 JOIN otp_codes o2 ON o1.email = o2.email AND o1.id < o2.id;
+ALTER TABLE otp_codes ADD UNIQUE KEY uq_otp_email (email);
+ALTER TABLE otp_codes DROP INDEX idx_email;
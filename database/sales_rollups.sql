@@ -0,0 +1,27 @@
+-- Daily sales rollups maintained at checkout and rebuilt by the
+-- sales_rollups job (models/analytics_queries.py). Revenue is the sum of
+-- item prices at purchase, excluding shipping and tax.
+CREATE TABLE IF NOT EXISTS sales_daily (
+    day DATE PRIMARY KEY,
+    revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    units INT NOT NULL DEFAULT 0,
+    orders INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS sales_daily_artist (
+    day DATE NOT NULL,
+    artist_email VARCHAR(100) NOT NULL,
+    revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    units INT NOT NULL DEFAULT 0,
+    orders INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, artist_email)
+);
+
+CREATE TABLE IF NOT EXISTS sales_daily_category (
+    day DATE NOT NULL,
+    category VARCHAR(100) NOT NULL,
+    revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    units INT NOT NULL DEFAULT 0,
+    orders INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, category)
+);
@@ -0,0 +1,12 @@
+-- Last run of each background job (services/scheduler.py)
+CREATE TABLE IF NOT EXISTS scheduled_job_runs (
+    job_name VARCHAR(100) PRIMARY KEY,
+    last_started_at DATETIME,
+    last_finished_at DATETIME,
+    last_status VARCHAR(20),
+    last_duration_ms INT,
+    last_result VARCHAR(500),
+    last_runner VARCHAR(100),
+    run_count INT NOT NULL DEFAULT 0,
+    failure_count INT NOT NULL DEFAULT 0
+);
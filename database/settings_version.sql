@@ -0,0 +1,8 @@
+-- Version of the settings table, bumped by every settings write so each
+-- worker's cached snapshot (services/settings_service.py) knows to reload
+CREATE TABLE IF NOT EXISTS settings_version (
+    id TINYINT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT IGNORE INTO settings_version (id, version) VALUES (1, 0);
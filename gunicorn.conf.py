@@ -0,0 +1,81 @@
+"""Gunicorn settings for production: gunicorn -c gunicorn.conf.py wsgi:app
+
+Every value can be overridden with the GUNICORN_* environment variables
+below (or gunicorn's own command-line flags).
+"""
+import multiprocessing
+import os
+
+cores = multiprocessing.cpu_count()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Threaded workers: requests mostly wait on MySQL and SMTP, so a few threads per
+# process overlap that waiting while processes spread the Python work across cores
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# One pooled connection per request thread, plus one each for the scheduler and outbox
+# threads: both hold theirs for a whole job or send, so they cannot share one.
+# No overflow: a worker's connection count must stay fixed for the budget below to hold.
+BACKGROUND_THREADS = 2
+os.environ.setdefault('DB_POOL_SIZE', str(threads + BACKGROUND_THREADS))
+os.environ.setdefault('DB_POOL_MAX_OVERFLOW', '0')
+# Every worker may hold its whole pool plus EXPORT_MAX_CONCURRENT streaming export
+# connections. Start no more workers than DB_CONNECTION_BUDGET allows; the default
+# stays under MySQL's default max_connections (151) with room for admin sessions.
+connections_per_worker = (int(os.environ['DB_POOL_SIZE']) + int(os.environ['DB_POOL_MAX_OVERFLOW'])
+                          + int(os.getenv('EXPORT_MAX_CONCURRENT', 2)))
+connection_budget = int(os.getenv('DB_CONNECTION_BUDGET', 140))
+workers = int(os.getenv('GUNICORN_WORKERS',
+                        max(1, min(cores * 2 + 1, connection_budget // connections_per_worker))))
+# Share the cores between the workers' password hashing pools instead of giving every worker one per core
+os.environ.setdefault('PASSWORD_HASH_WORKERS', str(max(1, cores // workers)))
+# Workers must share rate-limit buckets, or every limit is multiplied by the worker count
+os.environ.setdefault('RATE_LIMIT_STORE', 'shared')
+
+# Load the app once in the master and fork workers from it: faster starts and shared
+# memory pages. Threads and sockets do not survive fork, so the master closes its
+# database connections before forking and each worker starts its own background threads.
+preload_app = True
+os.environ.setdefault('START_BACKGROUND_THREADS', '0')
+
+# Keep-alive for connections from a reverse proxy on the same network
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# Recycle workers now and then so slow leaks cannot build up; jitter avoids restarting all at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 500))
+backlog = int(os.getenv('GUNICORN_BACKLOG', 2048))
+
+# Worker heartbeat files in memory, so a slow disk cannot get workers killed
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+# Gunicorn only uses this to trust X-Forwarded-Proto; it never rewrites the client
+# address. The app takes the client IP from X-Forwarded-For through ProxyFix instead,
+# trusting TRUSTED_PROXY_HOPS proxies (one reverse proxy by default; set 0 when
+# clients connect to gunicorn directly).
+forwarded_allow_ips = os.getenv('GUNICORN_FORWARDED_ALLOW_IPS', '127.0.0.1')
+os.environ.setdefault('TRUSTED_PROXY_HOPS', '1')
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG')  # unset: requests are only counted in /metrics
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    # The master never serves requests; do not hand its connections to the workers
+    app = server.app.wsgi()
+    app.db_pool.dispose()
+    if app.db_read_pool is not None:
+        app.db_read_pool.dispose()
+    server.log.info(f"ArtBay ready: {workers} workers x {threads} threads, "
+                    f"up to {workers * connections_per_worker} MySQL connections")
+
+
+def post_fork(server, worker):
+    from app import start_background_threads
+    app = server.app.wsgi()
+    start_background_threads(app)
+    # Start hashing processes before the worker takes requests instead of on the first login
+    app.password_hasher.start()
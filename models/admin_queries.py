@@ -1,47 +1,134 @@
+import base64
+import json
 import logging
 from mysql.connector import Error
-from .database import get_db_connection
+from .database import transaction, execute, fetch_all, fetch_value
+from .user_queries import invalidate_user
+from .counter_queries import get_counters, bump_counter, is_pending_artist, pending_artist_emails
 
 logger = logging.getLogger(__name__)
 
-def get_dashboard_metrics():
-    """Fetches dashboard metrics."""
+# Row counts above this are reported as estimates rather than counted
+COUNT_CAP = 1000
+
+# Most IDs a single bulk moderation request may touch
+BULK_MAX = 500
+
+USER_ROLES = ('user', 'artist', 'admin')
+
+def encode_cursor(sort_value, row_id):
+    """Opaque keyset cursor for the row a page ended on."""
+    if hasattr(sort_value, 'isoformat'):
+        sort_value = sort_value.isoformat(sep=' ')
+    elif sort_value is not None and not isinstance(sort_value, (int, float, str)):
+        sort_value = str(sort_value)
+    return base64.urlsafe_b64encode(json.dumps([sort_value, row_id]).encode()).decode()
+
+def decode_cursor(cursor_token):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        metrics = {'total_users': 0, 'total_artworks': 0, 'pending_artists': 0}
-        
-        # Get total users
-        cursor.execute("SELECT COUNT(*) AS count FROM users")
-        metrics['total_users'] = cursor.fetchone()['count']
-        
-        # Get total artworks
-        cursor.execute("SELECT COUNT(*) AS count FROM art")
-        metrics['total_artworks'] = cursor.fetchone()['count']
-        
-        # Get pending artists (users with role 'artist' but not approved)
-        cursor.execute("""
-            SELECT COUNT(*) AS count 
-            FROM users 
-            WHERE role = 'artist' AND email NOT IN (
-                SELECT email FROM artists WHERE approved = 1
-            )
-        """)
-        metrics['pending_artists'] = cursor.fetchone()['count']
-        
-        return metrics
-    except Error as e:
-        logger.error(f"DB error fetching metrics: {e}")
-        return {'error': str(e)}
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor_token.encode()))
+        return sort_value, row_id
+    except (ValueError, TypeError):
+        return None
+
+def placeholders(values):
+    return ', '.join(['%s'] * len(values))
+
+def prefix_pattern(term):
+    """LIKE pattern matching values that start with term, so an index range scan can serve it."""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+def keyset_page(select_sql, where, params, sort_sql, id_sql, sort_key, id_key,
+                direction='asc', after=None, limit=50, estimate=None):
+    """Fetches one page of rows ordered by (sort column, unique id).
+
+    Each page starts right after the previous page's last row instead of
+    using OFFSET, so deep pages cost the same as the first one. Returns
+    the rows, the cursor for the next page (or None) and a count of all
+    matching rows that is exact up to COUNT_CAP. Past the cap, an
+    unfiltered list reports estimate() instead. Both queries may be served
+    by the read replica.
+    """
+    # Decided before the cursor condition is added, so every page reports the same total
+    unfiltered = not where
+    where = list(where)
+    params = list(params)
+    count_sql = f"SELECT COUNT(*) FROM (SELECT 1 {select_sql[select_sql.index(' FROM '):]}"
+    count_where = ' AND '.join(where) if where else '1=1'
+    total = fetch_value(f"{count_sql} WHERE {count_where} LIMIT %s) capped", params + [COUNT_CAP + 1], read=True)
+
+    comparison = '>' if direction == 'asc' else '<'
+    if after is not None:
+        where.append(f"({sort_sql} {comparison} %s OR ({sort_sql} = %s AND {id_sql} {comparison} %s))")
+        params.extend([after[0], after[0], after[1]])
+
+    order = 'ASC' if direction == 'asc' else 'DESC'
+    sql = select_sql
+    if where:
+        sql += " WHERE " + ' AND '.join(where)
+    sql += f" ORDER BY {sort_sql} {order}, {id_sql} {order} LIMIT %s"
+    rows = fetch_all(sql, params + [limit + 1], read=True)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][sort_key], rows[-1][id_key])
+
+    total_exact = total <= COUNT_CAP
+    total = min(total, COUNT_CAP)
+    if not total_exact and unfiltered and estimate is not None:
+        total = max(estimate(), total)
 
-def get_users(search=''):
-    """Fetches users with optional search."""
+    return {
+        'items': rows,
+        'next_cursor': next_cursor,
+        'total': total,
+        'total_exact': total_exact
+    }
+
+def table_row_estimate(table):
+    """InnoDB's approximate row count for a table, from table statistics."""
+    rows = fetch_value("""
+        SELECT TABLE_ROWS FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,), read=True)
+    return int(rows or 0)
+
+def counter_estimate(name):
+    counters = get_counters()
+    return counters.get(name, 0) if 'error' not in counters else 0
+
+def get_dashboard_metrics():
+    """Fetches dashboard metrics from the maintained counters."""
+    return get_counters()
+
+# Sortable columns per list: request value -> (SQL expression, row key)
+USER_SORTS = {'email': ('email', 'email'), 'name': ('name', 'name'), 'role': ('role', 'role')}
+ARTWORK_SORTS = {
+    'created_at': ('a.created_at', 'created_at'),
+    'title': ('a.title', 'title'),
+    'price': ('a.price', 'price')
+}
+ORDER_SORTS = {
+    'order_date': ('o.order_date', 'order_date'),
+    'total': ('o.total_amount', 'total_price'),
+    'email': ('o.email', 'email')
+}
+
+def get_users(search='', sort='email', direction='asc', after=None, limit=50):
+    """Fetches one page of users, optionally filtered by email or name prefix."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        query = "SELECT email, name, role FROM users WHERE email LIKE %s OR name LIKE %s"
-        cursor.execute(query, (f'%{search}%', f'%{search}%'))
-        return cursor.fetchall()
+        sort_sql, sort_key = USER_SORTS.get(sort, USER_SORTS['email'])
+        where, params = [], []
+        if search:
+            # Prefix matches can use the email primary key and idx_users_name
+            where.append("(email LIKE %s OR name LIKE %s)")
+            params.extend([prefix_pattern(search), prefix_pattern(search)])
+        return keyset_page(
+            "SELECT email, name, role FROM users", where, params,
+            sort_sql, 'email', sort_key, 'email', direction, after, limit,
+            estimate=lambda: counter_estimate('total_users')
+        )
     except Error as e:
         logger.error(f"DB error fetching users: {e}")
         return {'error': str(e)}
@@ -49,192 +136,138 @@ def get_users(search=''):
 def update_user(email, name, role):
     """Updates a user's details."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        query = "UPDATE users SET name = %s, role = %s WHERE email = %s"
-        cursor.execute(query, (name, role, email))
-        conn.commit()
+        with transaction() as db:
+            was_pending = is_pending_artist(db, email)
+            query = "UPDATE users SET name = %s, role = %s WHERE email = %s"
+            db.execute(query, (name, role, email))
+            bump_counter(db, 'pending_artists', is_pending_artist(db, email) - was_pending)
+        invalidate_user(email)
         return {'status': 'success'}
     except Error as e:
-        conn.rollback()
         logger.error(f"DB error updating user: {e}")
         return {'error': str(e)}
 
-def get_artworks(search=''):
-    """Fetches artworks with optional search."""
+def get_artworks(search='', sort='created_at', direction='desc', after=None, limit=50):
+    """Fetches one page of artworks, optionally filtered by title prefix."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        query = """
-            SELECT a.art_id, a.title, a.price, u.name AS artist_name
-            FROM art a LEFT JOIN users u ON a.email = u.email
-            WHERE a.title LIKE %s OR u.name LIKE %s
-        """
-        cursor.execute(query, (f'%{search}%', f'%{search}%'))
-        return cursor.fetchall()
+        sort_sql, sort_key = ARTWORK_SORTS.get(sort, ARTWORK_SORTS['created_at'])
+        where, params = [], []
+        if search:
+            where.append("a.title LIKE %s")
+            params.append(prefix_pattern(search))
+        return keyset_page(
+            """SELECT a.art_id, a.title, a.price, a.created_at, u.name AS artist_name
+               FROM art a LEFT JOIN users u ON a.email = u.email""",
+            where, params, sort_sql, 'a.art_id', sort_key, 'art_id', direction, after, limit,
+            estimate=lambda: counter_estimate('total_artworks')
+        )
     except Error as e:
         logger.error(f"DB error fetching artworks: {e}")
         return {'error': str(e)}
-        
+
 def update_artwork(art_id, title, price):
     """Updates artwork details."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE art SET title = %s, price = %s WHERE art_id = %s", (title, price, art_id))
-        conn.commit()
+        execute("UPDATE art SET title = %s, price = %s WHERE art_id = %s", (title, price, art_id))
         return {'status': 'success'}
     except Error as e:
-        conn.rollback()
         logger.error(f"DB error updating artwork: {e}")
         return {'error': str(e)}
 
 def delete_artwork(art_id):
     """Deletes an artwork."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM art WHERE art_id = %s", (art_id,))
-        conn.commit()
+        with transaction() as db:
+            deleted = db.execute("DELETE FROM art WHERE art_id = %s", (art_id,)).rowcount
+            bump_counter(db, 'total_artworks', -deleted)
         return {'status': 'success'}
     except Error as e:
-        conn.rollback()
         logger.error(f"DB error deleting artwork: {e}")
         return {'error': str(e)}
 
-def get_orders(search=''):
-    """Fetches orders with optional search."""
+def get_orders(search='', sort='order_date', direction='desc', after=None, limit=50):
+    """Fetches one page of orders, optionally filtered by email prefix."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        # Check if orders table exists
-        cursor.execute("SHOW TABLES LIKE 'orders'")
-        if not cursor.fetchone():
-            logger.warning("Orders table does not exist")
-            return []
-        
-        query = """
-            SELECT o.order_id, o.email, o.total_amount as total_price, 
-                   o.order_date, o.status as order_status
-            FROM orders o 
-            WHERE o.email LIKE %s
-            ORDER BY o.order_date DESC
-        """
-        cursor.execute(query, (f'%{search}%',))
-        return cursor.fetchall()
+        sort_sql, sort_key = ORDER_SORTS.get(sort, ORDER_SORTS['order_date'])
+        where, params = [], []
+        if search:
+            where.append("o.email LIKE %s")
+            params.append(prefix_pattern(search))
+        return keyset_page(
+            """SELECT o.order_id, o.email, o.total_amount as total_price,
+                      o.order_date, o.status as order_status
+               FROM orders o""",
+            where, params, sort_sql, 'o.order_id', sort_key, 'order_id', direction, after, limit,
+            estimate=lambda: table_row_estimate('orders')
+        )
     except Error as e:
         logger.error(f"DB error fetching orders: {e}")
         return {'error': str(e)}
 
-def get_order_details(order_id):
-    """Fetches details for a single order."""
+def get_orders_details(order_ids):
+    """Fetches many orders and all of their items with two queries.
+
+    Returns {'orders': [...], 'missing': [...]} with orders in the order
+    requested; IDs that do not exist are listed in missing.
+    """
+    if not order_ids:
+        return {'orders': [], 'missing': []}
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        # Get order information
-        cursor.execute("""
-            SELECT order_id, email, total_amount, order_date, status
-            FROM orders 
-            WHERE order_id = %s
-        """, (order_id,))
-        order = cursor.fetchone()
-        
-        if not order:
-            return {'error': 'Order not found'}
-        
-        # Get order items
-        cursor.execute("""
-            SELECT oi.quantity, oi.price_at_purchase, a.title 
-            FROM order_items oi 
-            JOIN art a ON oi.art_id = a.art_id 
-            WHERE oi.order_id = %s
-        """, (order_id,))
-        order['items'] = cursor.fetchall()
-        
-        return order
+        rows = fetch_all(f"""
+            SELECT order_id, email, total_amount AS total_price, order_date, status AS order_status
+            FROM orders
+            WHERE order_id IN ({placeholders(order_ids)})
+        """, list(order_ids), read=True)
+        orders = {row['order_id']: dict(row, items=[]) for row in rows}
+
+        if orders:
+            items = fetch_all(f"""
+                SELECT oi.order_id, oi.art_id, oi.quantity, oi.price_at_purchase AS price, a.title
+                FROM order_items oi
+                JOIN art a ON oi.art_id = a.art_id
+                WHERE oi.order_id IN ({placeholders(orders)})
+            """, list(orders), read=True)
+            for item in items:
+                orders[item.pop('order_id')]['items'].append(item)
+
+        return {
+            'orders': [orders[order_id] for order_id in order_ids if order_id in orders],
+            'missing': [order_id for order_id in order_ids if order_id not in orders]
+        }
     except Error as e:
         logger.error(f"DB error fetching order details: {e}")
         return {'error': str(e)}
-    
-def get_settings():
-    """Fetches admin settings."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        # Check if settings table exists
-        cursor.execute("SHOW TABLES LIKE 'settings'")
-        if not cursor.fetchone():
-            # Return default settings if table doesn't exist
-            return {'artist_approval_required': True}
-        
-        cursor.execute("SELECT setting_key, setting_value FROM settings")
-        settings = {}
-        for row in cursor.fetchall():
-            settings[row['setting_key']] = row['setting_value']
-        
-        # Set defaults if not found
-        if 'artist_approval_required' not in settings:
-            settings['artist_approval_required'] = True
-            
-        return settings
-    except Error as e:
-        logger.error(f"DB error fetching settings: {e}")
-        return {'artist_approval_required': True}
 
-def update_settings(settings_data):
-    """Updates admin settings."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Create settings table if it doesn't exist
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS settings (
-                setting_key VARCHAR(50) PRIMARY KEY,
-                setting_value TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Update settings
-        for key, value in settings_data.items():
-            query = """
-                INSERT INTO settings (setting_key, setting_value) 
-                VALUES (%s, %s) 
-                ON DUPLICATE KEY UPDATE setting_value = %s
-            """
-            cursor.execute(query, (key, str(value), str(value)))
-        
-        conn.commit()
-        return {'status': 'success'}
-    except Error as e:
-        conn.rollback()
-        logger.error(f"DB error updating settings: {e}")
-        return {'error': str(e)}
+def get_order_details(order_id):
+    """Fetches details for a single order."""
+    details = get_orders_details([order_id])
+    if 'error' in details:
+        return details
+    if not details['orders']:
+        return {'error': 'Order not found'}
+    return details['orders'][0]
     
 def delete_user(email):
     """Deletes a user from the database by email."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        # The ON DELETE CASCADE in your database will handle related records.
-        cursor.execute("DELETE FROM users WHERE email = %s", (email,))
-        conn.commit()
+        with transaction() as db:
+            was_pending = is_pending_artist(db, email)
+            artwork_count = db.fetch_value("SELECT COUNT(*) FROM art WHERE email = %s", (email,))
+            # The ON DELETE CASCADE in your database will handle related records.
+            deleted = db.execute("DELETE FROM users WHERE email = %s", (email,)).rowcount
+            if deleted:
+                bump_counter(db, 'total_users', -deleted)
+                bump_counter(db, 'total_artworks', -artwork_count)
+                bump_counter(db, 'pending_artists', -was_pending)
+        invalidate_user(email)
         return {'status': 'success', 'message': 'User deleted successfully.'}
     except Error as e:
-        conn.rollback()
         logger.error(f"DB error deleting user: {e}")
         return {'status': 'error', 'message': str(e)}
 
 def get_pending_artists():
     """Fetches all users with role 'artist' who haven't been approved yet."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
         # Get users with role 'artist' who are not in the approved artists list
         query = """
             SELECT u.name, u.email, u.role
@@ -244,8 +277,7 @@ def get_pending_artists():
                 SELECT email FROM artists WHERE approved = 1
             )
         """
-        cursor.execute(query)
-        pending_artists = cursor.fetchall()
+        pending_artists = fetch_all(query, read=True)
         
         # Add bio field (empty for now since it's not in users table)
         for artist in pending_artists:
@@ -259,30 +291,109 @@ def get_pending_artists():
 def approve_artist(email):
     """Approves an artist by updating their role and adding them to artists table."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # First, ensure the artists table exists
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS artists (
-                email VARCHAR(100) PRIMARY KEY,
-                bio TEXT,
-                profile_pic VARCHAR(255),
-                approved TINYINT DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Add artist to artists table with approved status
-        cursor.execute("""
-            INSERT INTO artists (email, approved) 
-            VALUES (%s, 1) 
-            ON DUPLICATE KEY UPDATE approved = 1
-        """, (email,))
-        
-        conn.commit()
+        with transaction() as db:
+            was_pending = is_pending_artist(db, email)
+
+            # Add artist to artists table with approved status
+            db.execute("""
+                INSERT INTO artists (email, approved) 
+                VALUES (%s, 1) 
+                ON DUPLICATE KEY UPDATE approved = 1
+            """, (email,))
+            bump_counter(db, 'pending_artists', -was_pending)
         return {'status': 'success', 'message': 'Artist approved successfully.'}
     except Error as e:
-        conn.rollback()
         logger.error(f"DB error approving artist: {e}")
-        return {'status': 'error', 'message': str(e)}
\ No newline at end of file
+        return {'status': 'error', 'message': str(e)}
+
+def approve_artists(emails):
+    """Approves many artists in one transaction; returns a result per email."""
+    try:
+        with transaction() as db:
+            rows = db.fetch_all(f"""
+                SELECT email FROM users
+                WHERE email IN ({placeholders(emails)}) AND role = 'artist'
+                FOR UPDATE
+            """, list(emails), dictionary=False)
+            artists = [row[0] for row in rows]
+            pending = pending_artist_emails(db, artists)
+            if artists:
+                db.execute(f"""
+                    INSERT INTO artists (email, approved)
+                    VALUES {', '.join(['(%s, 1)'] * len(artists))}
+                    ON DUPLICATE KEY UPDATE approved = 1
+                """, artists)
+            bump_counter(db, 'pending_artists', -len(pending))
+        # MySQL matched the emails case-insensitively; compare the same way
+        pending = {email.lower() for email in pending}
+        artists = {email.lower() for email in artists}
+        results = {}
+        for email in emails:
+            if email.lower() in pending:
+                results[email] = 'approved'
+            elif email.lower() in artists:
+                results[email] = 'already_approved'
+            else:
+                results[email] = 'not_artist'
+        return {'status': 'success', 'results': results}
+    except Error as e:
+        logger.error(f"DB error in approve_artists: {e}")
+        return {'error': str(e)}
+
+def delete_artworks(art_ids):
+    """Deletes many artworks in one transaction; returns a result per ID."""
+    try:
+        with transaction() as db:
+            rows = db.fetch_all(
+                f"SELECT art_id FROM art WHERE art_id IN ({placeholders(art_ids)}) FOR UPDATE",
+                list(art_ids), dictionary=False
+            )
+            found = {row[0] for row in rows}
+            if found:
+                result = db.execute(f"DELETE FROM art WHERE art_id IN ({placeholders(found)})", list(found))
+                bump_counter(db, 'total_artworks', -result.rowcount)
+        return {
+            'status': 'success',
+            'results': {art_id: 'deleted' if art_id in found else 'not_found' for art_id in art_ids}
+        }
+    except Error as e:
+        logger.error(f"DB error in delete_artworks: {e}")
+        return {'error': str(e)}
+
+def update_user_roles(emails, role):
+    """Sets the role of many users in one transaction; returns a result per email.
+
+    Emails match case-insensitively, as MySQL compares them; writes and
+    cache invalidation use the spelling stored in users.
+    """
+    try:
+        with transaction() as db:
+            rows = db.fetch_all(
+                f"SELECT email, role FROM users WHERE email IN ({placeholders(emails)}) FOR UPDATE",
+                list(emails), dictionary=False
+            )
+            current = {email.lower(): (email, old_role) for email, old_role in rows}
+            changed = [email for email, old_role in current.values() if old_role != role]
+            if changed:
+                was_pending = pending_artist_emails(db, changed)
+                db.execute(
+                    f"UPDATE users SET role = %s WHERE email IN ({placeholders(changed)})",
+                    [role] + changed
+                )
+                now_pending = pending_artist_emails(db, changed)
+                bump_counter(db, 'pending_artists', len(now_pending) - len(was_pending))
+        for email in changed:
+            # The caches are keyed by whatever spelling was looked up
+            invalidate_user(email)
+            invalidate_user(email.lower())
+        results = {}
+        for email in emails:
+            stored = current.get(email.lower())
+            if stored is None:
+                results[email] = 'not_found'
+            else:
+                results[email] = 'updated' if stored[0] in changed else 'unchanged'
+        return {'status': 'success', 'results': results}
+    except Error as e:
+        logger.error(f"DB error in update_user_roles: {e}")
+        return {'error': str(e)}
@@ -0,0 +1,111 @@
+import logging
+from datetime import date, timedelta
+from mysql.connector import Error
+from .database import transaction, fetch_one, fetch_value, fetch_all
+
+logger = logging.getLogger(__name__)
+
+# Rollup table -> (dimension expression over order_items oi / art a, dimension column)
+ROLLUPS = {
+    'sales_daily': (None, None),
+    'sales_daily_artist': ("COALESCE(a.email, '')", 'artist_email'),
+    'sales_daily_category': ("COALESCE(a.category, '')", 'category'),
+}
+
+# Days rebuilt per transaction by rebuild_sales_rollups
+REBUILD_CHUNK_DAYS = 7
+
+def _rollup_upsert(table, where):
+    """INSERT ... SELECT adding the order_items matching where into a rollup table."""
+    dim_expr, dim_col = ROLLUPS[table]
+    return f"""
+        INSERT INTO {table} (day, {dim_col + ', ' if dim_col else ''}revenue, units, orders)
+        SELECT DATE(o.order_date), {dim_expr + ', ' if dim_expr else ''}
+               SUM(oi.quantity * oi.price_at_purchase), SUM(oi.quantity), COUNT(DISTINCT oi.order_id)
+        FROM order_items oi
+        JOIN orders o ON o.order_id = oi.order_id
+        LEFT JOIN art a ON a.art_id = oi.art_id
+        WHERE {where}
+        GROUP BY DATE(o.order_date){', ' + dim_expr if dim_expr else ''}
+        ON DUPLICATE KEY UPDATE revenue = revenue + VALUES(revenue),
+                                units = units + VALUES(units),
+                                orders = orders + VALUES(orders)
+    """
+
+def record_order_sales(db, order_id):
+    """Adds one order's items to every rollup as part of the caller's open transaction."""
+    for table in ROLLUPS:
+        db.execute(_rollup_upsert(table, "oi.order_id = %s"), (order_id,))
+
+def rebuild_sales_rollups(days=None):
+    """Recomputes the rollups from orders for the last `days` days.
+
+    With days=None, or while the rollups are still empty, every day since
+    the first order is rebuilt (the backfill). Each chunk of days is
+    deleted and recomputed in its own short transaction.
+    """
+    try:
+        backfill = days is None or fetch_one("SELECT 1 FROM sales_daily LIMIT 1") is None
+        if backfill:
+            start = fetch_value("SELECT DATE(MIN(order_date)) FROM orders")
+            if start is None:
+                return {'status': 'success', 'message': 'No orders to roll up'}
+        else:
+            start = date.today() - timedelta(days=days - 1)
+        end = date.today()
+
+        chunks = 0
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=REBUILD_CHUNK_DAYS - 1), end)
+            with transaction() as db:
+                for table in ROLLUPS:
+                    db.execute(f"DELETE FROM {table} WHERE day BETWEEN %s AND %s", (chunk_start, chunk_end))
+                    db.execute(
+                        _rollup_upsert(table, "o.order_date >= %s AND o.order_date < %s"),
+                        (chunk_start, chunk_end + timedelta(days=1))
+                    )
+            chunks += 1
+            chunk_start = chunk_end + timedelta(days=1)
+        mode = 'Backfilled' if backfill else 'Rebuilt'
+        return {'status': 'success', 'message': f"{mode} sales rollups from {start} to {end} in {chunks} chunks"}
+    except Error as e:
+        logger.error(f"DB error in rebuild_sales_rollups: {e}")
+        return {'status': 'error', 'message': str(e)}
+
+def get_sales_analytics(start, end, top=20):
+    """Daily series plus top artists and categories for [start, end], read from the rollups only."""
+    try:
+        daily = fetch_all("""
+            SELECT day, revenue, units, orders FROM sales_daily
+            WHERE day BETWEEN %s AND %s ORDER BY day
+        """, (start, end))
+
+        breakdowns = {}
+        for table, key in (('sales_daily_artist', 'artist_email'), ('sales_daily_category', 'category')):
+            breakdowns[key] = fetch_all(f"""
+                SELECT {key}, SUM(revenue) AS revenue, SUM(units) AS units, SUM(orders) AS orders
+                FROM {table}
+                WHERE day BETWEEN %s AND %s
+                GROUP BY {key}
+                ORDER BY revenue DESC
+                LIMIT %s
+            """, (start, end, top))
+
+        for row in daily:
+            row['day'] = row['day'].isoformat()
+        return {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'totals': {
+                'revenue': sum(row['revenue'] for row in daily),
+                'units': sum(row['units'] for row in daily),
+                'orders': sum(row['orders'] for row in daily),
+            },
+            'daily': daily,
+            'artists': breakdowns['artist_email'],
+            'categories': breakdowns['category'],
+        }
+    except Error as e:
+        logger.error(f"DB error in get_sales_analytics: {e}")
+        return {'error': str(e)}
@@ -1,48 +1,41 @@
 import logging
 from mysql.connector import Error
-from .database import get_db_connection
+from .database import transaction, fetch_one, fetch_all
+from .counter_queries import bump_counter
 
 logger = logging.getLogger(__name__)
 
 def add_art(email, title, description, price, category, image_path):
     """Adds a new artwork to the database."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        sql = """INSERT INTO art (email, title, description, price, category, image_path)
-                 VALUES (%s, %s, %s, %s, %s, %s)"""
-        cursor.execute(sql, (email, title, description, price, category, image_path))
-        conn.commit()
+        with transaction() as db:
+            db.execute("""INSERT INTO art (email, title, description, price, category, image_path)
+                          VALUES (%s, %s, %s, %s, %s, %s)""",
+                       (email, title, description, price, category, image_path))
+            bump_counter(db, 'total_artworks', 1)
         return {"status": "success", "message": "Artwork added successfully!"}
     except Error as e:
-        get_db_connection().rollback()
         logger.error(f"DB Error in add_art: {e}")
         return {"status": "error", "message": str(e)}
 
 def delete_artwork(art_id):
     """Deletes an artwork by its ID."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM art WHERE art_id = %s", (art_id,))
-        conn.commit()
+        with transaction() as db:
+            deleted = db.execute("DELETE FROM art WHERE art_id = %s", (art_id,)).rowcount
+            bump_counter(db, 'total_artworks', -deleted)
         return {"status": "success", "message": "Artwork deleted successfully"}
     except Error as e:
-        get_db_connection().rollback()
         logger.error(f"DB Error in delete_artwork: {e}")
         return {"status": "error", "message": str(e)}
 
 def get_all_artworks():
     """Fetches all artworks with artist names."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        query = """
+        return fetch_all("""
             SELECT a.*, u.name as artist_name FROM art a
             JOIN users u ON a.email = u.email ORDER BY a.created_at DESC
-        """
-        cursor.execute(query)
-        return cursor.fetchall()
+        """, read=True)
     except Error as e:
         logger.error(f"DB error in get_all_artworks: {e}")
         return {"error": str(e)}
@@ -50,10 +43,7 @@ def get_all_artworks():
 def get_art_by_id(art_id):
     """Fetches a single artwork by its ID."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM art WHERE art_id = %s", (art_id,))
-        return cursor.fetchone()
+        return fetch_one("SELECT * FROM art WHERE art_id = %s", (art_id,), read=True, prepared=True)
     except Error as e:
         logger.error(f"DB error in get_art_by_id: {e}")
         return {"error": str(e)}
@@ -61,9 +51,6 @@ def get_art_by_id(art_id):
 def get_filtered_artworks(filters):
     """Fetches artworks with dynamic search, filter, and sort options."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
         sql = "SELECT a.*, u.name AS artist_name FROM art a JOIN users u ON a.email = u.email WHERE 1=1"
         params = []
 
@@ -76,8 +63,7 @@ def get_filtered_artworks(filters):
 
         sql += " ORDER BY a.created_at " + ("ASC" if filters.get('sort') == 'oldest' else "DESC")
 
-        cursor.execute(sql, params)
-        return {"artworks": cursor.fetchall()}
+        return {"artworks": fetch_all(sql, params, read=True)}
     except Error as e:
         logger.error(f"DB error in get_filtered_artworks: {e}")
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
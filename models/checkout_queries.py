@@ -1,45 +1,34 @@
 import logging
 from mysql.connector import Error
-from .database import get_db_connection
+from .database import transaction, execute, fetch_one, fetch_all
+from .analytics_queries import record_order_sales
 
 logger = logging.getLogger(__name__)
 
 def add_shipping_info(email, name, address, city, zipcode, country, phone="N/A"):
     """Adds shipping information for a user and returns the new ID."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
         query = """
             INSERT INTO shipping_info (email, name, phone, address, city, zipcode, country)
             VALUES (%s, %s, %s, %s, %s, %s, %s)
         """
-        cursor.execute(query, (email, name, phone, address, city, zipcode, country))
-        conn.commit()
-        return cursor.lastrowid
+        return execute(query, (email, name, phone, address, city, zipcode, country)).lastrowid
     except Error as e:
-        get_db_connection().rollback()
         logger.error(f"DB error in add_shipping_info: {e}")
         return None
 
 def create_order_and_get_id(email, total_price):
     """Creates an order record and returns the new order_id."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
         query = "INSERT INTO orders (email, total_price, order_status) VALUES (%s, %s, 'pending')"
-        cursor.execute(query, (email, total_price))
-        conn.commit()
-        return cursor.lastrowid
+        return execute(query, (email, total_price)).lastrowid
     except Error as e:
-        get_db_connection().rollback()
         logger.error(f"DB error in create_order_and_get_id: {e}")
         return None
 
 def add_order_items(order_id, cart_items):
     """Adds items from the cart to the order_items table."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
         query = """
             INSERT INTO order_items (order_id, art_id, quantity, price_at_purchase)
             VALUES (%s, %s, %s, %s)
@@ -48,10 +37,67 @@ def add_order_items(order_id, cart_items):
             (order_id, item['art_id'], item['quantity'], item['price'])
             for item in cart_items
         ]
-        cursor.executemany(query, item_data)
-        conn.commit()
+        with transaction() as db:
+            db.execute_many(query, item_data)
+            record_order_sales(db, order_id)
         return True
     except Error as e:
-        get_db_connection().rollback()
         logger.error(f"DB error in add_order_items: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def get_order_with_items(order_id, email):
+    """Fetches a user's order and its items.
+
+    Uses the primary key on orders and idx_order_items_order on order_items,
+    so it stays two index lookups regardless of order volume.
+    """
+    try:
+        order = fetch_one("""
+            SELECT order_id, email, total_amount AS total_price,
+                   order_date, status AS order_status
+            FROM orders
+            WHERE order_id = %s AND email = %s
+        """, (order_id, email))
+        if not order:
+            return None
+
+        order['items'] = fetch_all("""
+            SELECT oi.art_id, oi.quantity, oi.price_at_purchase, a.title, a.image_path
+            FROM order_items oi
+            JOIN art a ON oi.art_id = a.art_id
+            WHERE oi.order_id = %s
+        """, (order_id,))
+        return order
+    except Error as e:
+        logger.error(f"DB error in get_order_with_items: {e}")
+        return {"error": str(e)}
+
+def get_orders_for_user(email, before_date=None, before_id=None, limit=20):
+    """Fetches one page of a user's order history, newest first.
+
+    Pages by keyset on (order_date, order_id) so every page is a range scan
+    on idx_orders_email_date instead of an OFFSET over the whole history.
+    """
+    try:
+        sql = """
+            SELECT order_id, total_amount AS total_price,
+                   order_date, status AS order_status
+            FROM orders
+            WHERE email = %s
+        """
+        params = [email]
+
+        if before_date is not None and before_id is not None:
+            sql += " AND (order_date < %s OR (order_date = %s AND order_id < %s))"
+            params.extend([before_date, before_date, before_id])
+
+        sql += " ORDER BY order_date DESC, order_id DESC LIMIT %s"
+        # Fetch one extra row to know whether another page exists
+        params.append(limit + 1)
+
+        rows = fetch_all(sql, params)
+        has_more = len(rows) > limit
+        return {"orders": rows[:limit], "has_more": has_more}
+    except Error as e:
+        logger.error(f"DB error in get_orders_for_user: {e}")
+        return {"error": str(e)}
@@ -0,0 +1,93 @@
+import logging
+from flask import g
+from mysql.connector import Error
+from .database import transaction, fetch_all, get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# Dashboard counters kept in admin_counters. The rows are seeded from the
+# base tables by migration 11; writers adjust them inside their own
+# transaction with bump_counter, and reconcile_counters recomputes them
+# to correct any drift.
+COUNTERS = ('total_users', 'total_artworks', 'pending_artists')
+
+def bump_counter(db, name, delta):
+    """Adds delta to a counter as part of the caller's open transaction.
+
+    Does nothing until the counter is seeded: a row created from a lone
+    delta would hold that delta rather than the real count.
+    """
+    if delta:
+        db.execute("UPDATE admin_counters SET value = value + %s WHERE counter_name = %s",
+                   (delta, name))
+
+def is_pending_artist(db, email):
+    """True if the user has the artist role but no approved artist profile."""
+    return db.fetch_one("""
+        SELECT 1 FROM users u
+        WHERE u.email = %s AND u.role = 'artist'
+          AND NOT EXISTS (SELECT 1 FROM artists a WHERE a.email = u.email AND a.approved = 1)
+    """, (email,), dictionary=False) is not None
+
+def pending_artist_emails(db, emails):
+    """The subset of emails that are pending artists, for set-based writes."""
+    if not emails:
+        return set()
+    rows = db.fetch_all(f"""
+        SELECT u.email FROM users u
+        WHERE u.email IN ({', '.join(['%s'] * len(emails))}) AND u.role = 'artist'
+          AND NOT EXISTS (SELECT 1 FROM artists a WHERE a.email = u.email AND a.approved = 1)
+    """, list(emails), dictionary=False)
+    return {row[0] for row in rows}
+
+def get_counters():
+    """Reads all dashboard counters; reseeds them with a reconcile if any row is missing."""
+    try:
+        rows = fetch_all("SELECT counter_name, value FROM admin_counters", dictionary=False)
+        counters = {name: int(value) for name, value in rows}
+        if not all(name in counters for name in COUNTERS):
+            result = reconcile_counters()
+            if result['status'] != 'success':
+                return {'error': result['message']}
+            return result['counters']
+        return {name: max(counters[name], 0) for name in COUNTERS}
+    except Error as e:
+        logger.error(f"DB error in get_counters: {e}")
+        return {'error': str(e)}
+
+def reconcile_counters():
+    """Recomputes every counter from the base tables.
+
+    The counter rows are locked before counting. A writer that has already
+    bumped a counter has committed by then, so the counts include it; one
+    that bumps later waits for the lock and adds its delta to the new value.
+    """
+    try:
+        conn = get_db_connection()
+        if conn.in_transaction and not g.get('db_tx_depth'):
+            # Only reads run outside transaction(); end the snapshot they opened
+            # so the counts below are taken after the lock, not before it
+            conn.commit()
+        with transaction() as db:
+            db.fetch_all(f"""
+                SELECT counter_name FROM admin_counters
+                WHERE counter_name IN ({', '.join(['%s'] * len(COUNTERS))}) FOR UPDATE
+            """, COUNTERS, dictionary=False)
+            counters = {
+                'total_users': db.fetch_value("SELECT COUNT(*) FROM users"),
+                'total_artworks': db.fetch_value("SELECT COUNT(*) FROM art"),
+                'pending_artists': db.fetch_value("""
+                    SELECT COUNT(*) FROM users u
+                    WHERE u.role = 'artist'
+                      AND NOT EXISTS (SELECT 1 FROM artists a WHERE a.email = u.email AND a.approved = 1)
+                """)
+            }
+            db.execute("""
+                INSERT INTO admin_counters (counter_name, value)
+                VALUES (%s, %s), (%s, %s), (%s, %s)
+                ON DUPLICATE KEY UPDATE value = VALUES(value)
+            """, [item for pair in counters.items() for item in pair])
+        return {'status': 'success', 'message': f"Counters reconciled: {counters}", 'counters': counters}
+    except Error as e:
+        logger.error(f"DB error in reconcile_counters: {e}")
+        return {'status': 'error', 'message': str(e)}
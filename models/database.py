@@ -1,19 +1,299 @@
+import bisect
 import logging
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque, namedtuple
+from contextlib import contextmanager
 import mysql.connector
-from mysql.connector import pooling
-from flask import current_app, g
+from flask import current_app, g, has_request_context, request
 
 logger = logging.getLogger(__name__)
 
+# Cookie holding the time until which a client's reads go to the primary after it wrote
+READ_PRIMARY_COOKIE = 'read_primary_until'
+
+# Upper bounds (ms) of the checkout wait-time histogram buckets; the last bucket is unbounded
+WAIT_BUCKETS_MS = (1, 5, 25, 100, 500, 1000, 5000)
+
+class PoolTimeout(Exception):
+    """No connection became free within the checkout timeout."""
+
+class PooledConnection:
+    """One pooled MySQL connection; close() hands it back to the pool.
+
+    The same wrapper is reused for every checkout of its connection, so
+    the prepared statements it caches (for prepared=True queries) survive
+    across requests.
+    """
+
+    def __init__(self, pool, conn, statement_cache_size):
+        self._pool = pool
+        self._conn = conn
+        self.created_at = time.monotonic()
+        self.pid = os.getpid()
+        self.returned_at = None
+        self.checked_out = False
+        # Set once anything was committed, so later reads avoid a lagging replica
+        self.wrote = False
+        self._statements = OrderedDict()
+        self._statement_cache_size = statement_cache_size
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def commit(self):
+        self._conn.commit()
+        self.wrote = True
+
+    def statement(self, sql, dictionary):
+        """Prepared cursor for sql, prepared on first use and kept in an LRU cache."""
+        key = (sql, dictionary)
+        entry = self._statements.get(key)
+        if entry is not None:
+            self._statements.move_to_end(key)
+            return entry
+        # The cursor re-prepares whenever it is passed a different string
+        # object, so the first-seen sql object is kept alongside it
+        entry = (self._conn.cursor(prepared=True, dictionary=dictionary), sql)
+        self._statements[key] = entry
+        if len(self._statements) > self._statement_cache_size:
+            _, (cursor, _) = self._statements.popitem(last=False)
+            self._close_cursor(cursor)
+        return entry
+
+    def clear_statements(self):
+        while self._statements:
+            _, (cursor, _) = self._statements.popitem()
+            self._close_cursor(cursor)
+
+    @staticmethod
+    def _close_cursor(cursor):
+        try:
+            cursor.close()
+        except mysql.connector.Error:
+            pass
+
+    def close(self):
+        if self.checked_out:
+            self.checked_out = False
+            self._pool.release(self)
+
+    def discard(self):
+        """Closes the underlying connection for good."""
+        self.clear_statements()
+        try:
+            self._conn.close()
+        except mysql.connector.Error:
+            pass
+
+
+class ConnectionPool:
+    """Bounded MySQL connection pool whose checkout waits instead of failing.
+
+    Up to `size` connections are kept open; up to `max_overflow` more are
+    opened under load and closed when returned. When all are in use,
+    get_connection() waits up to `timeout` seconds for one to be returned
+    and then raises PoolTimeout. Connections older than `max_age` seconds
+    are replaced on return, and with `pre_ping` a connection idle for more
+    than PRE_PING_IDLE seconds is pinged (and replaced) before use.
+    """
+
+    PRE_PING_IDLE = 10
+
+    def __init__(self, db_config, size=5, max_overflow=0, timeout=5.0, max_age=1800, pre_ping=True,
+                 statement_cache_size=64):
+        self.db_config = db_config
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.max_age = max_age
+        self.pre_ping = pre_ping
+        self.statement_cache_size = statement_cache_size
+        self._inherited = []
+        self._reset_state()
+        _pools.add(self)
+
+    def _reset_state(self):
+        self._idle = deque()
+        self._open = 0
+        self._in_use = 0
+        self._waiters = 0
+        self._cond = threading.Condition()
+        self.stats = {'checkouts': 0, 'timeouts': 0, 'created': 0, 'recycled': 0, 'ping_failures': 0}
+        self._wait_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._wait_total_ms = 0.0
+        self._wait_max_ms = 0.0
+
+    def _after_fork(self):
+        """Starts a forked child with an empty pool.
+
+        The inherited connections share their sockets with the parent, so
+        they are neither used nor closed here (closing would end the
+        parent's sessions); references are kept so they are never
+        garbage-collected with a protocol-level quit either.
+        """
+        self._inherited.extend(self._idle)
+        self._reset_state()
+
+    def dispose(self):
+        """Closes every idle connection, e.g. in a preloading master before it forks workers."""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._open -= len(idle)
+        for conn in idle:
+            conn.discard()
+
+    def _connect(self):
+        conn = PooledConnection(self, mysql.connector.connect(**self.db_config), self.statement_cache_size)
+        self.stats['created'] += 1
+        return conn
+
+    def get_connection(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._open < self.size + self.max_overflow:
+                    conn = None
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats['timeouts'] += 1
+                    raise PoolTimeout(
+                        f"No database connection free after {self.timeout}s "
+                        f"({self._in_use} in use, {self._waiters} waiting)"
+                    )
+                self._waiters += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiters -= 1
+            self._in_use += 1
+            self.stats['checkouts'] += 1
+            self._record_wait((time.monotonic() - start) * 1000)
+
+        try:
+            if conn is None:
+                conn = self._connect()
+            elif self.pre_ping and time.monotonic() - conn.returned_at > self.PRE_PING_IDLE:
+                try:
+                    conn.ping(reconnect=False)
+                except mysql.connector.Error as e:
+                    # Reconnecting in place would silently drop the prepared statements
+                    self.stats['ping_failures'] += 1
+                    logger.warning(f"Pooled connection failed pre-ping, reconnecting: {e}")
+                    conn.discard()
+                    conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        conn.checked_out = True
+        conn.wrote = False
+        return conn
+
+    def release(self, conn):
+        if conn.pid != os.getpid():
+            # Checked out before a fork; the parent still owns the socket
+            self._inherited.append(conn)
+            return
+        keep = True
+        try:
+            # End any transaction the request left open so the next user starts clean
+            if conn.unread_result:
+                conn.consume_results()
+            if conn.in_transaction:
+                conn.rollback()
+        except mysql.connector.Error as e:
+            logger.warning(f"Discarding pooled connection that failed to reset: {e}")
+            keep = False
+        with self._cond:
+            self._in_use -= 1
+            if keep and self.max_age and time.monotonic() - conn.created_at > self.max_age:
+                self.stats['recycled'] += 1
+                keep = False
+            if keep and len(self._idle) + self._in_use >= self.size and not self._waiters:
+                # Overflow connection nobody is waiting for: only keep `size` around
+                keep = False
+            if keep:
+                conn.returned_at = time.monotonic()
+                self._idle.append(conn)
+            else:
+                self._open -= 1
+            self._cond.notify()
+        if not keep:
+            conn.discard()
+
+    def _record_wait(self, wait_ms):
+        self._wait_counts[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+        self._wait_total_ms += wait_ms
+        self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+
+    def status(self):
+        with self._cond:
+            labels = [f"le_{bound}ms" for bound in WAIT_BUCKETS_MS] + ['gt_%dms' % WAIT_BUCKETS_MS[-1]]
+            checkouts = self.stats['checkouts']
+            return {
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'open': self._open,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waiters': self._waiters,
+                **self.stats,
+                'wait_ms': {
+                    'avg': round(self._wait_total_ms / checkouts, 3) if checkouts else 0,
+                    'max': round(self._wait_max_ms, 3),
+                    'histogram': dict(zip(labels, self._wait_counts)),
+                },
+            }
+
+
+# Every pool in the process, so each can be reset in a forked child
+_pools = weakref.WeakSet()
+
+def _reset_pools_after_fork():
+    for pool in list(_pools):
+        pool._after_fork()
+
+os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+def _create_pool(app, db_config):
+    return ConnectionPool(
+        db_config,
+        size=app.config['DB_POOL_SIZE'],
+        max_overflow=app.config['DB_POOL_MAX_OVERFLOW'],
+        timeout=app.config['DB_POOL_TIMEOUT'],
+        max_age=app.config['DB_POOL_MAX_AGE'],
+        pre_ping=app.config['DB_POOL_PRE_PING'],
+        statement_cache_size=app.config['DB_STATEMENT_CACHE_SIZE']
+    )
+
 def init_db_pool(app):
     try:
-        db_config = app.config['DB_CONFIG']
-        app.db_pool = pooling.MySQLConnectionPool(pool_name="mypool", pool_size=5, **db_config)
-        logger.info("✅ Database connection pool initialized successfully.")
+        app.db_pool = _create_pool(app, app.config['DB_CONFIG'])
+        # Open one connection up front so bad credentials fail at startup
+        app.db_pool.get_connection().close()
+        logger.info(f"✅ Database connection pool initialized (size {app.config['DB_POOL_SIZE']}, "
+                    f"overflow {app.config['DB_POOL_MAX_OVERFLOW']}).")
     except Exception as e:
         logger.critical(f"❌ Failed to initialize database pool: {e}")
         raise
 
+    app.db_read_pool = None
+    if app.config.get('DB_REPLICA_CONFIG'):
+        # A replica that is down at startup is not fatal: reads fall back to the primary
+        app.db_read_pool = _create_pool(app, app.config['DB_REPLICA_CONFIG'])
+        logger.info(f"✅ Read replica pool initialized ({app.config['DB_REPLICA_CONFIG']['host']}).")
+
 def get_db_connection():
     if 'db_conn' not in g:
         try:
@@ -23,7 +303,231 @@ def get_db_connection():
             raise
     return g.db_conn
 
+def _reads_pinned_to_primary():
+    conn = g.get('db_conn')
+    if g.get('db_tx_depth') or (conn is not None and conn.wrote):
+        return True
+    if has_request_context():
+        try:
+            return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+    return False
+
+def get_read_connection():
+    """Connection for read-only query functions.
+
+    Uses the replica pool when DB_REPLICA_* is configured, except when this
+    request has already written or the client wrote within the last
+    DB_REPLICA_STICKY_SECONDS, so users always read their own writes.
+    Falls back to the primary if the replica cannot be reached.
+    """
+    read_pool = current_app.db_read_pool
+    if read_pool is None or _reads_pinned_to_primary():
+        return get_db_connection()
+    if 'db_read_conn' not in g:
+        try:
+            g.db_read_conn = read_pool.get_connection()
+        except (mysql.connector.Error, PoolTimeout) as e:
+            logger.warning(f"Read replica unavailable, using primary: {e}")
+            return get_db_connection()
+    return g.db_read_conn
+
+def mark_read_your_writes(response):
+    """after_request hook: pins the client's reads to the primary for a while after a write."""
+    conn = g.get('db_conn')
+    if conn is not None and conn.wrote and current_app.db_read_pool is not None:
+        sticky = current_app.config['DB_REPLICA_STICKY_SECONDS']
+        response.set_cookie(READ_PRIMARY_COOKIE, str(int(time.time() + sticky)),
+                            max_age=sticky, httponly=True, samesite='Lax')
+    return response
+
 def close_db_connection(e=None):
-    db_conn = g.pop('db_conn', None)
-    if db_conn is not None:
-        db_conn.close()
\ No newline at end of file
+    for key in ('db_conn', 'db_read_conn'):
+        db_conn = g.pop(key, None)
+        if db_conn is not None:
+            db_conn.close()
+
+
+# --- Query execution -------------------------------------------------------
+#
+# Query modules run SQL through these helpers instead of managing cursors:
+#
+#     user = fetch_one("SELECT * FROM users WHERE email = %s", (email,), read=True)
+#     with transaction() as db:
+#         db.execute("UPDATE art SET price = %s WHERE art_id = %s", (price, art_id))
+#         bump_counter(db, 'total_artworks', 1)
+#
+# Statements use the text protocol: one round trip each. prepared=True runs
+# a statement as a server-side prepared statement cached per connection,
+# which skips re-parsing but costs an extra reset round trip on every
+# execution with this connector, and a PREPARE for every new SQL string.
+# Keep it for fixed SQL that runs very often; never pass it for SQL built
+# per call (IN lists, optional filters). Write helpers commit unless they
+# run inside transaction(); errors roll back and re-raise
+# mysql.connector.Error for the caller to handle.
+
+ExecResult = namedtuple('ExecResult', 'rowcount lastrowid')
+
+# Callables observer(sql, params, seconds) run after every statement
+_query_observers = []
+
+def add_query_observer(observer):
+    """Registers a callable told the SQL, parameters and duration of each statement."""
+    if observer not in _query_observers:
+        _query_observers.append(observer)
+
+def _observe(sql, params, started):
+    elapsed = time.perf_counter() - started
+    for observer in _query_observers:
+        try:
+            observer(sql, params, elapsed)
+        except Exception as e:
+            logger.warning(f"Query observer {observer!r} failed: {e}")
+
+def _check_params(sql, params):
+    # A prepared cursor silently skips a statement whose placeholders get no parameters
+    if not params and '%s' in sql:
+        raise mysql.connector.ProgrammingError(f"Statement has placeholders but no parameters: {sql[:200]}")
+
+class Executor:
+    """Runs statements on one connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    @contextmanager
+    def _run(self, sql, params, dictionary, prepared):
+        params = tuple(params)
+        _check_params(sql, params)
+        if prepared:
+            cursor, sql = self.conn.statement(sql, dictionary)
+        else:
+            cursor = self.conn.cursor(dictionary=dictionary)
+        try:
+            started = time.perf_counter()
+            try:
+                cursor.execute(sql, params)
+            finally:
+                _observe(sql, params, started)
+            yield cursor
+        finally:
+            # Prepared cursors stay in the connection's cache
+            if not prepared:
+                cursor.close()
+
+    def execute(self, sql, params=(), prepared=False):
+        with self._run(sql, params, False, prepared) as cursor:
+            if cursor.with_rows:
+                cursor.fetchall()
+            return ExecResult(cursor.rowcount, cursor.lastrowid)
+
+    def execute_many(self, sql, seq_params):
+        """Runs sql once per parameter set. Uses the text protocol, which sends a
+        multi-row INSERT ... VALUES as a single statement."""
+        cursor = self.conn.cursor()
+        seq_params = [tuple(params) for params in seq_params]
+        started = time.perf_counter()
+        try:
+            cursor.executemany(sql, seq_params)
+            return ExecResult(cursor.rowcount, cursor.lastrowid)
+        finally:
+            _observe(sql, seq_params, started)
+            cursor.close()
+
+    def fetch_one(self, sql, params=(), dictionary=True, prepared=False):
+        with self._run(sql, params, dictionary, prepared) as cursor:
+            row = cursor.fetchone()
+            if row is not None:
+                # Drain any further rows so the connection is free for the next statement
+                cursor.fetchall()
+            return row
+
+    def fetch_all(self, sql, params=(), dictionary=True, prepared=False):
+        with self._run(sql, params, dictionary, prepared) as cursor:
+            return cursor.fetchall()
+
+    def fetch_value(self, sql, params=(), prepared=False):
+        """First column of the first row, or None."""
+        row = self.fetch_one(sql, params, dictionary=False, prepared=prepared)
+        return row[0] if row else None
+
+    @contextmanager
+    def iterate(self, sql, params=(), dictionary=True, batch_size=500):
+        """Yields an iterator over the rows of an unbuffered query.
+
+        Rows are pulled from the server batch_size at a time; the cursor is
+        closed (and unread rows discarded) when the block exits.
+        """
+        params = tuple(params)
+        _check_params(sql, params)
+        cursor = self.conn.cursor(dictionary=dictionary)
+        try:
+            started = time.perf_counter()
+            try:
+                cursor.execute(sql, params)
+            finally:
+                _observe(sql, params, started)
+
+            def rows():
+                while True:
+                    batch = cursor.fetchmany(batch_size)
+                    if not batch:
+                        return
+                    yield from batch
+
+            yield rows()
+        finally:
+            if self.conn.unread_result:
+                self.conn.consume_results()
+            cursor.close()
+
+
+def _executor(read):
+    return Executor(get_read_connection() if read else get_db_connection())
+
+@contextmanager
+def transaction():
+    """Runs the statements of the block as one transaction on the primary.
+
+    Commits when the outermost transaction() exits normally and rolls back
+    if it raises; nested blocks join the outer transaction.
+    """
+    conn = get_db_connection()
+    depth = g.get('db_tx_depth', 0)
+    g.db_tx_depth = depth + 1
+    try:
+        yield Executor(conn)
+        if depth == 0:
+            conn.commit()
+    except BaseException:
+        if depth == 0:
+            try:
+                conn.rollback()
+            except mysql.connector.Error as e:
+                logger.warning(f"Rollback failed: {e}")
+        raise
+    finally:
+        g.db_tx_depth = depth
+
+def execute(sql, params=(), prepared=False):
+    """Runs one write statement on the primary; commits unless inside transaction()."""
+    with transaction() as db:
+        return db.execute(sql, params, prepared)
+
+def execute_many(sql, seq_params):
+    with transaction() as db:
+        return db.execute_many(sql, seq_params)
+
+def fetch_one(sql, params=(), dictionary=True, read=False, prepared=False):
+    """First row or None. read=True allows the read replica."""
+    return _executor(read).fetch_one(sql, params, dictionary, prepared)
+
+def fetch_all(sql, params=(), dictionary=True, read=False, prepared=False):
+    return _executor(read).fetch_all(sql, params, dictionary, prepared)
+
+def fetch_value(sql, params=(), read=False, prepared=False):
+    return _executor(read).fetch_value(sql, params, prepared)
+
+def iterate(sql, params=(), dictionary=True, read=False, batch_size=500):
+    return _executor(read).iterate(sql, params, dictionary, batch_size)
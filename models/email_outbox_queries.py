@@ -0,0 +1,109 @@
+import logging
+import time
+from mysql.connector import Error
+from .database import transaction, execute, fetch_all
+
+logger = logging.getLogger(__name__)
+
+def enqueue_email(recipient, subject, html_body):
+    """Adds an email to the outbox and returns its ID."""
+    try:
+        return execute("""
+            INSERT INTO email_outbox (recipient, subject, html_body, status, next_attempt_at)
+            VALUES (%s, %s, %s, 'pending', NOW())
+        """, (recipient, subject, html_body)).lastrowid
+    except Error as e:
+        logger.error(f"DB error in enqueue_email: {e}")
+        return None
+
+def claim_pending_emails(batch_size, lease_seconds):
+    """Claims a batch of due emails for sending.
+
+    Claimed rows are leased: if the sender dies before reporting back, they
+    become due again once the lease runs out. SKIP LOCKED lets several
+    senders claim batches concurrently without blocking each other.
+    """
+    try:
+        with transaction() as db:
+            rows = db.fetch_all("""
+                SELECT id, recipient, subject, html_body, attempts
+                FROM email_outbox
+                WHERE status IN ('pending', 'sending') AND next_attempt_at <= NOW()
+                ORDER BY next_attempt_at
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            """, (batch_size,))
+            if rows:
+                placeholders = ', '.join(['%s'] * len(rows))
+                db.execute(f"""
+                    UPDATE email_outbox
+                    SET status = 'sending', attempts = attempts + 1,
+                        next_attempt_at = NOW() + INTERVAL %s SECOND
+                    WHERE id IN ({placeholders})
+                """, [lease_seconds] + [row['id'] for row in rows])
+        return rows
+    except Error as e:
+        logger.error(f"DB error in claim_pending_emails: {e}")
+        return []
+
+def mark_email_sent(email_id):
+    """Marks an email sent and clears its body, which may hold an OTP code."""
+    try:
+        execute("""
+            UPDATE email_outbox SET status = 'sent', sent_at = NOW(), last_error = NULL, html_body = ''
+            WHERE id = %s
+        """, (email_id,))
+        return True
+    except Error as e:
+        logger.error(f"DB error in mark_email_sent: {e}")
+        return False
+
+def mark_email_failed(email_id, error_message, retry_in_seconds=None):
+    """Schedules a retry, or gives up (clearing the body) when retry_in_seconds is None."""
+    try:
+        if retry_in_seconds is None:
+            execute("""
+                UPDATE email_outbox SET status = 'failed', last_error = %s, html_body = ''
+                WHERE id = %s
+            """, (error_message[:500], email_id))
+        else:
+            execute("""
+                UPDATE email_outbox
+                SET status = 'pending', last_error = %s,
+                    next_attempt_at = NOW() + INTERVAL %s SECOND
+                WHERE id = %s
+            """, (error_message[:500], retry_in_seconds, email_id))
+        return True
+    except Error as e:
+        logger.error(f"DB error in mark_email_failed: {e}")
+        return False
+
+def purge_old_emails(retention_days, batch_size=500):
+    """Deletes sent and failed emails last attempted more than retention_days ago, in small batches."""
+    deleted = 0
+    try:
+        while True:
+            # next_attempt_at is the last claim's lease end, and is covered by idx_outbox_due
+            result = execute("""
+                DELETE FROM email_outbox
+                WHERE status IN ('sent', 'failed') AND next_attempt_at < NOW() - INTERVAL %s DAY
+                LIMIT %s
+            """, (retention_days, batch_size))
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                break
+            # Let the sender's claims through between batches
+            time.sleep(0.05)
+        return {"status": "success", "message": f"Old outbox emails purged ({deleted} deleted)"}
+    except Error as e:
+        logger.error(f"DB error in purge_old_emails: {e}")
+        return {"status": "error", "message": str(e)}
+
+def count_emails_by_status():
+    """Number of outbox messages per status, or {} if they could not be counted."""
+    try:
+        rows = fetch_all("SELECT status, COUNT(*) FROM email_outbox GROUP BY status", dictionary=False)
+        return dict(rows)
+    except Error as e:
+        logger.error(f"DB error in count_emails_by_status: {e}")
+        return {}
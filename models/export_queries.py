@@ -0,0 +1,64 @@
+import logging
+import mysql.connector
+
+logger = logging.getLogger(__name__)
+
+# Exportable tables: name -> (column headers, query). Passwords are never exported.
+EXPORTS = {
+    'users': (
+        ('email', 'name', 'role'),
+        "SELECT email, name, role FROM users ORDER BY email"
+    ),
+    'artworks': (
+        ('art_id', 'title', 'price', 'created_at', 'artist_email', 'artist_name'),
+        """SELECT a.art_id, a.title, a.price, a.created_at, a.email, u.name
+           FROM art a LEFT JOIN users u ON a.email = u.email
+           ORDER BY a.art_id"""
+    ),
+    'orders': (
+        ('order_id', 'email', 'total_price', 'order_date', 'order_status'),
+        """SELECT order_id, email, total_amount, order_date, status
+           FROM orders ORDER BY order_id"""
+    ),
+}
+
+def open_export(db_config, name, batch_size=1000):
+    """Starts an export on its own connection; returns (columns, row batches, close).
+
+    The connection is opened outside the pool so a long download never
+    holds a pooled connection, and the cursor is unbuffered so rows are
+    read from the server as the client consumes them. Errors connecting
+    or running the query are raised here, before any response is sent.
+    The caller must call close() once the response is finished, whether
+    or not every batch was read.
+    """
+    columns, query = EXPORTS[name]
+    conn = mysql.connector.connect(**db_config)
+
+    def close():
+        try:
+            # Also discards any rows left unread when the client disconnected early
+            conn.close()
+        except mysql.connector.Error as e:
+            logger.warning(f"Error closing {name} export connection: {e}")
+
+    try:
+        cursor = conn.cursor()
+        # A slow client can leave the server waiting to send the next rows
+        cursor.execute("SET SESSION net_write_timeout = 600")
+        cursor.execute(query)
+    except Exception:
+        close()
+        raise
+    return columns, _batches(cursor, name, batch_size), close
+
+def _batches(cursor, name, batch_size):
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    except mysql.connector.Error as e:
+        logger.error(f"DB error streaming {name} export: {e}")
+        raise
@@ -1,9 +1,14 @@
+import hmac
 import logging
 import random
 import string
+import threading
+import time
+from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 from mysql.connector import Error
-from .database import get_db_connection
+from flask import current_app
+from .database import execute
 
 logger = logging.getLogger(__name__)
 
@@ -11,60 +16,159 @@ def generate_otp():
     """Generate a 6-digit OTP."""
     return ''.join(random.choices(string.digits, k=6))
 
-def store_otp(email, otp, expiry_minutes=10):
-    """Store OTP in database with expiry time."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Delete any existing OTP for this email
-        cursor.execute("DELETE FROM otp_codes WHERE email = %s", (email,))
-        
-        # Insert new OTP
-        expiry_time = datetime.now() + timedelta(minutes=expiry_minutes)
-        cursor.execute(
-            "INSERT INTO otp_codes (email, otp, expiry_time) VALUES (%s, %s, %s)",
-            (email, otp, expiry_time)
-        )
-        conn.commit()
+
+class OTPStore(ABC):
+    """Interface for OTP storage backends.
+
+    Every method returns the same status dicts the route handlers already
+    check, so backends can be swapped through the OTP_STORE config key.
+    """
+
+    @abstractmethod
+    def store(self, email, otp, expiry_minutes=10):
+        ...
+
+    @abstractmethod
+    def verify(self, email, otp):
+        ...
+
+    @abstractmethod
+    def cleanup_expired(self):
+        ...
+
+
+class MySQLOTPStore(OTPStore):
+    """Stores OTPs in the otp_codes table (one row per email)."""
+
+    def store(self, email, otp, expiry_minutes=10):
+        try:
+            # Relies on the unique key on otp_codes.email to replace any previous OTP
+            expiry_time = datetime.now() + timedelta(minutes=expiry_minutes)
+            execute("""
+                INSERT INTO otp_codes (email, otp, expiry_time) VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE otp = VALUES(otp), expiry_time = VALUES(expiry_time),
+                                        created_at = CURRENT_TIMESTAMP
+            """, (email, otp, expiry_time))
+            return {"status": "success", "message": "OTP stored successfully"}
+        except Error as e:
+            logger.error(f"DB error in store_otp: {e}")
+            return {"status": "error", "message": str(e)}
+
+    def verify(self, email, otp):
+        try:
+            # Consume the OTP in the same statement that checks it
+            result = execute(
+                "DELETE FROM otp_codes WHERE email = %s AND otp = %s AND expiry_time > NOW()",
+                (email, otp)
+            )
+            if result.rowcount > 0:
+                return {"status": "success", "message": "OTP verified successfully"}
+            return {"status": "error", "message": "Invalid or expired OTP"}
+        except Error as e:
+            logger.error(f"DB error in verify_otp: {e}")
+            return {"status": "error", "message": str(e)}
+
+    def cleanup_expired(self):
+        """Deletes expired OTPs in small batches so otp_codes is never locked for long."""
+        batch_size = current_app.config.get('OTP_CLEANUP_BATCH_SIZE', 500)
+        deleted = 0
+        try:
+            while True:
+                result = execute("DELETE FROM otp_codes WHERE expiry_time < NOW() LIMIT %s", (batch_size,))
+                deleted += result.rowcount
+                if result.rowcount < batch_size:
+                    break
+                # Let waiting OTP writes through between batches
+                time.sleep(0.05)
+            return {"status": "success", "message": f"Expired OTPs cleaned up ({deleted} deleted)"}
+        except Error as e:
+            logger.error(f"DB error in cleanup_expired_otp: {e}")
+            return {"status": "error", "message": str(e)}
+
+
+class InMemoryOTPStore(OTPStore):
+    """Keeps OTPs in process memory; send and verify never touch the database.
+
+    Expiry is tracked with a timing wheel: each entry is filed under the
+    tick in which it expires, and every call sweeps only the ticks that have
+    elapsed since the last sweep. OTPs live in a single process, so with
+    several workers this backend needs sticky sessions or a single worker.
+    """
+
+    def __init__(self, tick_seconds=1):
+        self._tick_seconds = tick_seconds
+        self._entries = {}   # email -> (otp, expires_at)
+        self._wheel = {}     # tick -> set of emails expiring in that tick
+        self._swept_tick = self._tick(time.monotonic())
+        self._lock = threading.Lock()
+
+    def _tick(self, timestamp):
+        return int(timestamp // self._tick_seconds)
+
+    def _sweep(self, now):
+        current = self._tick(now)
+        # Jump straight over long idle gaps instead of walking every tick
+        if current - self._swept_tick > len(self._wheel):
+            due = [tick for tick in self._wheel if tick < current]
+        else:
+            due = range(self._swept_tick, current)
+        for tick in due:
+            for email in self._wheel.pop(tick, ()):
+                entry = self._entries.get(email)
+                # The email may have been issued a newer OTP since
+                if entry and entry[1] <= now:
+                    del self._entries[email]
+        self._swept_tick = current
+
+    def store(self, email, otp, expiry_minutes=10):
+        now = time.monotonic()
+        expires_at = now + expiry_minutes * 60
+        with self._lock:
+            self._sweep(now)
+            self._entries[email] = (otp, expires_at)
+            self._wheel.setdefault(self._tick(expires_at), set()).add(email)
         return {"status": "success", "message": "OTP stored successfully"}
-    except Error as e:
-        conn.rollback()
-        logger.error(f"DB error in store_otp: {e}")
-        return {"status": "error", "message": str(e)}
+
+    def verify(self, email, otp):
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            entry = self._entries.get(email)
+            if entry and entry[1] > now and hmac.compare_digest(entry[0], str(otp)):
+                del self._entries[email]
+                return {"status": "success", "message": "OTP verified successfully"}
+        return {"status": "error", "message": "Invalid or expired OTP"}
+
+    def cleanup_expired(self):
+        with self._lock:
+            self._sweep(time.monotonic())
+        return {"status": "success", "message": "Expired OTPs cleaned up"}
+
+
+OTP_STORES = {
+    'mysql': MySQLOTPStore,
+    'memory': InMemoryOTPStore,
+}
+
+def init_otp_store(app):
+    """Creates the OTP store selected by the OTP_STORE config key."""
+    backend = app.config.get('OTP_STORE', 'mysql')
+    if backend not in OTP_STORES:
+        raise ValueError(f"Unknown OTP_STORE backend: {backend}")
+    app.otp_store = OTP_STORES[backend]()
+    logger.info(f"OTP store initialized with '{backend}' backend.")
+
+def get_otp_store():
+    return current_app.otp_store
+
+def store_otp(email, otp, expiry_minutes=10):
+    """Store OTP with expiry time."""
+    return get_otp_store().store(email, otp, expiry_minutes)
 
 def verify_otp(email, otp):
     """Verify OTP for given email."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        # Get OTP and check if it's valid and not expired
-        cursor.execute(
-            "SELECT * FROM otp_codes WHERE email = %s AND otp = %s AND expiry_time > NOW()",
-            (email, otp)
-        )
-        result = cursor.fetchone()
-        
-        if result:
-            # Delete the used OTP
-            cursor.execute("DELETE FROM otp_codes WHERE email = %s", (email,))
-            conn.commit()
-            return {"status": "success", "message": "OTP verified successfully"}
-        else:
-            return {"status": "error", "message": "Invalid or expired OTP"}
-    except Error as e:
-        logger.error(f"DB error in verify_otp: {e}")
-        return {"status": "error", "message": str(e)}
+    return get_otp_store().verify(email, otp)
 
 def cleanup_expired_otp():
     """Clean up expired OTP codes."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM otp_codes WHERE expiry_time < NOW()")
-        conn.commit()
-        return {"status": "success", "message": "Expired OTPs cleaned up"}
-    except Error as e:
-        logger.error(f"DB error in cleanup_expired_otp: {e}")
-        return {"status": "error", "message": str(e)} 
\ No newline at end of file
+    return get_otp_store().cleanup_expired()
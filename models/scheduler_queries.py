@@ -0,0 +1,66 @@
+import logging
+from mysql.connector import Error
+from .database import execute, fetch_one, fetch_all, fetch_value
+
+logger = logging.getLogger(__name__)
+
+def acquire_job_lock(job_name):
+    """Takes the named MySQL lock for a job without waiting; True if this worker got it."""
+    try:
+        return fetch_value("SELECT GET_LOCK(%s, 0)", (f"artbay_job_{job_name}",)) == 1
+    except Error as e:
+        logger.error(f"DB error in acquire_job_lock: {e}")
+        return False
+
+def release_job_lock(job_name):
+    try:
+        fetch_value("SELECT RELEASE_LOCK(%s)", (f"artbay_job_{job_name}",))
+    except Error as e:
+        logger.error(f"DB error in release_job_lock: {e}")
+
+def job_ran_recently(job_name, interval_seconds):
+    """True if any worker started the job within the last interval."""
+    try:
+        return fetch_one("""
+            SELECT 1 FROM scheduled_job_runs
+            WHERE job_name = %s AND last_started_at > NOW() - INTERVAL %s SECOND
+        """, (job_name, interval_seconds)) is not None
+    except Error as e:
+        logger.error(f"DB error in job_ran_recently: {e}")
+        return True
+
+def record_job_start(job_name, runner):
+    try:
+        execute("""
+            INSERT INTO scheduled_job_runs (job_name, last_started_at, last_runner, last_status)
+            VALUES (%s, NOW(), %s, 'running')
+            ON DUPLICATE KEY UPDATE last_started_at = NOW(), last_runner = VALUES(last_runner),
+                                    last_status = 'running'
+        """, (job_name, runner))
+    except Error as e:
+        logger.error(f"DB error in record_job_start: {e}")
+
+def record_job_finish(job_name, status, duration_ms, result_message):
+    try:
+        execute("""
+            UPDATE scheduled_job_runs
+            SET last_finished_at = NOW(), last_status = %s, last_duration_ms = %s,
+                last_result = %s, run_count = run_count + 1,
+                failure_count = failure_count + %s
+            WHERE job_name = %s
+        """, (status, duration_ms, (result_message or '')[:500], 1 if status == 'error' else 0, job_name))
+    except Error as e:
+        logger.error(f"DB error in record_job_finish: {e}")
+
+def get_job_runs():
+    """Fetches the last run of every scheduled job."""
+    try:
+        return fetch_all("""
+            SELECT job_name, last_started_at, last_finished_at, last_status, last_duration_ms,
+                   last_result, last_runner, run_count, failure_count
+            FROM scheduled_job_runs
+            ORDER BY job_name
+        """)
+    except Error as e:
+        logger.error(f"DB error in get_job_runs: {e}")
+        return {'error': str(e)}
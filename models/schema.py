@@ -0,0 +1,122 @@
+import logging
+import os
+from mysql.connector import Error, errorcode
+
+logger = logging.getLogger(__name__)
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database')
+
+# Ordered schema migrations: (version, description, file in database/).
+# Append new entries; never edit or reorder one that has shipped. The core
+# tables (users, art, cart, orders, order_items, shipping_info) come from
+# the base schema and must exist before version 1 is applied.
+MIGRATIONS = [
+    (1, 'otp codes', 'otp_table.sql'),
+    (2, 'admin settings and artists', 'admin_tables.sql'),
+    (3, 'order history indexes', 'order_indexes.sql'),
+    (4, 'email outbox', 'email_outbox.sql'),
+    (5, 'admin list indexes', 'admin_indexes.sql'),
+    (6, 'scheduled job runs', 'scheduler.sql'),
+    (7, 'admin dashboard counters', 'admin_counters.sql'),
+    (8, 'settings version', 'settings_version.sql'),
+    (9, 'daily sales rollups', 'sales_rollups.sql'),
+    (10, 'unique otp email', 'otp_unique_email.sql'),
+    (11, 'seed admin counters', 'admin_counters_seed.sql'),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Objects that already exist (or were already dropped) because a file was
+# run by hand before migrations were tracked; the statement is treated as applied.
+ALREADY_APPLIED = (errorcode.ER_TABLE_EXISTS_ERROR, errorcode.ER_DUP_KEYNAME,
+                   errorcode.ER_CANT_DROP_FIELD_OR_KEY)
+
+MIGRATE_LOCK = 'artbay_schema_migrate'
+
+def read_statements(filename):
+    """Splits a database/*.sql file into statements, dropping -- comments."""
+    with open(os.path.join(SQL_DIR, filename)) as f:
+        lines = [line for line in f if not line.lstrip().startswith('--')]
+    return [stmt.strip() for stmt in ''.join(lines).split(';') if stmt.strip()]
+
+def ensure_version_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+def get_schema_version(cursor):
+    """Highest applied migration, or 0 on a database that has never been migrated."""
+    try:
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+        return cursor.fetchone()[0]
+    except Error as e:
+        if e.errno == errorcode.ER_NO_SUCH_TABLE:
+            return 0
+        raise
+
+def migrate(conn, target=None):
+    """Applies pending migrations up to target (default: latest) on conn.
+
+    Runs under a MySQL named lock so workers starting together apply each
+    migration once. Returns the list of versions applied.
+    """
+    target = SCHEMA_VERSION if target is None else target
+    cursor = conn.cursor()
+    cursor.execute("SELECT GET_LOCK(%s, 60)", (MIGRATE_LOCK,))
+    if cursor.fetchone()[0] != 1:
+        raise RuntimeError("Timed out waiting for the schema migration lock")
+    applied = []
+    try:
+        ensure_version_table(cursor)
+        current = get_schema_version(cursor)
+        for version, description, filename in MIGRATIONS:
+            if version <= current or version > target:
+                continue
+            logger.info(f"Applying schema migration {version}: {description}")
+            for statement in read_statements(filename):
+                try:
+                    cursor.execute(statement)
+                except Error as e:
+                    if e.errno not in ALREADY_APPLIED:
+                        raise
+                    logger.info(f"Migration {version}: skipping existing object ({e.msg})")
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                (version, description)
+            )
+            conn.commit()
+            applied.append(version)
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATE_LOCK,))
+        cursor.fetchone()
+        cursor.close()
+    return applied
+
+def init_schema(app):
+    """Checks the schema version once at startup, migrating when SCHEMA_AUTO_MIGRATE is set.
+
+    Query modules assume every table in MIGRATIONS exists, so an outdated
+    schema is reported here rather than probed for on each request.
+    """
+    conn = app.db_pool.get_connection()
+    try:
+        if app.config.get('SCHEMA_AUTO_MIGRATE'):
+            applied = migrate(conn)
+            if applied:
+                logger.info(f"Schema migrated to version {SCHEMA_VERSION} (applied {applied})")
+            return
+        cursor = conn.cursor()
+        version = get_schema_version(cursor)
+        cursor.close()
+        if version < SCHEMA_VERSION:
+            logger.warning(
+                f"Database schema is at version {version}, expected {SCHEMA_VERSION}; "
+                "run `python create_otp_table.py` to apply pending migrations"
+            )
+    except Error as e:
+        logger.error(f"DB error checking schema version: {e}")
+    finally:
+        conn.close()
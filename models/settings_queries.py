@@ -0,0 +1,48 @@
+import logging
+from mysql.connector import Error
+from .database import transaction, fetch_all, fetch_value
+
+logger = logging.getLogger(__name__)
+
+def get_settings_version():
+    """Current settings version, or None if it could not be read."""
+    try:
+        return fetch_value("SELECT version FROM settings_version WHERE id = 1") or 0
+    except Error as e:
+        logger.error(f"DB error in get_settings_version: {e}")
+        return None
+
+def load_settings():
+    """Reads every setting together with the version it belongs to.
+
+    The version is read first, so a write landing in between leaves the
+    snapshot tagged with the older version and it is reloaded next check.
+    """
+    try:
+        version = fetch_value("SELECT version FROM settings_version WHERE id = 1") or 0
+        rows = fetch_all("SELECT setting_key, setting_value FROM settings", dictionary=False)
+        return {'version': version, 'settings': dict(rows)}
+    except Error as e:
+        logger.error(f"DB error in load_settings: {e}")
+        return {'error': str(e)}
+
+def save_settings(settings_data):
+    """Upserts all given settings in one statement and bumps the settings version."""
+    if not settings_data:
+        return {'status': 'success'}
+    try:
+        placeholders = ", ".join(["(%s, %s)"] * len(settings_data))
+        params = []
+        for key, value in settings_data.items():
+            params.extend((key, str(value)))
+        with transaction() as db:
+            db.execute(f"""
+                INSERT INTO settings (setting_key, setting_value)
+                VALUES {placeholders}
+                ON DUPLICATE KEY UPDATE setting_value = VALUES(setting_value)
+            """, params)
+            db.execute("UPDATE settings_version SET version = version + 1 WHERE id = 1")
+        return {'status': 'success'}
+    except Error as e:
+        logger.error(f"DB error in save_settings: {e}")
+        return {'error': str(e)}
@@ -1,52 +1,143 @@
 import logging
+import threading
+import time
+from collections import OrderedDict
 from mysql.connector import Error
-from werkzeug.security import generate_password_hash
-from .database import get_db_connection
+from flask import current_app, g
+from services.password_service import hash_password
+from .database import transaction, execute, fetch_one, fetch_value
+from .counter_queries import bump_counter, is_pending_artist
 
 logger = logging.getLogger(__name__)
 
+# Process-wide LRU cache of user rows without the password hash: email -> (row, expires_at).
+# Only found users are cached; a miss always goes to the database. Holds at most USER_CACHE_MAX.
+_user_cache = OrderedDict()
+_user_cache_lock = threading.Lock()
+_user_cache_totals = {'request_hits': 0, 'process_hits': 0, 'db_queries': 0}
+
+def _user_cache_stats():
+    """Per-request counters, kept on flask.g."""
+    if 'user_cache_stats' not in g:
+        g.user_cache_stats = {'request_hits': 0, 'process_hits': 0, 'db_queries': 0}
+    return g.user_cache_stats
+
+def _count(counter):
+    _user_cache_stats()[counter] += 1
+    with _user_cache_lock:
+        _user_cache_totals[counter] += 1
+
+def get_user_cache_stats():
+    """Returns process-wide cache counters since startup."""
+    with _user_cache_lock:
+        return dict(_user_cache_totals, cached_users=len(_user_cache))
+
+def log_user_cache_stats(e=None):
+    """Teardown hook logging how many user lookups the caches saved this request."""
+    stats = g.pop('user_cache_stats', None)
+    if stats:
+        saved = stats['request_hits'] + stats['process_hits']
+        logger.debug(f"User cache: {saved} DB queries saved (request memo {stats['request_hits']}, "
+                     f"process cache {stats['process_hits']}), {stats['db_queries']} DB queries")
+
+def invalidate_user(email):
+    """Drops a user from the request memo and the process cache after a write."""
+    if 'user_memo' in g:
+        g.user_memo.pop(email, None)
+    with _user_cache_lock:
+        _user_cache.pop(email, None)
+
 def add_user(name, email, password):
     """Adds a new user to the database."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         # Check if email already exists
-        cursor.execute("SELECT COUNT(*) FROM users WHERE email = %s", (email,))
-        if cursor.fetchone()[0] > 0:
+        if fetch_value("SELECT COUNT(*) FROM users WHERE email = %s", (email,)) > 0:
             return {"error": "This email is already registered."}
 
-        hashed_password = generate_password_hash(password)
-        query = "INSERT INTO users (name, email, password, role) VALUES (%s, %s, %s, 'user')"
-        cursor.execute(query, (name, email, hashed_password))
-        conn.commit()
+        hashed_password = hash_password(password)
+        with transaction() as db:
+            db.execute("INSERT INTO users (name, email, password, role) VALUES (%s, %s, %s, 'user')",
+                       (name, email, hashed_password))
+            bump_counter(db, 'total_users', 1)
+        invalidate_user(email)
         return {"message": "User added successfully"}
     except Error as e:
-        get_db_connection().rollback()
         logger.error(f"DB error in add_user: {e}")
         return {"error": str(e)}
 
 def get_user_by_email(email):
-    """Retrieves a user by email."""
+    """Retrieves a user by email.
+
+    Memoized per request on flask.g and cached for USER_CACHE_TTL seconds
+    across requests; writes to users call invalidate_user. The password
+    hash is left out; login reads it with get_user_for_login.
+    """
+    memo = g.setdefault('user_memo', {})
+    if email in memo:
+        _count('request_hits')
+        return dict(memo[email]) if memo[email] else None
+
+    now = time.monotonic()
+    with _user_cache_lock:
+        cached = _user_cache.get(email)
+        if cached and cached[1] <= now:
+            del _user_cache[email]
+            cached = None
+        elif cached:
+            _user_cache.move_to_end(email)
+    if cached:
+        _count('process_hits')
+        memo[email] = cached[0]
+        return dict(cached[0])
+
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
-        return cursor.fetchone()
+        user = fetch_one("SELECT * FROM users WHERE email = %s", (email,), prepared=True)
+        _count('db_queries')
     except Error as e:
         logger.error(f"DB error in get_user_by_email: {e}")
         return None
 
+    if user:
+        user.pop('password', None)
+    memo[email] = user
+    if user:
+        ttl = current_app.config.get('USER_CACHE_TTL', 30)
+        max_users = current_app.config.get('USER_CACHE_MAX', 10000)
+        with _user_cache_lock:
+            _user_cache[email] = (user, now + ttl)
+            _user_cache.move_to_end(email)
+            while len(_user_cache) > max_users:
+                _user_cache.popitem(last=False)
+        return dict(user)
+    return None
+
+def get_user_for_login(email):
+    """Reads a user with their password hash straight from the database, bypassing the caches."""
+    try:
+        return fetch_one("SELECT * FROM users WHERE email = %s", (email,), prepared=True)
+    except Error as e:
+        logger.error(f"DB error in get_user_for_login: {e}")
+        return None
+
 def upgrade_to_artist(email):
     """Updates a user's role to 'artist'."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        query = "UPDATE users SET role = 'artist' WHERE email = %s"
-        cursor.execute(query, (email,))
-        conn.commit()
+        with transaction() as db:
+            was_pending = is_pending_artist(db, email)
+            db.execute("UPDATE users SET role = 'artist' WHERE email = %s", (email,))
+            bump_counter(db, 'pending_artists', is_pending_artist(db, email) - was_pending)
+        invalidate_user(email)
         return {"message": "You are now an artist!"}
     except Error as e:
-        get_db_connection().rollback()
         logger.error(f"DB error in upgrade_to_artist: {e}")
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+def update_password_hash(email, password_hash):
+    """Replaces a user's stored password hash."""
+    try:
+        execute("UPDATE users SET password = %s WHERE email = %s", (password_hash, email))
+        invalidate_user(email)
+        return True
+    except Error as e:
+        logger.error(f"DB error in update_password_hash: {e}")
+        return False
@@ -0,0 +1,131 @@
+import logging
+import zlib
+from flask import request
+from werkzeug.wsgi import ClosingIterator
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Media types worth compressing; images, archives and other binary formats are already compact
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript', 'text/xml',
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'application/xml', 'image/svg+xml',
+}
+
+class GzipEncoder:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 writes a gzip header
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def choose_encoding(accept_encodings, brotli_enabled):
+    """'br' or 'gzip', whichever the client accepts with the higher quality (brotli wins ties), or None."""
+    gzip_quality = accept_encodings.quality('gzip')
+    if brotli_enabled:
+        br_quality = accept_encodings.quality('br')
+        if br_quality > 0 and br_quality >= gzip_quality:
+            return 'br'
+    return 'gzip' if gzip_quality > 0 else None
+
+def compressed_chunks(chunks, encoder, flush=True):
+    """Compresses a streamed body.
+
+    With flush, the encoder is flushed after every chunk so the client gets
+    each one as it is produced; without, output comes as the encoder fills
+    its buffer, which compresses better.
+    """
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = encoder.compress(chunk)
+        if flush:
+            data += encoder.flush()
+        if data:
+            yield data
+    yield encoder.finish()
+
+def init_compression(app):
+    """Compresses HTML, JSON and other text responses with gzip or brotli.
+
+    Reads COMPRESSION_ENABLED, COMPRESSION_LEVEL (gzip 1-9),
+    COMPRESSION_BROTLI_QUALITY (0-11) and COMPRESSION_MIN_SIZE from config.
+    Register it before other after_request hooks so it runs last and sees
+    the final body.
+    """
+    if not app.config['COMPRESSION_ENABLED']:
+        return
+    level = app.config['COMPRESSION_LEVEL']
+    brotli_quality = app.config['COMPRESSION_BROTLI_QUALITY']
+    min_size = app.config['COMPRESSION_MIN_SIZE']
+    brotli_enabled = brotli is not None
+
+    def encoder_for(encoding):
+        return BrotliEncoder(brotli_quality) if encoding == 'br' else GzipEncoder(level)
+
+    @app.after_request
+    def compress_response(response):
+        if (response.mimetype not in COMPRESSIBLE_TYPES
+                or 'Content-Encoding' in response.headers
+                or response.direct_passthrough
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'no-transform' in response.headers.get('Cache-Control', '')):
+            return response
+        # The body depends on Accept-Encoding from here on, whether or not this client gets it compressed
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings, brotli_enabled)
+        if encoding is None or request.method == 'HEAD':
+            return response
+
+        if response.is_streamed:
+            if response.content_length is not None and response.content_length < min_size:
+                return response
+            # ClosingIterator still closes the original body, even if the client left before it started
+            body = response.response
+            response.response = ClosingIterator(compressed_chunks(body, encoder_for(encoding)),
+                                                getattr(body, 'close', None))
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < min_size:
+                return response
+            encoder = encoder_for(encoding)
+            response.set_data(encoder.compress(body) + encoder.finish())
+
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # The compressed bytes differ from the identity body, so the tag can no longer be strong
+            response.set_etag(etag, weak=True)
+        return response
+
+    logger.info("Response compression enabled (%s, min %s bytes)",
+                'br, gzip' if brotli_enabled else 'gzip', min_size)
@@ -0,0 +1,97 @@
+import logging
+import threading
+from services.email_service import EmailService, outbox_wakeup
+from models.email_outbox_queries import claim_pending_emails, mark_email_sent, mark_email_failed
+from services.metrics import count
+
+logger = logging.getLogger(__name__)
+
+class OutboxSender(threading.Thread):
+    """Background thread that drains the email_outbox table.
+
+    It keeps one authenticated SMTP session open and sends every claimed
+    email over it, so a burst of signups costs one SMTP handshake instead
+    of one per email. Failed sends are retried with exponential backoff.
+
+    Emails are claimed and leased one at a time, each in its own app
+    context, so a slow SMTP server can neither outlast the leases of a
+    whole batch (letting another sender send them again) nor hold a pooled
+    database connection while it talks to SMTP.
+    """
+
+    def __init__(self, app):
+        super().__init__(name='email-outbox-sender', daemon=True)
+        self.app = app
+        self.batch_size = app.config['EMAIL_OUTBOX_BATCH_SIZE']
+        self.poll_seconds = app.config['EMAIL_OUTBOX_POLL_SECONDS']
+        self.max_attempts = app.config['EMAIL_MAX_ATTEMPTS']
+        self.retry_base_seconds = app.config['EMAIL_RETRY_BASE_SECONDS']
+        self.email_service = EmailService()
+        # Connecting, STARTTLS, login and sending may each take up to the SMTP timeout
+        self.lease_seconds = max(app.config['EMAIL_OUTBOX_LEASE_SECONDS'], 4 * self.email_service.timeout)
+        self._stopping = threading.Event()
+
+    def stop(self):
+        self._stopping.set()
+        outbox_wakeup.set()
+
+    def retry_delay(self, attempts):
+        return min(self.retry_base_seconds * 2 ** (attempts - 1), 3600)
+
+    def claim_next(self):
+        """Claims and leases the next due email, or returns None."""
+        # The app context ends before the send, returning the pooled connection
+        with self.app.app_context():
+            emails = claim_pending_emails(1, self.lease_seconds)
+        return emails[0] if emails else None
+
+    def record_result(self, email, result):
+        attempts = email['attempts'] + 1
+        with self.app.app_context():
+            if result['status'] == 'success':
+                mark_email_sent(email['id'])
+                count('artbay_emails_total', result='sent')
+            elif attempts >= self.max_attempts:
+                logger.error(f"Giving up on email {email['id']} after {attempts} attempts: {result['message']}")
+                mark_email_failed(email['id'], result['message'])
+                count('artbay_emails_total', result='failed')
+            else:
+                mark_email_failed(email['id'], result['message'], self.retry_delay(attempts))
+                count('artbay_emails_total', result='retry')
+
+    def process_batch(self):
+        """Sends up to batch_size due emails and returns how many were claimed."""
+        claimed = 0
+        while claimed < self.batch_size and not self._stopping.is_set():
+            email = self.claim_next()
+            if email is None:
+                break
+            claimed += 1
+            result = self.email_service.send_email(email['recipient'], email['subject'], email['html_body'])
+            self.record_result(email, result)
+        return claimed
+
+    def run(self):
+        logger.info("Email outbox sender started.")
+        while not self._stopping.is_set():
+            try:
+                claimed = self.process_batch()
+            except Exception as e:
+                logger.error(f"Email outbox sender error: {e}", exc_info=True)
+                claimed = 0
+
+            # Keep draining while full batches come back; otherwise sleep until woken
+            if claimed < self.batch_size:
+                self.email_service.close_if_idle()
+                outbox_wakeup.wait(self.poll_seconds)
+                outbox_wakeup.clear()
+        self.email_service.close()
+
+def init_email_outbox(app):
+    """Starts the background outbox sender if enabled."""
+    if not app.config.get('EMAIL_OUTBOX_WORKER', True):
+        logger.info("Email outbox sender disabled.")
+        return
+    app.email_sender = OutboxSender(app)
+    if app.config['START_BACKGROUND_THREADS']:
+        app.email_sender.start()
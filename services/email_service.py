@@ -1,136 +1,192 @@
 import smtplib
 import logging
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from config.config import Config
+from models.email_outbox_queries import enqueue_email
 
 logger = logging.getLogger(__name__)
 
+# Set whenever an email is queued so the outbox sender wakes up immediately
+outbox_wakeup = threading.Event()
+
 class EmailService:
     def __init__(self):
-        self.smtp_server = "smtp.gmail.com"
-        self.smtp_port = 587
+        self.smtp_server = Config.SMTP_SERVER
+        self.smtp_port = Config.SMTP_PORT
+        self.use_tls = Config.SMTP_USE_TLS
+        self.use_login = Config.SMTP_LOGIN
+        self.idle_timeout = Config.SMTP_IDLE_TIMEOUT
+        self.timeout = Config.SMTP_TIMEOUT
         self.sender_email = Config.SENDER_EMAIL
         self.sender_password = Config.SENDER_PASSWORD
-        
-    def send_otp_email(self, recipient_email, otp, user_name=""):
-        """Send OTP email to user."""
-        try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.sender_email
-            msg['To'] = recipient_email
-            msg['Subject'] = "ART&BAY - Your Login OTP"
-            
-            # Email body
-            body = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <div style="text-align: center; margin-bottom: 30px;">
-                        <h1 style="color: #ff6a00; margin: 0;">ART&BAY</h1>
-                        <p style="color: #666; margin: 5px 0;">Your Art Gallery</p>
-                    </div>
+        self._server = None
+        self._last_used = 0
+
+    # --- Message bodies ---
+
+    def otp_email_body(self, otp, user_name=""):
+        return f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <div style="text-align: center; margin-bottom: 30px;">
+                    <h1 style="color: #ff6a00; margin: 0;">ART&BAY</h1>
+                    <p style="color: #666; margin: 5px 0;">Your Art Gallery</p>
+                </div>
+                
+                <div style="background-color: #f9f9f9; padding: 30px; border-radius: 10px; border-left: 4px solid #ff6a00;">
+                    <h2 style="color: #333; margin-top: 0;">Login Verification</h2>
+                    <p>Hello {user_name or 'there'},</p>
+                    <p>You have requested to login to your ART&BAY account. Please use the following OTP to complete your login:</p>
                     
-                    <div style="background-color: #f9f9f9; padding: 30px; border-radius: 10px; border-left: 4px solid #ff6a00;">
-                        <h2 style="color: #333; margin-top: 0;">Login Verification</h2>
-                        <p>Hello {user_name or 'there'},</p>
-                        <p>You have requested to login to your ART&BAY account. Please use the following OTP to complete your login:</p>
-                        
-                        <div style="background-color: #fff; padding: 20px; border-radius: 8px; text-align: center; margin: 20px 0;">
-                            <h1 style="color: #ff6a00; font-size: 32px; letter-spacing: 5px; margin: 0; font-family: monospace;">{otp}</h1>
-                        </div>
-                        
-                        <p><strong>This OTP will expire in 10 minutes.</strong></p>
-                        
-                        <div style="background-color: #fff3cd; border: 1px solid #ffeaa7; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                            <p style="margin: 0; color: #856404;">
-                                <strong>Security Notice:</strong> Never share this OTP with anyone. 
-                                ART&BAY will never ask for your OTP via phone or email.
-                            </p>
-                        </div>
-                        
-                        <p>If you didn't request this login, please ignore this email.</p>
-                        
-                        <p>Best regards,<br>The ART&BAY Team</p>
+                    <div style="background-color: #fff; padding: 20px; border-radius: 8px; text-align: center; margin: 20px 0;">
+                        <h1 style="color: #ff6a00; font-size: 32px; letter-spacing: 5px; margin: 0; font-family: monospace;">{otp}</h1>
                     </div>
                     
-                    <div style="text-align: center; margin-top: 30px; color: #666; font-size: 12px;">
-                        <p>This is an automated email. Please do not reply to this message.</p>
+                    <p><strong>This OTP will expire in 10 minutes.</strong></p>
+                    
+                    <div style="background-color: #fff3cd; border: 1px solid #ffeaa7; padding: 15px; border-radius: 5px; margin: 20px 0;">
+                        <p style="margin: 0; color: #856404;">
+                            <strong>Security Notice:</strong> Never share this OTP with anyone. 
+                            ART&BAY will never ask for your OTP via phone or email.
+                        </p>
                     </div>
+                    
+                    <p>If you didn't request this login, please ignore this email.</p>
+                    
+                    <p>Best regards,<br>The ART&BAY Team</p>
                 </div>
-            </body>
-            </html>
-            """
-            
-            msg.attach(MIMEText(body, 'html'))
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
                 
-            logger.info(f"OTP email sent successfully to {recipient_email}")
-            return {"status": "success", "message": "OTP email sent successfully"}
-            
-        except Exception as e:
-            logger.error(f"Error sending OTP email to {recipient_email}: {e}")
-            return {"status": "error", "message": f"Failed to send OTP email: {str(e)}"}
-    
-    def send_welcome_email(self, recipient_email, user_name):
-        """Send welcome email to new users."""
-        try:
-            msg = MIMEMultipart()
-            msg['From'] = self.sender_email
-            msg['To'] = recipient_email
-            msg['Subject'] = "Welcome to ART&BAY!"
-            
-            body = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <div style="text-align: center; margin-bottom: 30px;">
-                        <h1 style="color: #ff6a00; margin: 0;">ART&BAY</h1>
-                        <p style="color: #666; margin: 5px 0;">Your Art Gallery</p>
-                    </div>
+                <div style="text-align: center; margin-top: 30px; color: #666; font-size: 12px;">
+                    <p>This is an automated email. Please do not reply to this message.</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+
+    def welcome_email_body(self, user_name):
+        return f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <div style="text-align: center; margin-bottom: 30px;">
+                    <h1 style="color: #ff6a00; margin: 0;">ART&BAY</h1>
+                    <p style="color: #666; margin: 5px 0;">Your Art Gallery</p>
+                </div>
+                
+                <div style="background-color: #f9f9f9; padding: 30px; border-radius: 10px;">
+                    <h2 style="color: #333; margin-top: 0;">Welcome to ART&BAY!</h2>
+                    <p>Hello {user_name},</p>
+                    <p>Thank you for joining ART&BAY! We're excited to have you as part of our art community.</p>
+                    
+                    <p>With ART&BAY, you can:</p>
+                    <ul>
+                        <li>Discover amazing artworks from talented artists</li>
+                        <li>Purchase unique pieces for your collection</li>
+                        <li>Connect with artists and art enthusiasts</li>
+                        <li>Showcase your own artwork (if you're an artist)</li>
+                    </ul>
                     
-                    <div style="background-color: #f9f9f9; padding: 30px; border-radius: 10px;">
-                        <h2 style="color: #333; margin-top: 0;">Welcome to ART&BAY!</h2>
-                        <p>Hello {user_name},</p>
-                        <p>Thank you for joining ART&BAY! We're excited to have you as part of our art community.</p>
-                        
-                        <p>With ART&BAY, you can:</p>
-                        <ul>
-                            <li>Discover amazing artworks from talented artists</li>
-                            <li>Purchase unique pieces for your collection</li>
-                            <li>Connect with artists and art enthusiasts</li>
-                            <li>Showcase your own artwork (if you're an artist)</li>
-                        </ul>
-                        
-                        <p>Start exploring our gallery today!</p>
-                        
-                        <div style="text-align: center; margin: 30px 0;">
-                            <a href="http://localhost:5000" style="background-color: #ff6a00; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; display: inline-block;">Visit ART&BAY</a>
-                        </div>
-                        
-                        <p>Best regards,<br>The ART&BAY Team</p>
+                    <p>Start exploring our gallery today!</p>
+                    
+                    <div style="text-align: center; margin: 30px 0;">
+                        <a href="http://localhost:5000" style="background-color: #ff6a00; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; display: inline-block;">Visit ART&BAY</a>
                     </div>
+                    
+                    <p>Best regards,<br>The ART&BAY Team</p>
                 </div>
-            </body>
-            </html>
-            """
-            
-            msg.attach(MIMEText(body, 'html'))
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
-                
-            logger.info(f"Welcome email sent successfully to {recipient_email}")
-            return {"status": "success", "message": "Welcome email sent successfully"}
-            
+            </div>
+        </body>
+        </html>
+        """
+
+    # --- SMTP session ---
+
+    def _connect(self):
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.use_login:
+            server.login(self.sender_email, self.sender_password)
+        return server
+
+    def _get_server(self):
+        """Returns an authenticated SMTP session, reusing the open one if it is still alive."""
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            # The server may have dropped an idle session; probe before reusing it
+            try:
+                if self._server.noop()[0] != 250:
+                    self.close()
+            except smtplib.SMTPException:
+                self.close()
+        if self._server is None:
+            self._server = self._connect()
+        return self._server
+
+    def close(self):
+        """Closes the SMTP session, if one is open."""
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+    def close_if_idle(self):
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+
+    # --- Sending ---
+
+    def send_email(self, recipient_email, subject, html_body):
+        """Sends an email over the shared SMTP session, reconnecting once if it was dropped."""
+        msg = MIMEMultipart()
+        msg['From'] = self.sender_email
+        msg['To'] = recipient_email
+        msg['Subject'] = subject
+        msg.attach(MIMEText(html_body, 'html'))
+
+        try:
+            try:
+                self._get_server().send_message(msg)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                self.close()
+                self._get_server().send_message(msg)
+            self._last_used = time.monotonic()
+            return {"status": "success", "message": "Email sent successfully"}
         except Exception as e:
-            logger.error(f"Error sending welcome email to {recipient_email}: {e}")
-            return {"status": "error", "message": f"Failed to send welcome email: {str(e)}"} 
\ No newline at end of file
+            # Don't reuse a session that failed mid-conversation
+            self.close()
+            logger.error(f"Error sending email to {recipient_email}: {e}")
+            return {"status": "error", "message": f"Failed to send email: {str(e)}"}
+
+    def send_otp_email(self, recipient_email, otp, user_name=""):
+        """Send OTP email to user."""
+        return self.send_email(recipient_email, "ART&BAY - Your Login OTP", self.otp_email_body(otp, user_name))
+
+    def send_welcome_email(self, recipient_email, user_name):
+        """Send welcome email to new users."""
+        return self.send_email(recipient_email, "Welcome to ART&BAY!", self.welcome_email_body(user_name))
+
+    # --- Outbox ---
+
+    def queue_email(self, recipient_email, subject, html_body):
+        """Adds an email to the outbox for the background sender."""
+        email_id = enqueue_email(recipient_email, subject, html_body)
+        if email_id is None:
+            return {"status": "error", "message": "Failed to queue email"}
+        outbox_wakeup.set()
+        logger.info(f"Email {email_id} queued for {recipient_email}")
+        return {"status": "success", "message": "Email queued"}
+
+    def queue_otp_email(self, recipient_email, otp, user_name=""):
+        """Queue OTP email to user."""
+        return self.queue_email(recipient_email, "ART&BAY - Your Login OTP", self.otp_email_body(otp, user_name))
+
+    def queue_welcome_email(self, recipient_email, user_name):
+        """Queue welcome email to new users."""
+        return self.queue_email(recipient_email, "Welcome to ART&BAY!", self.welcome_email_body(user_name))
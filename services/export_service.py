@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import logging
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from flask import Response, current_app
+from models.export_queries import EXPORTS, open_export
+from services.compression import GzipEncoder, compressed_chunks
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+class ExportBusy(Exception):
+    """Raised when EXPORT_MAX_CONCURRENT exports are already streaming."""
+
+def init_export(app):
+    app.export_slots = threading.BoundedSemaphore(app.config['EXPORT_MAX_CONCURRENT'])
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def _csv_chunks(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def _ndjson_chunks(columns, batches):
+    for rows in batches:
+        yield ''.join(
+            json.dumps(dict(zip(columns, map(_json_value, row))), ensure_ascii=False) + '\n'
+            for row in rows
+        ).encode('utf-8')
+
+def export_response(name, fmt='csv', gzip=False):
+    """Streams a full table export as CSV or NDJSON, optionally gzipped.
+
+    Rows go from an unbuffered cursor on a dedicated connection to the
+    client one batch at a time, so memory use does not grow with the table.
+    Raises ExportBusy when too many exports are already running.
+    """
+    if name not in EXPORTS or fmt not in FORMATS:
+        raise ValueError(f"Unknown export {name}.{fmt}")
+    slots = current_app.export_slots
+    if not slots.acquire(blocking=False):
+        raise ExportBusy()
+    try:
+        columns, batches, close = open_export(
+            current_app.config['DB_CONFIG'], name, current_app.config['EXPORT_BATCH_SIZE']
+        )
+    except Exception:
+        slots.release()
+        raise
+    chunks = _csv_chunks(columns, batches) if fmt == 'csv' else _ndjson_chunks(columns, batches)
+    filename = f"{name}.{fmt}"
+    mimetype = FORMATS[fmt]
+    if gzip:
+        # Whole-file download, so no per-batch flush: the ratio matters more than latency
+        chunks = compressed_chunks(chunks, GzipEncoder(current_app.config['COMPRESSION_LEVEL']), flush=False)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    logger.info(f"Streaming {filename} export")
+    response = Response(chunks, mimetype=mimetype)
+
+    @response.call_on_close
+    def finish():
+        close()
+        slots.release()
+
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    # Tell proxies not to buffer the whole download before passing it on
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
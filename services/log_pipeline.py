@@ -0,0 +1,176 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import has_request_context, request
+
+# Attributes every LogRecord has; anything else was passed through extra= and is logged as a field
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'path'}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request path, extra fields and traceback."""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'path', None):
+            entry['path'] = record.path
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LogRateFilter(logging.Filter):
+    """Samples and rate-limits records per logger before they are queued.
+
+    Records below WARNING from a logger listed in sample_rates are kept with
+    that probability. Every logger may then emit at most `rate` records per
+    second (bursts up to `rate`); ERROR and above are never dropped.
+    """
+
+    def __init__(self, sample_rates, rate):
+        super().__init__()
+        # Longest prefix first, so 'blueprints.cart_routes' wins over 'blueprints'
+        self.sample_rates = sorted(sample_rates.items(), key=lambda item: -len(item[0]))
+        self.rate = rate
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def _sample_rate(self, name):
+        for prefix, sample_rate in self.sample_rates:
+            if name == prefix or name.startswith(prefix + '.'):
+                return sample_rate
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        if record.levelno < logging.WARNING:
+            sample_rate = self._sample_rate(record.name)
+            if sample_rate < 1 and random.random() >= sample_rate:
+                return False
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(record.name, (self.rate, now))
+            tokens = min(self.rate, tokens + (now - updated_at) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[record.name] = (tokens - 1 if allowed else tokens, now)
+            if not allowed:
+                self.dropped += 1
+        return allowed
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to a background writer thread without ever waiting.
+
+    Records are queued unformatted; the writer thread builds the message,
+    so a request thread only pays for creating the record. When the queue
+    is full the record is dropped and counted. The writer is started on
+    first use in each process, so workers forked after init get their own.
+    """
+
+    def __init__(self, handler, maxsize):
+        super().__init__(queue.Queue(maxsize))
+        self.handler = handler
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._pid = None
+        self._listener = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._start_lock:
+            if self._pid != pid:
+                # A queue and thread inherited through fork are unusable; start fresh
+                self.queue = queue.Queue(self.maxsize)
+                self._listener = QueueListener(self.queue, self.handler, respect_handler_level=True)
+                self._listener.start()
+                self._pid = pid
+
+    def prepare(self, record):
+        # Only the request path is captured here; formatting happens on the writer thread
+        if has_request_context():
+            record.path = request.path
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record):
+        self._ensure_listener()
+        super().emit(record)
+
+    def stop(self):
+        """Flushes the queued records (called at exit)."""
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._pid = None
+
+
+def _parse_sample_rates(value):
+    """'blueprints.cart_routes=0.1,werkzeug=0.5' -> {'blueprints.cart_routes': 0.1, 'werkzeug': 0.5}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in (value or '').split(','))):
+        name, _, rate = item.partition('=')
+        rates[name.strip()] = float(rate)
+    return rates
+
+def init_logging(config):
+    """Routes all logging through a bounded queue to a single writer thread on stdout.
+
+    Reads LOG_LEVEL, LOG_FORMAT ('json' or 'text'), LOG_QUEUE_SIZE,
+    LOG_SAMPLE_RATES and LOG_RATE_LIMIT from config. Safe to call again;
+    the previous pipeline is flushed and replaced.
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        if isinstance(handler, NonBlockingQueueHandler):
+            handler.stop()
+
+    stream = logging.StreamHandler(sys.stdout)
+    if config['LOG_FORMAT'] == 'json':
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s'))
+
+    handler = NonBlockingQueueHandler(stream, config['LOG_QUEUE_SIZE'])
+    rate_filter = LogRateFilter(_parse_sample_rates(config['LOG_SAMPLE_RATES']), config['LOG_RATE_LIMIT'])
+    handler.addFilter(rate_filter)
+    root.addHandler(handler)
+    root.setLevel(config['LOG_LEVEL'])
+    atexit.register(handler.stop)
+    return handler
+
+def dropped_log_records():
+    """Records dropped by the sampling and rate filters or a full queue, in this process."""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, NonBlockingQueueHandler):
+            return {
+                'queue_full': handler.dropped,
+                'rate_limited': sum(f.dropped for f in handler.filters if isinstance(f, LogRateFilter)),
+            }
+    return {'queue_full': 0, 'rate_limited': 0}
@@ -0,0 +1,369 @@
+import fcntl
+import hmac
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from flask import Response, current_app, g, request
+from models.email_outbox_queries import count_emails_by_status
+from models.user_queries import get_user_cache_stats
+from services.log_pipeline import dropped_log_records
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Methods recorded as their own label value; clients can send any token, so the rest are 'other'
+HTTP_METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'})
+
+# Every exported metric: name -> (type, help)
+METRICS = {
+    'artbay_http_requests_total': ('counter', 'HTTP requests by endpoint, method and status.'),
+    'artbay_http_request_duration_seconds': ('histogram', 'HTTP request latency by endpoint.'),
+    'artbay_db_pool_connections': ('gauge', 'Pooled database connections by pool and state.'),
+    'artbay_db_pool_waiters': ('gauge', 'Requests waiting for a pooled connection.'),
+    'artbay_db_pool_checkouts_total': ('counter', 'Connections handed out by the pool.'),
+    'artbay_db_pool_timeouts_total': ('counter', 'Checkouts that gave up waiting for a connection.'),
+    'artbay_user_cache_hits_total': ('counter', 'User lookups served from a cache, by cache level.'),
+    'artbay_user_cache_misses_total': ('counter', 'User lookups that queried the database.'),
+    'artbay_user_cache_entries': ('gauge', 'Users held in the process-wide cache.'),
+    'artbay_settings_reloads_total': ('counter', 'Settings snapshot reloads.'),
+    'artbay_emails_total': ('counter', 'Outbox send attempts by result.'),
+    'artbay_email_outbox_messages': ('gauge', 'Messages in the email outbox by status.'),
+    'artbay_log_records_dropped_total': ('counter', 'Log records dropped by rate limits or a full log queue.'),
+}
+
+_process_file_name = re.compile(r'^metrics_(\d+)\.db$')
+
+class MetricsFile:
+    """One process's metric values in a memory-mapped file.
+
+    The file starts with the number of bytes in use, followed by entries of
+    [key length][key, padded to 8 bytes][float64 value]. Only the owning
+    process writes it, so updates need no cross-process lock; a new entry
+    is written in full before the length is bumped, so readers never see
+    half an entry.
+    """
+
+    HEADER = struct.Struct('<Q')
+    KEY_LENGTH = struct.Struct('<I')
+    VALUE = struct.Struct('<d')
+    INITIAL_SIZE = 1 << 16
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = os.fstat(self._fd).st_size
+        if size < self.INITIAL_SIZE:
+            os.ftruncate(self._fd, self.INITIAL_SIZE)
+            size = self.INITIAL_SIZE
+        self._map = mmap.mmap(self._fd, size)
+        self._offsets = {}
+        self._lock = threading.Lock()
+        self._used = self.HEADER.unpack_from(self._map, 0)[0]
+        if self._used == 0:
+            self._used = self.HEADER.size
+            self.HEADER.pack_into(self._map, 0, self._used)
+        for key, _, offset in self._entries(self._map, self._used):
+            self._offsets[key] = offset
+
+    @classmethod
+    def _entries(cls, data, used):
+        position = cls.HEADER.size
+        while position < used:
+            length = cls.KEY_LENGTH.unpack_from(data, position)[0]
+            key_start = position + cls.KEY_LENGTH.size
+            offset = key_start + length + (-(cls.KEY_LENGTH.size + length) % 8)
+            yield bytes(data[key_start:key_start + length]).decode(), cls.VALUE.unpack_from(data, offset)[0], offset
+            position = offset + cls.VALUE.size
+
+    def _offset(self, key):
+        offset = self._offsets.get(key)
+        if offset is not None:
+            return offset
+        encoded = key.encode()
+        padding = -(self.KEY_LENGTH.size + len(encoded)) % 8
+        needed = self.KEY_LENGTH.size + len(encoded) + padding + self.VALUE.size
+        if self._used + needed > len(self._map):
+            size = max(len(self._map) * 2, self._used + needed)
+            os.ftruncate(self._fd, size)
+            self._map.close()
+            self._map = mmap.mmap(self._fd, size)
+        position = self._used
+        self.KEY_LENGTH.pack_into(self._map, position, len(encoded))
+        self._map[position + self.KEY_LENGTH.size:position + self.KEY_LENGTH.size + len(encoded)] = encoded
+        offset = position + self.KEY_LENGTH.size + len(encoded) + padding
+        self.VALUE.pack_into(self._map, offset, 0.0)
+        self._used = offset + self.VALUE.size
+        self.HEADER.pack_into(self._map, 0, self._used)
+        self._offsets[key] = offset
+        return offset
+
+    def inc(self, keys, amount=1.0):
+        """Adds amount to every key in keys."""
+        with self._lock:
+            for key in keys:
+                offset = self._offset(key)
+                self.VALUE.pack_into(self._map, offset, self.VALUE.unpack_from(self._map, offset)[0] + amount)
+
+    def set(self, values):
+        """Sets each key of the values mapping."""
+        with self._lock:
+            for key, value in values.items():
+                self.VALUE.pack_into(self._map, self._offset(key), value)
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+    @classmethod
+    def read(cls, path):
+        """(key, value) pairs of a metrics file written by any process."""
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < cls.HEADER.size:
+            return []
+        used = min(cls.HEADER.unpack_from(data, 0)[0], len(data))
+        return [(key, value) for key, value, _ in cls._entries(data, used)]
+
+
+def series_key(name, **labels):
+    return json.dumps([name, sorted(labels.items())])
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _is_gauge(key):
+    return METRICS.get(json.loads(key)[0], ('counter',))[0] == 'gauge'
+
+
+class Metrics:
+    """Metrics shared by every worker process through files in one directory.
+
+    Each process writes its own metrics_<pid>.db, opened lazily so that a
+    process forked after init gets a file of its own. A scrape sums the
+    files. When a new process starts, the counters of processes that have
+    exited are folded into metrics_archive.db, so totals never go
+    backwards; their gauges are dropped.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._pid = None
+        self._file = None
+        self._lock = threading.Lock()
+        self._request_keys = {}
+
+    def _process_file(self):
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._archive_dead_processes()
+                    self._file = MetricsFile(os.path.join(self.directory, f'metrics_{pid}.db'))
+                    self._request_keys = {}
+                    self._pid = pid
+        return self._file
+
+    @contextmanager
+    def _directory_lock(self, mode):
+        """Holds metrics.lock: exclusive while archiving, shared while a scrape reads the files."""
+        with open(os.path.join(self.directory, 'metrics.lock'), 'w') as lock:
+            fcntl.flock(lock, mode)
+            yield
+
+    def _archive_dead_processes(self):
+        with self._directory_lock(fcntl.LOCK_EX):
+            dead = [name for name in os.listdir(self.directory)
+                    if _process_file_name.match(name) and not _pid_alive(int(_process_file_name.match(name).group(1)))]
+            if not dead:
+                return
+            archive = MetricsFile(os.path.join(self.directory, 'metrics_archive.db'))
+            try:
+                for name in dead:
+                    path = os.path.join(self.directory, name)
+                    for key, value in MetricsFile.read(path):
+                        if value and not _is_gauge(key):
+                            archive.inc((key,), value)
+                    os.remove(path)
+            finally:
+                archive.close()
+
+    def inc(self, name, amount=1, **labels):
+        self._process_file().inc((series_key(name, **labels),), amount)
+
+    def set(self, values):
+        """Sets gauges (or running totals kept elsewhere), given as {(name, labels tuple): value}."""
+        self._process_file().set({series_key(name, **dict(labels)): value for (name, labels), value in values.items()})
+
+    def observe_request(self, endpoint, method, status, seconds):
+        """Counts one request and adds its latency to the histogram: four in-place float updates."""
+        metrics_file = self._process_file()
+        if method not in HTTP_METHODS:
+            method = 'other'
+        cache_key = (endpoint, method, status)
+        keys = self._request_keys.get(cache_key)
+        if keys is None:
+            name = 'artbay_http_request_duration_seconds'
+            keys = self._request_keys[cache_key] = (
+                series_key('artbay_http_requests_total', endpoint=endpoint, method=method, status=str(status)),
+                series_key(f'{name}_count', endpoint=endpoint),
+                [series_key(f'{name}_bucket', endpoint=endpoint, le=str(bound)) for bound in LATENCY_BUCKETS]
+                + [series_key(f'{name}_bucket', endpoint=endpoint, le='+Inf')],
+                series_key(f'{name}_sum', endpoint=endpoint),
+            )
+        counter, count, buckets, total = keys
+        # Buckets are stored non-cumulative (only the one the request falls in) and summed on scrape
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+        metrics_file.inc((counter, count, buckets[bucket]))
+        metrics_file.inc((total,), seconds)
+
+    def collect(self):
+        """Sums every process's values: {key: value}."""
+        totals = defaultdict(float)
+        # Without the lock a scrape could read a dead process's counters both
+        # from its file and from the archive they are being folded into
+        with self._directory_lock(fcntl.LOCK_SH):
+            for name in os.listdir(self.directory):
+                match = _process_file_name.match(name)
+                if match:
+                    live = _pid_alive(int(match.group(1)))
+                elif name == 'metrics_archive.db':
+                    live = False
+                else:
+                    continue
+                for key, value in MetricsFile.read(os.path.join(self.directory, name)):
+                    if live or not _is_gauge(key):
+                        totals[key] += value
+        return totals
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+def exposition(totals):
+    """Renders collected values in the Prometheus text exposition format."""
+    series = defaultdict(list)
+    for key, value in totals.items():
+        name, labels = json.loads(key)
+        series[name].append((tuple(map(tuple, labels)), value))
+
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        if kind == 'histogram':
+            # Stored buckets only hold the requests that fell in them; expose every bucket, cumulative
+            buckets = defaultdict(dict)
+            for labels, value in series.get(f'{name}_bucket', []):
+                labels = dict(labels)
+                buckets[tuple(sorted((k, v) for k, v in labels.items() if k != 'le'))][labels['le']] = value
+            samples = []
+            for base, counts in sorted(buckets.items()):
+                cumulative = 0.0
+                for bound in [str(bound) for bound in LATENCY_BUCKETS] + ['+Inf']:
+                    cumulative += counts.get(bound, 0.0)
+                    samples.append((f'{name}_bucket', base + (('le', bound),), cumulative))
+            for suffix in ('_sum', '_count'):
+                samples.extend((f'{name}{suffix}', labels, value) for labels, value in sorted(series.get(f'{name}{suffix}', [])))
+        else:
+            samples = [(name, labels, value) for labels, value in sorted(series.get(name, []))]
+        if not samples:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(f'{sample}{_format_labels(labels)} {value:.17g}' for sample, labels, value in samples)
+    return '\n'.join(lines) + '\n'
+
+
+def _process_values(app):
+    """This process's gauges and running totals from the pools, caches and settings service."""
+    values = {}
+    for pool_name, pool in (('primary', app.db_pool), ('replica', app.db_read_pool)):
+        if pool is None:
+            continue
+        status = pool.status()
+        values[('artbay_db_pool_connections', (('pool', pool_name), ('state', 'in_use')))] = status['in_use']
+        values[('artbay_db_pool_connections', (('pool', pool_name), ('state', 'idle')))] = status['idle']
+        values[('artbay_db_pool_waiters', (('pool', pool_name),))] = status['waiters']
+        values[('artbay_db_pool_checkouts_total', (('pool', pool_name),))] = status['checkouts']
+        values[('artbay_db_pool_timeouts_total', (('pool', pool_name),))] = status['timeouts']
+    cache = get_user_cache_stats()
+    values[('artbay_user_cache_hits_total', (('level', 'request'),))] = cache['request_hits']
+    values[('artbay_user_cache_hits_total', (('level', 'process'),))] = cache['process_hits']
+    values[('artbay_user_cache_misses_total', ())] = cache['db_queries']
+    values[('artbay_user_cache_entries', ())] = cache['cached_users']
+    values[('artbay_settings_reloads_total', ())] = app.settings_service.stats['reloads']
+    for reason, dropped in dropped_log_records().items():
+        values[('artbay_log_records_dropped_total', (('reason', reason),))] = dropped
+    return values
+
+def init_metrics(app):
+    """Records per-endpoint request metrics and serves them, summed over workers, at /metrics."""
+    app.metrics = None
+    if not app.config['METRICS_ENABLED']:
+        return
+    directory = app.config['METRICS_DIR'] or os.path.join(tempfile.gettempdir(), 'artbay_metrics')
+    metrics = app.metrics = Metrics(directory)
+    publish_interval = app.config['METRICS_PUBLISH_INTERVAL']
+    next_publish = [0.0]
+
+    def publish_process_values():
+        next_publish[0] = time.monotonic() + publish_interval
+        try:
+            metrics.set(_process_values(app))
+        except Exception as e:
+            logger.warning(f"Could not publish process metrics: {e}")
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            metrics.observe_request(request.endpoint or 'unmatched', request.method,
+                                    response.status_code, time.perf_counter() - started)
+            if time.monotonic() >= next_publish[0]:
+                publish_process_values()
+        return response
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        token = app.config['METRICS_TOKEN']
+        if not token:
+            # Closed until a token is configured, so it is never public by accident
+            return Response('Set METRICS_TOKEN to enable /metrics\n', status=403, mimetype='text/plain')
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        publish_process_values()
+        totals = metrics.collect()
+        # The outbox is shared by every worker, so it is counted in the database
+        for status, messages in count_emails_by_status().items():
+            totals[series_key('artbay_email_outbox_messages', status=status)] = messages
+        return Response(exposition(totals), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    logger.info(f"Metrics enabled in {directory}.")
+
+def count(name, amount=1, **labels):
+    """Increments a counter from code running in an app context; a no-op when metrics are off."""
+    metrics = current_app.metrics
+    if metrics is not None:
+        metrics.inc(name, amount, **labels)
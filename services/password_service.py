@@ -0,0 +1,96 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+logger = logging.getLogger(__name__)
+
+def _hash(password, method):
+    return generate_password_hash(password, method=method)
+
+def _check(pwhash, password):
+    return check_password_hash(pwhash, password)
+
+class PasswordHasher:
+    """Runs password hashing in a bounded process pool.
+
+    Hashing is CPU-bound, so running it on request threads holds the GIL
+    and slows every other request. At most max_pending hashes are queued
+    at once; further callers wait for a slot. With workers=0 hashing runs
+    inline, which is what scripts outside the web server want.
+
+    Pool processes are spawned, not forked from the worker: a forked child
+    inherits any lock another thread held at that moment, such as the log
+    queue's, and hangs on it. (A forkserver started in one process cannot
+    be used from processes forked off it, which rules it out here.)
+    """
+
+    def __init__(self, method, workers, max_pending):
+        self.method = method
+        self.workers = workers
+        # Hash prefix (method and parameters) produced by the configured method
+        self.method_prefix = generate_password_hash('', method=method).split('$', 1)[0]
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        # A pool inherited across fork is unusable, so each process builds its own
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def start(self):
+        """Starts the pool processes now, so the first login does not wait for them."""
+        if self.workers == 0:
+            return
+        pool = self._get_pool()
+        for future in [pool.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+    def _run(self, fn, *args):
+        if self.workers == 0:
+            return fn(*args)
+        with self._slots:
+            return self._get_pool().submit(fn, *args).result()
+
+    def hash(self, password):
+        return self._run(_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run(_check, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if the hash was made with different parameters than the configured ones."""
+        return pwhash.split('$', 1)[0] != self.method_prefix
+
+    def shutdown(self):
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown(wait=False)
+        self._pool = None
+
+def init_password_hasher(app):
+    app.password_hasher = PasswordHasher(
+        app.config['PASSWORD_HASH_METHOD'],
+        app.config['PASSWORD_HASH_WORKERS'],
+        app.config['PASSWORD_HASH_MAX_PENDING']
+    )
+    logger.info(f"Password hasher initialized ({app.config['PASSWORD_HASH_METHOD']}, "
+                f"{app.config['PASSWORD_HASH_WORKERS']} workers).")
+
+def hash_password(password):
+    return current_app.password_hasher.hash(password)
+
+def verify_password(pwhash, password):
+    return current_app.password_hasher.verify(pwhash, password)
+
+def needs_rehash(pwhash):
+    return current_app.password_hasher.needs_rehash(pwhash)
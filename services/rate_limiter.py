@@ -0,0 +1,146 @@
+import fcntl
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request, jsonify
+
+logger = logging.getLogger(__name__)
+
+class MemoryBucketStore:
+    """Token buckets held in this process, evicting the least recently used keys."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate):
+        """Takes one token; returns 0 if allowed, otherwise seconds until a token is available."""
+        now = time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / refill_rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class SharedMemoryBucketStore:
+    """Token buckets in a memory-mapped file shared by every worker process.
+
+    The file is a fixed-size hash table of (key hash, tokens, updated_at)
+    slots guarded by an flock. A key whose slot is taken by a different
+    key simply replaces it, which at worst hands that key a fresh bucket.
+    """
+
+    SLOT = struct.Struct('<Qdd')
+
+    def __init__(self, path=None, slots=65536):
+        self.slots = slots
+        self.path = path or os.path.join(tempfile.gettempdir(), 'artbay_rate_limits')
+        self._lock = threading.Lock()
+        self._pid = None
+        self._open()
+
+    def _open(self):
+        # flock only excludes other open file descriptions, so each process opens its own
+        size = self.SLOT.size * self.slots
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size != size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._pid = os.getpid()
+
+    def take(self, key, capacity, refill_rate):
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little') or 1
+        offset = (key_hash % self.slots) * self.SLOT.size
+        now = time.time()
+        # The thread lock serializes threads in this process; flock serializes processes
+        with self._lock:
+            if self._pid != os.getpid():
+                self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                slot_hash, tokens, updated_at = self.SLOT.unpack_from(self._map, offset)
+                if slot_hash != key_hash:
+                    tokens, updated_at = capacity, now
+                tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+                if tokens >= 1:
+                    tokens -= 1
+                    wait = 0
+                else:
+                    wait = (1 - tokens) / refill_rate
+                self.SLOT.pack_into(self._map, offset, key_hash, tokens, now)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return wait
+
+
+class RateLimiter:
+    """Applies the RATE_LIMITS config to requests, keyed by client IP and email."""
+
+    def __init__(self, store, limits):
+        self.store = store
+        self.limits = limits
+
+    def check(self, scope, ip, email=None):
+        """Returns 0 if the request may proceed, otherwise the Retry-After in seconds."""
+        wait = 0
+        for key_type, value in (('ip', ip), ('email', email)):
+            limit = self.limits.get(scope, {}).get(key_type)
+            if not limit or not value:
+                continue
+            count, period = limit
+            wait = max(wait, self.store.take(f"{scope}:{key_type}:{value}", count, count / period))
+        return wait
+
+RATE_LIMIT_STORES = {
+    'memory': MemoryBucketStore,
+    'shared': SharedMemoryBucketStore,
+}
+
+def init_rate_limiter(app):
+    """Creates the rate limiter selected by the RATE_LIMIT_STORE config key."""
+    backend = app.config.get('RATE_LIMIT_STORE', 'memory')
+    if backend not in RATE_LIMIT_STORES:
+        raise ValueError(f"Unknown RATE_LIMIT_STORE backend: {backend}")
+    app.rate_limiter = RateLimiter(RATE_LIMIT_STORES[backend](), app.config.get('RATE_LIMITS', {}))
+    logger.info(f"Rate limiter initialized with '{backend}' backend.")
+
+def _request_email():
+    email = request.form.get('email')
+    if not email:
+        email = (request.get_json(silent=True) or {}).get('email')
+    return email.strip().lower() if isinstance(email, str) else None
+
+def rate_limit(scope):
+    """Rejects requests over the RATE_LIMITS[scope] budget with 429 before the view runs."""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            limiter = getattr(current_app, 'rate_limiter', None)
+            if limiter is not None:
+                wait = limiter.check(scope, request.remote_addr, _request_email())
+                if wait > 0:
+                    current_app.logger.warning(f"Rate limit exceeded for {scope} from {request.remote_addr}")
+                    response = jsonify({"status": "error", "message": "Too many requests. Please try again later."})
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(math.ceil(wait))
+                    return response
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
@@ -0,0 +1,115 @@
+import logging
+import random
+import time
+from collections import Counter
+from flask import before_render_template, g, has_app_context, request, template_rendered
+from models.database import add_query_observer
+
+logger = logging.getLogger(__name__)
+
+class RequestTimings:
+    """Time spent by one request in the database, in templates and overall."""
+
+    __slots__ = ('started', 'db_seconds', 'queries', 'statements',
+                 'template_seconds', 'templates', '_template_started')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.statements = Counter()
+        self.template_seconds = 0.0
+        self.templates = 0
+        self._template_started = None
+
+    def record_query(self, sql, seconds):
+        self.db_seconds += seconds
+        self.queries += 1
+        self.statements[sql] += 1
+
+    def repeated(self, threshold):
+        """Statements run at least threshold times, the usual sign of an N+1 loop."""
+        return {' '.join(sql.split())[:200]: count
+                for sql, count in self.statements.items() if count >= threshold}
+
+    def summary(self):
+        total = time.perf_counter() - self.started
+        return {
+            'total_ms': round(total * 1000, 1),
+            'db_ms': round(self.db_seconds * 1000, 1),
+            'template_ms': round(self.template_seconds * 1000, 1),
+            'app_ms': round(max(total - self.db_seconds - self.template_seconds, 0) * 1000, 1),
+            'queries': self.queries,
+        }
+
+def _current():
+    return g.get('request_timings') if has_app_context() else None
+
+def _on_query(sql, params, seconds):
+    timings = _current()
+    if timings is not None:
+        timings.record_query(sql, seconds)
+
+def _on_template_start(sender, template, context, **extra):
+    timings = _current()
+    if timings is not None:
+        timings._template_started = time.perf_counter()
+
+def _on_template_done(sender, template, context, **extra):
+    timings = _current()
+    if timings is not None and timings._template_started is not None:
+        timings.template_seconds += time.perf_counter() - timings._template_started
+        timings.templates += 1
+        timings._template_started = None
+
+def init_request_timing(app):
+    """Times a sample of requests and reports them in Server-Timing and a log line.
+
+    A fraction REQUEST_TIMING_SAMPLE_RATE of requests is instrumented;
+    the rest only pay for one random() call.
+    """
+    sample_rate = app.config['REQUEST_TIMING_SAMPLE_RATE']
+    if sample_rate <= 0:
+        return
+    repeat_threshold = app.config['REQUEST_TIMING_REPEAT_THRESHOLD']
+    server_timing = app.config['REQUEST_TIMING_HEADER']
+
+    add_query_observer(_on_query)
+    before_render_template.connect(_on_template_start, app)
+    template_rendered.connect(_on_template_done, app)
+
+    @app.before_request
+    def start_request_timing():
+        if sample_rate >= 1 or random.random() < sample_rate:
+            g.request_timings = RequestTimings()
+
+    @app.after_request
+    def finish_request_timing(response):
+        timings = g.pop('request_timings', None)
+        if timings is None:
+            return response
+        summary = timings.summary()
+        if server_timing:
+            response.headers['Server-Timing'] = ', '.join((
+                f'db;dur={summary["db_ms"]};desc="{summary["queries"]} queries"',
+                f'tpl;dur={summary["template_ms"]}',
+                f'app;dur={summary["app_ms"]}',
+                f'total;dur={summary["total_ms"]}',
+            ))
+        record = {
+            'method': request.method,
+            'endpoint': request.endpoint,
+            'path': request.path,
+            'status': response.status_code,
+            **summary,
+        }
+        repeated = timings.repeated(repeat_threshold)
+        level = logging.INFO
+        if repeated:
+            record['repeated_queries'] = repeated
+            level = logging.WARNING
+        logger.log(level, "%s %s %s in %s ms (%s queries)", request.method, request.path,
+                   response.status_code, summary['total_ms'], summary['queries'], extra={'timing': record})
+        return response
+
+    logger.info(f"Request timing enabled for {sample_rate:.0%} of requests.")
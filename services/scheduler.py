@@ -0,0 +1,124 @@
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from models.otp_queries import cleanup_expired_otp
+from models.counter_queries import reconcile_counters
+from models.analytics_queries import rebuild_sales_rollups
+from models.email_outbox_queries import purge_old_emails
+from models.scheduler_queries import (
+    acquire_job_lock, release_job_lock, job_ran_recently, record_job_start, record_job_finish
+)
+
+logger = logging.getLogger(__name__)
+
+class Job:
+    def __init__(self, name, func, interval_seconds, jitter_seconds):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.jitter_seconds = jitter_seconds
+        self.next_run = time.monotonic() + random.uniform(0, jitter_seconds)
+
+    def schedule_next(self):
+        # Jitter keeps workers that started together from contending every tick
+        self.next_run = time.monotonic() + self.interval_seconds + random.uniform(0, self.jitter_seconds)
+
+
+class Scheduler(threading.Thread):
+    """Runs periodic maintenance jobs in a background thread.
+
+    Every worker process runs a scheduler, but a job only executes in the
+    worker holding its MySQL named lock, and only if no worker has started
+    it within its interval, so each job runs once per interval cluster-wide.
+    Each job runs inside an app context and returns a status dict like the
+    query functions do.
+    """
+
+    def __init__(self, app):
+        super().__init__(name='maintenance-scheduler', daemon=True)
+        self.app = app
+        self.jobs = []
+        self.runner = f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = threading.Event()
+
+    def add_job(self, name, func, interval_seconds, jitter_seconds=None):
+        if jitter_seconds is None:
+            jitter_seconds = interval_seconds * 0.1
+        self.jobs.append(Job(name, func, interval_seconds, jitter_seconds))
+
+    def stop(self):
+        self._stopping.set()
+
+    def run_job(self, job):
+        with self.app.app_context():
+            if not acquire_job_lock(job.name):
+                return
+            try:
+                if job_ran_recently(job.name, job.interval_seconds):
+                    return
+                record_job_start(job.name, self.runner)
+                start = time.perf_counter()
+                try:
+                    result = job.func() or {}
+                    status = 'error' if result.get('status') == 'error' else 'success'
+                    message = result.get('message', '')
+                except Exception as e:
+                    logger.error(f"Scheduled job {job.name} failed: {e}", exc_info=True)
+                    status, message = 'error', str(e)
+                duration_ms = int((time.perf_counter() - start) * 1000)
+                record_job_finish(job.name, status, duration_ms, message)
+                logger.info(f"Scheduled job {job.name} finished: {status} in {duration_ms} ms ({message})")
+            finally:
+                release_job_lock(job.name)
+
+    def run(self):
+        logger.info(f"Scheduler started with {len(self.jobs)} jobs.")
+        while not self._stopping.is_set():
+            now = time.monotonic()
+            for job in self.jobs:
+                if job.next_run <= now:
+                    try:
+                        self.run_job(job)
+                    except Exception as e:
+                        logger.error(f"Scheduler error running {job.name}: {e}", exc_info=True)
+                    job.schedule_next()
+            if not self.jobs:
+                break
+            wait = min(job.next_run for job in self.jobs) - time.monotonic()
+            self._stopping.wait(max(wait, 0.1))
+
+def init_scheduler(app):
+    """Registers the maintenance jobs and starts the scheduler if enabled."""
+    if not app.config.get('SCHEDULER_ENABLED', True):
+        logger.info("Scheduler disabled.")
+        return
+
+    scheduler = Scheduler(app)
+    scheduler.add_job('otp_cleanup', cleanup_expired_otp, app.config['OTP_CLEANUP_INTERVAL'])
+    scheduler.add_job('reconcile_counters', reconcile_counters, app.config['COUNTERS_RECONCILE_INTERVAL'])
+    scheduler.add_job(
+        'sales_rollups',
+        lambda: rebuild_sales_rollups(app.config['SALES_ROLLUP_WINDOW_DAYS']),
+        app.config['SALES_ROLLUP_INTERVAL']
+    )
+    scheduler.add_job(
+        'email_outbox_purge',
+        lambda: purge_old_emails(app.config['EMAIL_OUTBOX_RETENTION_DAYS']),
+        app.config['EMAIL_OUTBOX_PURGE_INTERVAL']
+    )
+
+    session_backend = getattr(app.session_interface, 'backend', None)
+    if hasattr(session_backend, 'cleanup_expired'):
+        # The SQLite session file is local to each host, so every host runs its own cleanup
+        scheduler.add_job(
+            f"session_cleanup_{socket.gethostname()[:32]}",
+            lambda: {'message': f"{session_backend.cleanup_expired()} expired sessions deleted"},
+            app.config['SESSION_CLEANUP_INTERVAL']
+        )
+
+    app.scheduler = scheduler
+    if app.config['START_BACKGROUND_THREADS']:
+        scheduler.start()
@@ -0,0 +1,257 @@
+import logging
+import os
+import pickle
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from flask.sessions import SessionInterface, SessionMixin
+
+logger = logging.getLogger(__name__)
+
+# --- Serialization ---
+
+_RAW = b'p'
+_COMPRESSED = b'z'
+
+def dumps(data, compress_over=512):
+    """Pickles session data, zlib-compressing payloads larger than compress_over bytes."""
+    raw = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(raw) > compress_over:
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw):
+            return _COMPRESSED + packed
+    return _RAW + raw
+
+def loads(blob):
+    if blob[:1] == _COMPRESSED:
+        return pickle.loads(zlib.decompress(blob[1:]))
+    return pickle.loads(blob[1:])
+
+# --- Backends ---
+
+class MemorySessionBackend:
+    """Sessions in process memory, evicting the least recently used beyond max_sessions."""
+
+    def __init__(self, max_sessions=10000):
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # sid -> (blob, expires_at)
+        self._lock = threading.Lock()
+
+    def load(self, sid):
+        with self._lock:
+            entry = self._sessions.get(sid)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._sessions[sid]
+                return None
+            self._sessions.move_to_end(sid)
+            return entry[0]
+
+    def save(self, sid, blob, expires_at):
+        with self._lock:
+            self._sessions[sid] = (blob, expires_at)
+            self._sessions.move_to_end(sid)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+
+class SQLiteSessionBackend:
+    """Sessions in a local SQLite file, shared by every worker on the host."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                sid TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at)")
+
+    def _conn(self):
+        # One connection per thread (and per process, since threads don't survive fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def load(self, sid):
+        row = self._conn().execute(
+            "SELECT data FROM sessions WHERE sid = ? AND expires_at > ?", (sid, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def save(self, sid, blob, expires_at):
+        self._conn().execute(
+            "INSERT INTO sessions (sid, data, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(sid) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at",
+            (sid, blob, expires_at)
+        )
+
+    def delete(self, sid):
+        self._conn().execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def cleanup_expired(self):
+        return self._conn().execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+
+# --- Flask integration ---
+
+def new_sid():
+    return secrets.token_urlsafe(32)
+
+class ServerSideSession(SessionMixin):
+    """Session whose data is only read from the backend on first access.
+
+    cookie_sid is the ID the client sent. A cookie ID with no stored
+    session is never reused: the session gets a fresh ID on load, so a
+    client cannot choose the ID its session is saved under.
+    """
+
+    def __init__(self, sid, backend, new=False):
+        self.sid = sid
+        self.cookie_sid = None if new else sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+        self._backend = backend
+        self._data = {} if new else None
+
+    def _load(self):
+        self.accessed = True
+        if self._data is None:
+            blob = self._backend.load(self.sid)
+            try:
+                self._data = loads(blob) if blob else {}
+            except Exception as e:
+                logger.warning(f"Discarding unreadable session: {e}")
+                self._data = {}
+            if not blob:
+                # Unknown or expired ID: start a new session rather than adopt it
+                self.sid = new_sid()
+                self.new = True
+        return self._data
+
+    def regenerate(self):
+        """Moves the data to a new session ID and deletes the old one; call on login and logout."""
+        self._load()
+        if not self.new:
+            self._backend.delete(self.sid)
+        self.sid = new_sid()
+        self.new = True
+        self.modified = True
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __setitem__(self, key, value):
+        self._load()[key] = value
+        self.modified = True
+
+    def __delitem__(self, key):
+        del self._load()[key]
+        self.modified = True
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __contains__(self, key):
+        return key in self._load()
+
+    def clear(self):
+        self._load().clear()
+        self.modified = True
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Keeps session data server-side; the cookie only carries an opaque session ID.
+
+    Data is loaded lazily and written back only when the session was
+    modified, so requests that never touch the session cost nothing.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if not sid:
+            return ServerSideSession(new_sid(), self.backend, new=True)
+        return ServerSideSession(sid, self.backend)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if not session.modified:
+            return
+
+        if not session:
+            self.backend.delete(session.sid)
+            if session.cookie_sid:
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        expires_at = time.time() + app.permanent_session_lifetime.total_seconds()
+        self.backend.save(session.sid, dumps(dict(session)), expires_at)
+
+        if session.sid != session.cookie_sid or session.permanent:
+            response.set_cookie(
+                name,
+                session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app)
+            )
+
+def regenerate_session(session):
+    """Issues a new session ID, keeping the data, when sessions are stored server-side.
+
+    The signed-cookie session carries its data in the cookie itself, so it
+    has no ID to regenerate.
+    """
+    if isinstance(session, ServerSideSession):
+        session.regenerate()
+
+def init_session_store(app):
+    """Replaces the signed-cookie session with the SESSION_BACKEND store."""
+    backend = app.config.get('SESSION_BACKEND', 'cookie')
+    if backend == 'cookie':
+        return
+    if backend == 'sqlite':
+        store = SQLiteSessionBackend(app.config['SESSION_SQLITE_PATH'])
+    elif backend == 'memory':
+        store = MemorySessionBackend(app.config['SESSION_MEMORY_MAX'])
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+    app.session_interface = ServerSideSessionInterface(store)
+    logger.info(f"Server-side sessions enabled with '{backend}' backend.")
@@ -0,0 +1,76 @@
+import logging
+import threading
+import time
+from types import MappingProxyType
+from flask import current_app
+from models.settings_queries import get_settings_version, load_settings, save_settings
+
+logger = logging.getLogger(__name__)
+
+# Used for keys that have never been saved
+SETTING_DEFAULTS = {'artist_approval_required': True}
+
+class SettingsService:
+    """Serves settings from an immutable in-process snapshot.
+
+    Every check_interval seconds one request reads the settings version
+    (a single primary-key lookup); the full table is only reloaded when
+    another worker has bumped it. Readers never block: while one thread
+    refreshes, the others keep using the previous snapshot.
+    """
+
+    def __init__(self, check_interval, defaults=SETTING_DEFAULTS):
+        self.check_interval = check_interval
+        self.defaults = dict(defaults)
+        self._snapshot = None
+        self._version = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.stats = {'checks': 0, 'reloads': 0}
+
+    def get(self):
+        if self._snapshot is None or time.monotonic() >= self._next_check:
+            # Only the first load waits for the lock; later refreshes are best effort
+            if self._lock.acquire(blocking=self._snapshot is None):
+                try:
+                    if self._snapshot is None or time.monotonic() >= self._next_check:
+                        self._refresh()
+                finally:
+                    self._lock.release()
+        if self._snapshot is None:
+            return {'error': 'Settings could not be loaded'}
+        return self._snapshot
+
+    def _refresh(self):
+        self.stats['checks'] += 1
+        self._next_check = time.monotonic() + self.check_interval
+        if self._snapshot is not None:
+            version = get_settings_version()
+            if version is None or version == self._version:
+                return
+        result = load_settings()
+        if 'error' in result:
+            return
+        self._snapshot = MappingProxyType({**self.defaults, **result['settings']})
+        self._version = result['version']
+        self.stats['reloads'] += 1
+
+    def invalidate(self):
+        """Makes the next get() re-check the version."""
+        self._next_check = 0.0
+
+    def info(self):
+        return {'version': self._version, 'check_interval': self.check_interval, **self.stats}
+
+def init_settings_service(app):
+    app.settings_service = SettingsService(app.config['SETTINGS_CHECK_INTERVAL'])
+    logger.info(f"Settings service initialized (version checked every {app.config['SETTINGS_CHECK_INTERVAL']}s).")
+
+def get_settings():
+    """Current settings snapshot (read-only mapping), or {'error': ...}."""
+    return current_app.settings_service.get()
+
+def update_settings(settings_data):
+    result = save_settings(settings_data)
+    current_app.settings_service.invalidate()
+    return result
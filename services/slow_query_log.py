@@ -0,0 +1,152 @@
+import logging
+import re
+import sys
+import threading
+import time
+from collections import deque
+from flask import current_app
+from mysql.connector import Error
+from models.database import add_query_observer, fetch_all
+
+logger = logging.getLogger(__name__)
+
+# Statements EXPLAIN can describe
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+_placeholder_list = re.compile(r'%s(?:\s*,\s*%s)+')
+_repeated_group = re.compile(r'(\([^()]*\))(?:\s*,\s*\1)+')
+
+def normalize_sql(sql):
+    """Collapses whitespace and variable-length IN/VALUES lists so similar statements group together."""
+    sql = ' '.join(sql.split())
+    sql = _repeated_group.sub(r'\1, ...', sql)
+    return _placeholder_list.sub('%s, ...', sql)
+
+def param_shape(params):
+    """Types of the parameters, never their values."""
+    if params and isinstance(params[0], (tuple, list)):
+        return f"{len(params)} rows of ({', '.join(type(p).__name__ for p in params[0])})"
+    return f"({', '.join(type(p).__name__ for p in params)})"
+
+def _calling_function():
+    """Name of the nearest query-module function on the stack, e.g. get_filtered_artworks."""
+    frame = sys._getframe(3)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith('models.') and module != 'models.database':
+            return f"{module[len('models.'):]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'unknown'
+
+class SlowQueryLog:
+    """Keeps recent slow statements and per-statement totals in memory.
+
+    Statements slower than threshold_ms are logged and added to a ring
+    buffer of the last `size` occurrences. They are also aggregated by
+    normalized SQL, keeping at most `size` statements; the one with the
+    least total time is dropped first. The worst statements can be EXPLAINed
+    on demand with the parameters of their slowest run.
+    """
+
+    def __init__(self, threshold_ms, size=100):
+        self.threshold = threshold_ms / 1000
+        self.size = size
+        self._recent = deque(maxlen=size)
+        self._statements = {}
+        self._lock = threading.Lock()
+
+    def observe(self, sql, params, seconds):
+        if seconds < self.threshold or sql.startswith('EXPLAIN'):
+            return
+        normalized = normalize_sql(sql)
+        caller = _calling_function()
+        shape = param_shape(params)
+        ms = round(seconds * 1000, 1)
+        logger.warning(f"Slow query {ms} ms in {caller}: {normalized} params={shape}")
+        with self._lock:
+            self._recent.append({
+                'at': time.strftime('%Y-%m-%d %H:%M:%S'), 'ms': ms,
+                'caller': caller, 'sql': normalized, 'params': shape,
+            })
+            entry = self._statements.get(normalized)
+            if entry is None:
+                if len(self._statements) >= self.size:
+                    cheapest = min(self._statements, key=lambda key: self._statements[key]['total_ms'])
+                    del self._statements[cheapest]
+                entry = self._statements[normalized] = {
+                    'sql': normalized, 'caller': caller, 'params': shape,
+                    'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'plan': None, '_sample': None,
+                }
+            entry['count'] += 1
+            entry['total_ms'] = round(entry['total_ms'] + ms, 1)
+            if ms >= entry['max_ms']:
+                entry['max_ms'] = ms
+                entry['caller'] = caller
+                entry['_sample'] = (sql, params)
+
+    def worst(self, limit=10):
+        with self._lock:
+            entries = sorted(self._statements.values(), key=lambda e: e['total_ms'], reverse=True)[:limit]
+            return [{k: v for k, v in entry.items() if not k.startswith('_')} for entry in entries]
+
+    def recent(self):
+        with self._lock:
+            return list(reversed(self._recent))
+
+    def explain_worst(self, limit=5):
+        """Captures EXPLAIN plans for the worst statements that do not have one yet.
+
+        Runs on the caller's request connection, so it is only called from
+        the admin debug page rather than from the slow request itself.
+        """
+        with self._lock:
+            entries = sorted(self._statements.values(), key=lambda e: e['total_ms'], reverse=True)[:limit]
+            pending = [entry for entry in entries if entry['plan'] is None and entry['_sample']]
+        for entry in pending:
+            sql, params = entry['_sample']
+            if not sql.lstrip().upper().startswith(EXPLAINABLE) or (params and isinstance(params[0], (tuple, list))):
+                # Not explainable, or an execute_many batch with no single parameter set
+                entry['plan'] = []
+                entry['_sample'] = None
+                continue
+            try:
+                plan = fetch_all(f"EXPLAIN {sql}", params)
+            except Error as e:
+                logger.warning(f"EXPLAIN failed for {entry['sql']}: {e}")
+                plan = [{'error': str(e)}]
+            with self._lock:
+                entry['plan'] = plan
+                # The parameters are only kept until the plan is captured
+                entry['_sample'] = None
+
+def init_slow_query_log(app):
+    """Records statements slower than SLOW_QUERY_MS (0 disables)."""
+    threshold_ms = app.config['SLOW_QUERY_MS']
+    app.slow_query_log = None
+    if threshold_ms <= 0:
+        return
+    app.slow_query_log = SlowQueryLog(threshold_ms, app.config['SLOW_QUERY_LOG_SIZE'])
+    add_query_observer(_observe)
+    logger.info(f"Slow query log enabled for statements over {threshold_ms} ms.")
+
+def _observe(sql, params, seconds):
+    # Observers are process-wide; each app records into its own log
+    try:
+        slow_log = current_app.slow_query_log
+    except RuntimeError:
+        return
+    if slow_log is not None:
+        slow_log.observe(sql, params, seconds)
+
+def get_slow_query_report():
+    """Worst and most recent slow statements for the admin debug page."""
+    slow_log = current_app.slow_query_log
+    if slow_log is None:
+        return None
+    if current_app.config['SLOW_QUERY_EXPLAIN']:
+        slow_log.explain_worst(current_app.config['SLOW_QUERY_EXPLAIN_TOP'])
+    return {
+        'threshold_ms': current_app.config['SLOW_QUERY_MS'],
+        'worst': slow_log.worst(),
+        'recent': slow_log.recent()[:20],
+    }
@@ -163,52 +163,92 @@ function initRefreshButtons() {
 }
 
 /**
- * Initialize search functionality
+ * Paged list state for the users, artworks and orders tables.
+ * Lists are searched, sorted and paged on the server (keyset cursors).
+ */
+const adminLists = {
+    users: { url: '/admin/api/users', sort: 'email', dir: 'asc', search: '', nextCursor: null, load: () => loadUsersData() },
+    artworks: { url: '/admin/api/artworks', sort: 'created_at', dir: 'desc', search: '', nextCursor: null, load: () => loadArtworksData() },
+    orders: { url: '/admin/api/orders', sort: 'order_date', dir: 'desc', search: '', nextCursor: null, load: () => loadOrdersData() }
+};
+
+/**
+ * Fetch one page of a list; append continues from the last loaded page
+ */
+function fetchAdminListPage(name, append) {
+    const list = adminLists[name];
+    const params = new URLSearchParams({ sort: list.sort, dir: list.dir, limit: 50 });
+    if (list.search) params.set('search', list.search);
+    if (append && list.nextCursor) params.set('cursor', list.nextCursor);
+
+    return fetch(`${list.url}?${params}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) throw new Error(data.error);
+            list.nextCursor = data.next_cursor;
+
+            const total = document.getElementById(`admin_${name}_total`);
+            if (total) {
+                total.textContent = `${data.total}${data.total_exact ? '' : '+'} ${name}`;
+            }
+            const loadMore = document.getElementById(`admin_${name}_load_more`);
+            if (loadMore) {
+                loadMore.classList.toggle('d-none', !data.next_cursor);
+            }
+            return data;
+        });
+}
+
+/**
+ * Initialize search, sorting and "Load More" for the paged lists
  */
 function initSearchFunctionality() {
     const searchInputs = {
-        'admin_user_search_input': '#admin_users_table tbody tr',
-        'admin_artwork_search_input': '#admin_artworks_table tbody tr',
-        'admin_order_search_input': '#admin_orders_table tbody tr'
+        'admin_user_search_input': 'users',
+        'admin_artwork_search_input': 'artworks',
+        'admin_order_search_input': 'orders'
     };
     
     Object.keys(searchInputs).forEach(inputId => {
         const input = document.getElementById(inputId);
         if (input) {
+            let debounce;
             input.addEventListener('input', function() {
-                const searchTerm = this.value.toLowerCase();
-                const rows = document.querySelectorAll(searchInputs[inputId]);
-                
-                rows.forEach(row => {
-                    const text = row.textContent.toLowerCase();
-                    if (text.includes(searchTerm)) {
-                        row.style.display = '';
-                        row.classList.add('fade-in');
-                    } else {
-                        row.style.display = 'none';
-                    }
+                const list = adminLists[searchInputs[inputId]];
+                clearTimeout(debounce);
+                debounce = setTimeout(() => {
+                    list.search = this.value.trim();
+                    list.load();
+                }, 300);
+            });
+        }
+    });
+
+    document.querySelectorAll('.admin-sortable').forEach(header => {
+        header.style.cursor = 'pointer';
+        header.addEventListener('click', function() {
+            const list = adminLists[this.getAttribute('data-list')];
+            const sort = this.getAttribute('data-sort');
+            list.dir = list.sort === sort && list.dir === 'asc' ? 'desc' : 'asc';
+            list.sort = sort;
+
+            document.querySelectorAll(`.admin-sortable[data-list="${this.getAttribute('data-list')}"] i`).forEach(icon => {
+                icon.className = 'fas fa-sort';
+            });
+            this.querySelector('i').className = list.dir === 'asc' ? 'fas fa-sort-up' : 'fas fa-sort-down';
+            list.load();
+        });
+    });
+
+    Object.keys(adminLists).forEach(name => {
+        const loadMore = document.getElementById(`admin_${name}_load_more`);
+        if (loadMore) {
+            loadMore.addEventListener('click', function() {
+                this.disabled = true;
+                const loaders = { users: loadUsersData, artworks: loadArtworksData, orders: loadOrdersData };
+                loaders[name](true).finally(() => {
+                    this.disabled = false;
                 });
-                
-                // Show no results message if needed
-                const visibleRows = Array.from(rows).filter(row => row.style.display !== 'none');
-                const noResultsRow = row.querySelector('.no-results');
-                if (visibleRows.length === 0 && searchTerm) {
-                    if (!noResultsRow) {
-                        const noResults = document.createElement('tr');
-                        noResults.className = 'no-results';
-                        noResults.innerHTML = `
-                            <td colspan="100%" class="text-center">
-                                <div class="py-4">
-                                    <i class="fas fa-search fa-2x text-muted mb-3"></i>
-                                    <p class="text-muted">No results found for "${searchTerm}"</p>
-                                </div>
-                            </td>
-                        `;
-                        row.parentNode.appendChild(noResults);
-                    }
-                } else if (noResultsRow) {
-                    noResultsRow.remove();
-                }
             });
         }
     });
@@ -323,22 +363,16 @@ function renderCards(cards, metrics) {
  * Initialize user management
  */
 function initUserManagement() {
-    // User search functionality
-    const userSearchInput = document.getElementById('admin_user_search_input');
-    if (userSearchInput) {
-        userSearchInput.addEventListener('input', function() {
-            const searchTerm = this.value.toLowerCase();
-            const rows = document.querySelectorAll('#admin_users_table tbody tr');
-            
-            rows.forEach(row => {
-                const text = row.textContent.toLowerCase();
-                row.style.display = text.includes(searchTerm) ? '' : 'none';
-            });
-        });
-    }
-    
+    bindUserRowButtons(document);
+    initUserEditForm();
+}
+
+/**
+ * Bind edit/delete buttons of the user rows inside root
+ */
+function bindUserRowButtons(root) {
     // User delete button click
-    document.querySelectorAll('.admin-user-delete-btn').forEach(button => {
+    root.querySelectorAll('.admin-user-delete-btn').forEach(button => {
         button.addEventListener('click', function() {
             const email = this.getAttribute('data-email');
             
@@ -388,7 +422,7 @@ function initUserManagement() {
     });
     
     // User edit button click
-    document.querySelectorAll('.admin-user-edit-btn').forEach(button => {
+    root.querySelectorAll('.admin-user-edit-btn').forEach(button => {
         button.addEventListener('click', function() {
             const email = this.getAttribute('data-email');
             const name = this.getAttribute('data-name');
@@ -412,8 +446,12 @@ function initUserManagement() {
             modal.show();
         });
     });
-    
-    // Add this code for the edit form submission
+}
+
+/**
+ * Initialize the user edit form submission
+ */
+function initUserEditForm() {
     const userEditForm = document.getElementById('admin_user_edit_form');
     if (userEditForm) {
         console.log('User edit form found:', userEditForm);
@@ -490,39 +528,35 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Initialize user management
     initUserManagement();
-    
-    // Load users data if on the users page
-    if (document.getElementById('admin_users_table')) {
-        loadUsersData();
-    }
 });
 
 /**
  * Load users data
  */
-function loadUsersData() {
+function loadUsersData(append = false) {
     const usersTable = document.querySelector('#admin_users_table tbody');
-    if (!usersTable) return;
+    if (!usersTable) return Promise.resolve();
     
     // Show loading state
-    usersTable.innerHTML = `
-        <tr>
-            <td colspan="4" class="text-center">
-                <div class="py-4">
-                    <i class="fas fa-spinner fa-spin fa-2x text-muted mb-3"></i>
-                    <p class="text-muted">Loading users...</p>
-                </div>
-            </td>
-        </tr>
-    `;
+    if (!append) {
+        usersTable.innerHTML = `
+            <tr>
+                <td colspan="4" class="text-center">
+                    <div class="py-4">
+                        <i class="fas fa-spinner fa-spin fa-2x text-muted mb-3"></i>
+                        <p class="text-muted">Loading users...</p>
+                    </div>
+                </td>
+            </tr>
+        `;
+    }
     
-    // Fetch users data
-    fetch('/admin/api/users')
-        .then(response => response.json())
-        .then(users => {
-            usersTable.innerHTML = '';
+    // Fetch one page of users
+    return fetchAdminListPage('users', append)
+        .then(data => {
+            if (!append) usersTable.innerHTML = '';
             
-            if (users.length === 0) {
+            if (!append && data.items.length === 0) {
                 usersTable.innerHTML = `
                     <tr>
                         <td colspan="4" class="text-center">
@@ -536,7 +570,7 @@ function loadUsersData() {
                 return;
             }
             
-            users.forEach(user => {
+            data.items.forEach(user => {
                 const row = document.createElement('tr');
                 const roleClass = user.role === 'admin' ? 'primary' : user.role === 'artist' ? 'success' : 'secondary';
                 row.innerHTML = `
@@ -563,10 +597,8 @@ function loadUsersData() {
                     </td>
                 `;
                 usersTable.appendChild(row);
+                bindUserRowButtons(row);
             });
-            
-            // Re-initialize user management for new buttons
-            initUserManagement();
         })
         .catch(error => {
             console.error('Error loading users:', error);
@@ -587,20 +619,6 @@ function loadUsersData() {
  * Initialize artwork management
  */
 function initArtworkManagement() {
-    // Artwork search functionality
-    const artworkSearchInput = document.getElementById('admin_artwork_search_input');
-    if (artworkSearchInput) {
-        artworkSearchInput.addEventListener('input', function() {
-            const searchTerm = this.value.toLowerCase();
-            const rows = document.querySelectorAll('#admin_artworks_table tbody tr');
-            
-            rows.forEach(row => {
-                const text = row.textContent.toLowerCase();
-                row.style.display = text.includes(searchTerm) ? '' : 'none';
-            });
-        });
-    }
-    
     // Artwork edit button click
     document.addEventListener('click', function(e) {
         if (e.target && e.target.classList.contains('admin-artwork-edit-btn')) {
@@ -737,29 +755,30 @@ function initArtworkManagement() {
 /**
  * Load artworks data
  */
-function loadArtworksData() {
+function loadArtworksData(append = false) {
     const artworksTable = document.querySelector('#admin_artworks_table tbody');
-    if (!artworksTable) return;
+    if (!artworksTable) return Promise.resolve();
     
     // Show loading state
-    artworksTable.innerHTML = `
-        <tr>
-            <td colspan="4" class="text-center">
-                <div class="py-4">
-                    <i class="fas fa-spinner fa-spin fa-2x text-muted mb-3"></i>
-                    <p class="text-muted">Loading artworks...</p>
-                </div>
-            </td>
-        </tr>
-    `;
+    if (!append) {
+        artworksTable.innerHTML = `
+            <tr>
+                <td colspan="4" class="text-center">
+                    <div class="py-4">
+                        <i class="fas fa-spinner fa-spin fa-2x text-muted mb-3"></i>
+                        <p class="text-muted">Loading artworks...</p>
+                    </div>
+                </td>
+            </tr>
+        `;
+    }
     
-    // Fetch artworks data
-    fetch('/admin/api/artworks')
-        .then(response => response.json())
-        .then(artworks => {
-            artworksTable.innerHTML = '';
+    // Fetch one page of artworks
+    return fetchAdminListPage('artworks', append)
+        .then(data => {
+            if (!append) artworksTable.innerHTML = '';
             
-            if (artworks.length === 0) {
+            if (!append && data.items.length === 0) {
                 artworksTable.innerHTML = `
                     <tr>
                         <td colspan="4" class="text-center">
@@ -773,11 +792,11 @@ function loadArtworksData() {
                 return;
             }
             
-            artworks.forEach(artwork => {
+            data.items.forEach(artwork => {
                 const row = document.createElement('tr');
                 row.innerHTML = `
                     <td>${artwork.title}</td>
-                    <td>${artwork.artist || 'Unknown'}</td>
+                    <td>${artwork.artist_name || 'Unknown'}</td>
                     <td>
                         <span class="badge badge-success">₹${parseFloat(artwork.price).toFixed(2)}</span>
                     </td>
@@ -800,9 +819,6 @@ function loadArtworksData() {
                 `;
                 artworksTable.appendChild(row);
             });
-            
-            // Re-initialize artwork management for new buttons
-            initArtworkManagement();
         })
         .catch(error => {
             console.error('Error loading artworks:', error);
@@ -823,20 +839,6 @@ function loadArtworksData() {
  * Initialize order management
  */
 function initOrderManagement() {
-    // Order search functionality
-    const orderSearchInput = document.getElementById('admin_order_search_input');
-    if (orderSearchInput) {
-        orderSearchInput.addEventListener('input', function() {
-            const searchTerm = this.value.toLowerCase();
-            const rows = document.querySelectorAll('#admin_orders_table tbody tr');
-            
-            rows.forEach(row => {
-                const text = row.textContent.toLowerCase();
-                row.style.display = text.includes(searchTerm) ? '' : 'none';
-            });
-        });
-    }
-    
     // Order view button click
     document.addEventListener('click', function(e) {
         if (e.target && e.target.classList.contains('admin-order-view-btn')) {
@@ -847,22 +849,22 @@ function initOrderManagement() {
             e.target.innerHTML = '<i class="fas fa-spinner fa-spin"></i>';
             e.target.disabled = true;
             
-            // Fetch order details
-            fetch(`/admin/orders/details/${id}`)
-                .then(response => response.json())
-                .then(data => {
-                    if (data.status === 'success') {
+            // Use the details prefetched with the page, else fetch just this order
+            const cached = orderDetailsCache.get(Number(id));
+            (cached ? Promise.resolve(cached) : fetchOrderDetails([id]).then(() => orderDetailsCache.get(Number(id))))
+                .then(order => {
+                    if (order) {
                         // Populate order details modal
-                        document.getElementById('admin_order_detail_id').textContent = data.order.order_id;
-                        document.getElementById('admin_order_detail_status').textContent = data.order.order_status;
-                        document.getElementById('admin_order_detail_total').textContent = parseFloat(data.order.total_price).toFixed(2);
-                        document.getElementById('admin_order_detail_email').textContent = data.order.email;
+                        document.getElementById('admin_order_detail_id').textContent = order.order_id;
+                        document.getElementById('admin_order_detail_status').textContent = order.order_status;
+                        document.getElementById('admin_order_detail_total').textContent = parseFloat(order.total_price).toFixed(2);
+                        document.getElementById('admin_order_detail_email').textContent = order.email;
                         
                         // Populate order items
                         const itemsTable = document.getElementById('admin_order_items');
                         itemsTable.innerHTML = '';
-                        if (data.order.items && data.order.items.length > 0) {
-                            data.order.items.forEach(item => {
+                        if (order.items && order.items.length > 0) {
+                            order.items.forEach(item => {
                                 const row = document.createElement('tr');
                                 row.innerHTML = `
                                     <td>${item.title}</td>
@@ -878,7 +880,7 @@ function initOrderManagement() {
                         const modal = new bootstrap.Modal(document.getElementById('admin_order_details_modal'));
                         modal.show();
                     } else {
-                        showAlert('Error: ' + (data.message || data.error), 'danger');
+                        showAlert('Error: Order not found', 'danger');
                     }
                 })
                 .catch(error => {
@@ -894,32 +896,52 @@ function initOrderManagement() {
     });
 }
 
+// Order details by order_id, filled a page at a time
+const orderDetailsCache = new Map();
+
+/**
+ * Fetch details (with items) for several orders in one request
+ */
+function fetchOrderDetails(ids) {
+    if (ids.length === 0) return Promise.resolve();
+    return fetch(`/admin/api/orders/details?ids=${ids.join(',')}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) throw new Error(data.error);
+            data.orders.forEach(order => orderDetailsCache.set(order.order_id, order));
+        });
+}
+
 /**
  * Load orders data
  */
-function loadOrdersData() {
+function loadOrdersData(append = false) {
     const ordersTable = document.querySelector('#admin_orders_table tbody');
-    if (!ordersTable) return;
+    if (!ordersTable) return Promise.resolve();
     
     // Show loading state
-    ordersTable.innerHTML = `
-        <tr>
-            <td colspan="5" class="text-center">
-                <div class="py-4">
-                    <i class="fas fa-spinner fa-spin fa-2x text-muted mb-3"></i>
-                    <p class="text-muted">Loading orders...</p>
-                </div>
-            </td>
-        </tr>
-    `;
+    if (!append) {
+        ordersTable.innerHTML = `
+            <tr>
+                <td colspan="5" class="text-center">
+                    <div class="py-4">
+                        <i class="fas fa-spinner fa-spin fa-2x text-muted mb-3"></i>
+                        <p class="text-muted">Loading orders...</p>
+                    </div>
+                </td>
+            </tr>
+        `;
+    }
     
-    // Fetch orders data
-    fetch('/admin/api/orders')
-        .then(response => response.json())
-        .then(orders => {
-            ordersTable.innerHTML = '';
+    // Fetch one page of orders
+    return fetchAdminListPage('orders', append)
+        .then(data => {
+            if (!append) {
+                ordersTable.innerHTML = '';
+                orderDetailsCache.clear();
+            }
             
-            if (orders.length === 0) {
+            if (!append && data.items.length === 0) {
                 ordersTable.innerHTML = `
                     <tr>
                         <td colspan="5" class="text-center">
@@ -933,7 +955,7 @@ function loadOrdersData() {
                 return;
             }
             
-            orders.forEach(order => {
+            data.items.forEach(order => {
                 const statusClass = order.order_status === 'completed' ? 'success' : 
                                   order.order_status === 'pending' ? 'warning' : 'info';
                 const row = document.createElement('tr');
@@ -957,8 +979,9 @@ function loadOrdersData() {
                 ordersTable.appendChild(row);
             });
             
-            // Re-initialize order management for new buttons
-            initOrderManagement();
+            // Prefetch the page's order details so View opens without a request
+            fetchOrderDetails(data.items.map(order => order.order_id))
+                .catch(error => console.error('Error prefetching order details:', error));
         })
         .catch(error => {
             console.error('Error loading orders:', error);
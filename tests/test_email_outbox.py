@@ -0,0 +1,221 @@
+"""Outbox sender against an in-process SMTP stand-in and an in-memory outbox table."""
+import socketserver
+import threading
+import time
+from unittest import mock
+
+import pytest
+from flask import Flask, has_app_context
+
+from config.config import Config
+from services import email_outbox
+from services.email_outbox import OutboxSender
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Just enough SMTP for smtplib: records delivered messages, can fail or stall DATA."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.messages = []
+        self.fail_data = False
+        self.on_data = None
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        server = self.server
+        self.reply('220 stand-in ready')
+        recipients = []
+        for raw in self.rfile:
+            command = raw.decode().strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply('250 stand-in')
+            elif verb == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command.split(':', 1)[1].strip(' <>'))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                if server.on_data:
+                    server.on_data()
+                if server.fail_data:
+                    self.reply('451 try again later')
+                    continue
+                self.reply('354 go ahead')
+                body = []
+                for line in self.rfile:
+                    if line in (b'.\r\n', b'.\n'):
+                        break
+                    body.append(line)
+                server.messages.append((recipients, b''.join(body)))
+                self.reply('250 queued')
+            elif verb in ('RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('502 not implemented')
+
+
+class FakeOutbox:
+    """email_outbox rows with the claim/lease rules of models/email_outbox_queries.py."""
+
+    def __init__(self):
+        self.rows = {}
+        self.lock = threading.Lock()
+
+    def add(self, recipient):
+        email_id = len(self.rows) + 1
+        self.rows[email_id] = {
+            'id': email_id, 'recipient': recipient, 'subject': 'Hello', 'html_body': '<p>hi</p>',
+            'status': 'pending', 'attempts': 0, 'next_attempt_at': 0.0, 'last_error': None,
+        }
+        return email_id
+
+    def claim(self, batch_size, lease_seconds):
+        assert has_app_context()
+        now = time.monotonic()
+        with self.lock:
+            due = [row for row in self.rows.values()
+                   if row['status'] in ('pending', 'sending') and row['next_attempt_at'] <= now]
+            due.sort(key=lambda row: row['next_attempt_at'])
+            claimed = []
+            for row in due[:batch_size]:
+                claimed.append(dict(row))
+                row.update(status='sending', attempts=row['attempts'] + 1, next_attempt_at=now + lease_seconds)
+            return claimed
+
+    def mark_sent(self, email_id):
+        self.rows[email_id].update(status='sent', html_body='')
+
+    def mark_failed(self, email_id, message, retry_in_seconds=None):
+        row = self.rows[email_id]
+        if retry_in_seconds is None:
+            row.update(status='failed', last_error=message, html_body='')
+        else:
+            row.update(status='pending', last_error=message,
+                       next_attempt_at=time.monotonic() + retry_in_seconds, retry_in=retry_in_seconds)
+
+    def leased(self):
+        now = time.monotonic()
+        return [row['id'] for row in self.rows.values()
+                if row['status'] == 'sending' and row['next_attempt_at'] > now]
+
+
+@pytest.fixture
+def smtp():
+    with SMTPStandIn() as server:
+        yield server
+
+
+@pytest.fixture
+def outbox():
+    fake = FakeOutbox()
+    with mock.patch.object(email_outbox, 'claim_pending_emails', fake.claim), \
+            mock.patch.object(email_outbox, 'mark_email_sent', fake.mark_sent), \
+            mock.patch.object(email_outbox, 'mark_email_failed', fake.mark_failed):
+        yield fake
+
+
+def make_sender(smtp, smtp_timeout=5, **config):
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update({'EMAIL_OUTBOX_BATCH_SIZE': 20, 'EMAIL_MAX_ATTEMPTS': 3,
+                       'EMAIL_RETRY_BASE_SECONDS': 30, 'EMAIL_OUTBOX_LEASE_SECONDS': 120, **config})
+    app.metrics = None
+    host, port = smtp.server_address
+    with mock.patch.multiple(Config, SMTP_SERVER=host, SMTP_PORT=port, SMTP_TIMEOUT=smtp_timeout,
+                             SMTP_USE_TLS=False, SMTP_LOGIN=False):
+        return OutboxSender(app)
+
+
+def test_sends_due_emails_over_one_session(smtp, outbox):
+    for n in range(3):
+        outbox.add(f'user{n}@example.com')
+    sender = make_sender(smtp)
+
+    assert sender.process_batch() == 3
+    sender.email_service.close()
+
+    assert sorted(recipients[0] for recipients, _ in smtp.messages) == [
+        'user0@example.com', 'user1@example.com', 'user2@example.com']
+    assert all(row['status'] == 'sent' and row['html_body'] == '' for row in outbox.rows.values())
+
+
+def test_failed_send_is_retried_with_backoff_then_given_up(smtp, outbox):
+    email_id = outbox.add('user@example.com')
+    smtp.fail_data = True
+    sender = make_sender(smtp)
+    row = outbox.rows[email_id]
+
+    sender.process_batch()
+    assert row['status'] == 'pending' and row['retry_in'] == 30 and '451' in row['last_error']
+
+    row['next_attempt_at'] = 0.0
+    sender.process_batch()
+    assert row['status'] == 'pending' and row['retry_in'] == 60
+
+    row['next_attempt_at'] = 0.0
+    sender.process_batch()
+    assert row['status'] == 'failed' and row['attempts'] == 3
+    assert smtp.messages == []
+
+
+def test_only_the_email_being_sent_is_leased(smtp, outbox):
+    for n in range(3):
+        outbox.add(f'user{n}@example.com')
+    sender = make_sender(smtp)
+    seen = []
+    # Runs on the stand-in's thread while the sender waits on SMTP
+    smtp.on_data = lambda: seen.append(outbox.leased())
+
+    original_send = sender.email_service.send_email
+    def send_outside_app_context(*args):
+        assert not has_app_context(), "SMTP I/O must not hold a database connection"
+        return original_send(*args)
+
+    with mock.patch.object(sender.email_service, 'send_email', send_outside_app_context):
+        sender.process_batch()
+    sender.email_service.close()
+
+    assert seen == [[1], [2], [3]]
+
+
+def test_lease_outlasts_a_stalled_smtp_server(smtp, outbox):
+    sender = make_sender(smtp, smtp_timeout=30, EMAIL_OUTBOX_LEASE_SECONDS=60)
+    assert sender.email_service.timeout == 30
+    assert sender.lease_seconds >= 4 * 30
+
+
+def test_expired_lease_is_claimed_again(smtp, outbox):
+    email_id = outbox.add('user@example.com')
+    sender = make_sender(smtp)
+    sender.lease_seconds = 0.05
+
+    with sender.app.app_context():
+        assert [row['id'] for row in outbox.claim(1, sender.lease_seconds)] == [email_id]
+        assert outbox.claim(1, sender.lease_seconds) == []
+    time.sleep(0.1)
+
+    # The first sender died mid-send; its row is sent once its lease runs out
+    assert sender.process_batch() == 1
+    sender.email_service.close()
+    assert outbox.rows[email_id]['status'] == 'sent' and len(smtp.messages) == 1
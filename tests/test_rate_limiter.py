@@ -0,0 +1,125 @@
+"""Token bucket stores, and the 429 responses the rate_limit decorator builds from them."""
+from unittest import mock
+
+import pytest
+from flask import Flask
+
+from config.config import Config
+from services import rate_limiter
+from services.rate_limiter import MemoryBucketStore, RateLimiter, SharedMemoryBucketStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    clock = Clock()
+    with mock.patch.object(rate_limiter.time, 'time', clock):
+        yield clock
+
+
+@pytest.fixture(params=['memory', 'shared'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryBucketStore()
+    return SharedMemoryBucketStore(path=str(tmp_path / 'rate_limits'), slots=64)
+
+
+def test_rejects_once_the_bucket_is_empty(store, clock):
+    # 3 requests per 60 seconds: one token every 20 seconds
+    assert [store.take('k', 3, 3 / 60) for _ in range(3)] == [0, 0, 0]
+    assert store.take('k', 3, 3 / 60) == pytest.approx(20)
+    clock.advance(5)
+    assert store.take('k', 3, 3 / 60) == pytest.approx(15)
+
+
+def test_refills_over_time_up_to_capacity(store, clock):
+    for _ in range(3):
+        store.take('k', 3, 3 / 60)
+    clock.advance(20)
+    assert store.take('k', 3, 3 / 60) == 0
+    assert store.take('k', 3, 3 / 60) == pytest.approx(20)
+
+    clock.advance(3600)
+    assert [store.take('k', 3, 3 / 60) for _ in range(4)][-1] == pytest.approx(20)
+
+
+def test_keys_have_separate_buckets(store, clock):
+    assert store.take('a', 1, 1 / 60) == 0
+    assert store.take('a', 1, 1 / 60) > 0
+    assert store.take('b', 1, 1 / 60) == 0
+
+
+def test_shared_buckets_are_seen_by_every_open_store(tmp_path, clock):
+    path = str(tmp_path / 'rate_limits')
+    first, second = SharedMemoryBucketStore(path=path, slots=64), SharedMemoryBucketStore(path=path, slots=64)
+    assert first.take('k', 1, 1 / 60) == 0
+    assert second.take('k', 1, 1 / 60) == pytest.approx(60)
+
+
+def make_app(store, limits):
+    app = Flask(__name__)
+    app.rate_limiter = RateLimiter(store, limits)
+
+    @app.route('/verify', methods=['POST'])
+    @rate_limiter.rate_limit('verify_otp')
+    def verify():
+        return {'status': 'success'}
+
+    return app
+
+
+def post(client, email, ip='10.0.0.1'):
+    return client.post('/verify', json={'email': email, 'otp': '000000'}, environ_base={'REMOTE_ADDR': ip})
+
+
+def test_decorator_answers_429_with_retry_after(store, clock):
+    client = make_app(store, {'verify_otp': {'ip': (30, 600), 'email': (5, 600)}}).test_client()
+
+    assert [post(client, 'user@example.com').status_code for _ in range(5)] == [200] * 5
+    response = post(client, 'User@Example.com ')
+    assert response.status_code == 429
+    # One of 5 tokens per 600 seconds comes back after 120 seconds
+    assert response.headers['Retry-After'] == '120'
+
+    clock.advance(119.5)
+    assert post(client, 'user@example.com').headers['Retry-After'] == '1'
+    clock.advance(0.5)
+    assert post(client, 'user@example.com').status_code == 200
+
+
+def test_email_limit_holds_across_client_ips(store, clock):
+    client = make_app(store, {'verify_otp': {'ip': (30, 600), 'email': (5, 600)}}).test_client()
+    statuses = [post(client, 'user@example.com', ip=f'10.0.0.{n}').status_code for n in range(6)]
+    assert statuses == [200] * 5 + [429]
+    assert post(client, 'other@example.com', ip='10.0.0.9').status_code == 200
+
+
+def test_otp_verify_endpoints_are_limited(clock):
+    from blueprints.auth.routes import auth_bp
+
+    app = Flask(__name__)
+    app.register_blueprint(auth_bp, url_prefix='/auth')
+    app.rate_limiter = RateLimiter(MemoryBucketStore(), Config.RATE_LIMITS)
+    client = app.test_client()
+    attempts = Config.RATE_LIMITS['verify_otp']['email'][0]
+    wrong_code = {'status': 'error', 'message': 'Invalid OTP'}
+
+    with mock.patch('blueprints.auth.routes.verify_otp', return_value=wrong_code):
+        # Login and signup verification draw on the same budget per email
+        for n in range(attempts):
+            path = '/auth/verify-otp' if n % 2 else '/auth/verify-signup-otp'
+            response = client.post(path, json={'email': 'user@example.com', 'name': 'U', 'password': 'pw',
+                                               'otp': f'{n:06d}'})
+            assert response.status_code == 400
+        response = client.post('/auth/verify-otp', json={'email': 'user@example.com', 'otp': '999999'})
+    assert response.status_code == 429 and int(response.headers['Retry-After']) > 0